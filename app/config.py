@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -11,7 +12,47 @@ class Settings(BaseSettings):
     Attributes:
         SECRET_KEY (str): A secret key used for encoding and decoding JWT tokens.
         ALGORITHM (str): The algorithm used for JWT encoding/decoding (default: HS256).
+        JWT_KEYS (dict): Additional JWT signing keys by key ID, for key rotation (default: none).
+        JWT_SIGNING_KID (str): The ID of the key new tokens are signed with (default: "default", i.e. SECRET_KEY).
         ACCESS_TOKEN_EXPIRE_MINUTES (int): The expiration time for access tokens in minutes (default: 30).
+        DB_POOL_SIZE (int): Database connections kept open per engine (default: 5).
+        DB_MAX_OVERFLOW (int): Connections opened beyond the pool size under load (default: 10).
+        DB_POOL_TIMEOUT (float): Seconds to wait for a free connection (default: 30).
+        DB_POOL_RECYCLE (int): Seconds after which connections are replaced, -1 for never (default: 1800).
+        DB_POOL_PRE_PING (bool): Test connections before handing them out (default: True).
+        DB_EXECUTEMANY_MODE (str): psycopg2 executemany strategy (default: values_plus_batch).
+        DATABASE_REPLICA_URLS (list): URLs of read replicas for read-only endpoints (default: none).
+        DB_REPLICA_RETRY_INTERVAL (int): Seconds an unreachable replica is skipped (default: 30).
+        DB_READ_YOUR_WRITES_WINDOW (float): Seconds a user's reads go to the primary after a write (default: 5).
+        DB_SLOW_QUERY_THRESHOLD (float): Duration in seconds above which statements are logged as slow (default: 0.5).
+        DB_REPEATED_QUERY_THRESHOLD (int): Runs of one statement shape per request above which a warning is logged, 0 to disable (default: 10).
+        REDIS_HOST (str): Host of the Redis server (default: localhost).
+        REDIS_PORT (int): Port of the Redis server (default: 6379).
+        REDIS_DB (int): Number of the Redis database (default: 0).
+        REDIS_PASSWORD (str): Password of the Redis server (default: none).
+        REDIS_CONNECT_TIMEOUT (float): Seconds to wait for a Redis connection (default: 1.0).
+        REDIS_SOCKET_TIMEOUT (float): Seconds to wait for a Redis reply (default: 2.0).
+        REDIS_MAX_CONNECTIONS (int): Connections per Redis client and process (default: 50).
+        CONTACTS_CACHE_TTL (int): Lifetime of cached contact reads in seconds (default: 300).
+        TOKEN_CACHE_SIZE (int): Maximum number of verified tokens cached per process (default: 10000).
+        TOKEN_CACHE_TTL (int): Maximum lifetime of a cached token in seconds (default: 60).
+        AUTH_STATELESS (bool): Trust the user claims of fresh access tokens without lookups (default: False).
+        AUTH_CLAIMS_MAX_AGE (int): Age in seconds up to which token claims are trusted (default: 300).
+        TOKEN_DENYLIST_CAPACITY (int): Revoked tokens the local Bloom filter is sized for (default: 100000).
+        TOKEN_DENYLIST_ERROR_RATE (float): Target false positive rate of the Bloom filter (default: 0.001).
+        PASSWORD_HASH_WORKERS (int): Number of bcrypt worker processes, 0 to use threads (default: 2).
+        RATE_LIMIT_LEASE_MAX (int): Rate limit units a worker may lease from Redis at once, 0 to disable (default: 20).
+        RATE_LIMIT_LEASE_TTL (float): Maximum time in seconds a worker keeps leased units (default: 1.0).
+        RATE_LIMIT_TIERS (dict): Request budget of anonymous clients and of each user role.
+        RATE_LIMIT_REGISTER (str): Registration limit per client address (default: 5/minute).
+        SMTP_SERVER (str): Host of the SMTP server (default: localhost).
+        SMTP_PORT (int): Port of the SMTP server (default: 25).
+        SMTP_EMAIL (str): Sender address, also the SMTP user name (default: noreply@example.com).
+        SMTP_PASSWORD (str): SMTP password; no login without one (default: none).
+        SMTP_STARTTLS (bool): Upgrade the SMTP connection with STARTTLS (default: False).
+        EMAIL_OUTBOX_BATCH_SIZE (int): Emails sent per batch by the outbox worker (default: 50).
+        EMAIL_OUTBOX_MAX_ATTEMPTS (int): Attempts before an email is given up (default: 5).
+        METRICS_PUBLISH_INTERVAL (float): Seconds between publications of each worker's metrics to Redis, 0 to serve local metrics only (default: 5.0).
     """
 
     # Secret key for JWT encoding/decoding, must be set in the environment or .env file
@@ -20,9 +61,138 @@ class Settings(BaseSettings):
     # Algorithm used for JWT encoding/decoding, default is HS256
     ALGORITHM: str = "HS256"  #: :no-index:
 
+    # Additional signing keys by key ID, given as JSON. All of them verify
+    # tokens; SECRET_KEY is registered under the key ID "default"
+    JWT_KEYS: Dict[str, str] = {}  #: :no-index:
+
+    # Key ID of the key new tokens are signed with
+    JWT_SIGNING_KID: str = "default"  #: :no-index:
+
     # Access token expiration time in minutes, default is 30 minutes
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30  #: :no-index:
 
+    # Connections each engine keeps open (ignored for SQLite). Every worker
+    # has a sync and an async engine
+    DB_POOL_SIZE: int = 5  #: :no-index:
+
+    # Connections an engine may open beyond DB_POOL_SIZE during bursts
+    DB_MAX_OVERFLOW: int = 10  #: :no-index:
+
+    # Seconds a request waits for a free connection before failing
+    DB_POOL_TIMEOUT: float = 30  #: :no-index:
+
+    # Seconds after which a connection is replaced, before the server or a
+    # proxy drops it; -1 keeps connections forever
+    DB_POOL_RECYCLE: int = 1800  #: :no-index:
+
+    # Test each connection with a lightweight query when it is checked out,
+    # replacing connections the server has closed
+    DB_POOL_PRE_PING: bool = True  #: :no-index:
+
+    # How psycopg2 runs executemany(): "values_only" or "values_plus_batch"
+    DB_EXECUTEMANY_MODE: str = "values_plus_batch"  #: :no-index:
+
+    # Read replicas serving read-only endpoints, given as a JSON list of
+    # database URLs; without any, all reads go to DATABASE_URL
+    DATABASE_REPLICA_URLS: List[str] = []  #: :no-index:
+
+    # Seconds a replica that could not be reached is left out of rotation
+    DB_REPLICA_RETRY_INTERVAL: int = 30  #: :no-index:
+
+    # Seconds after a write during which the user's reads go to the primary,
+    # so they see their own changes despite replication lag
+    DB_READ_YOUR_WRITES_WINDOW: float = 5  #: :no-index:
+
+    # Duration in seconds above which a statement is logged as slow
+    DB_SLOW_QUERY_THRESHOLD: float = 0.5  #: :no-index:
+
+    # Runs of the same statement shape in one request above which a possible
+    # N+1 query is logged, 0 disables the check
+    DB_REPEATED_QUERY_THRESHOLD: int = 10  #: :no-index:
+
+    # Redis server shared by the caches, sessions, rate limits and queues
+    REDIS_HOST: str = "localhost"  #: :no-index:
+    REDIS_PORT: int = 6379  #: :no-index:
+    REDIS_DB: int = 0  #: :no-index:
+    REDIS_PASSWORD: Optional[str] = None  #: :no-index:
+
+    # Seconds to wait for a connection to Redis and for each reply, so an
+    # unresponsive Redis fails requests instead of stalling them
+    REDIS_CONNECT_TIMEOUT: float = 1.0  #: :no-index:
+    REDIS_SOCKET_TIMEOUT: float = 2.0  #: :no-index:
+
+    # Maximum number of connections of each Redis client (sync and async) per process
+    REDIS_MAX_CONNECTIONS: int = 50  #: :no-index:
+
+    # Lifetime of cached contact reads in seconds, default is 5 minutes
+    CONTACTS_CACHE_TTL: int = 300  #: :no-index:
+
+    # Maximum number of verified tokens cached per process, 0 disables the cache
+    TOKEN_CACHE_SIZE: int = 10000  #: :no-index:
+
+    # Maximum lifetime of a cached token in seconds, bounding how stale the
+    # cached user snapshot (role, active flag) can get
+    TOKEN_CACHE_TTL: int = 60  #: :no-index:
+
+    # Authenticate requests from the claims of access tokens alone, without
+    # Redis or database lookups, while the token is younger than AUTH_CLAIMS_MAX_AGE
+    AUTH_STATELESS: bool = False  #: :no-index:
+
+    # Age in seconds up to which token claims are trusted in stateless mode,
+    # bounding how long revocations and role changes can go unnoticed
+    AUTH_CLAIMS_MAX_AGE: int = 300  #: :no-index:
+
+    # Number of revoked tokens the per-worker Bloom filter is sized for
+    TOKEN_DENYLIST_CAPACITY: int = 100000  #: :no-index:
+
+    # False positive rate of the Bloom filter; false positives cost a Redis lookup
+    TOKEN_DENYLIST_ERROR_RATE: float = 0.001  #: :no-index:
+
+    # Number of worker processes running bcrypt, 0 runs it in the threadpool
+    PASSWORD_HASH_WORKERS: int = 2  #: :no-index:
+
+    # Rate limit units a worker may take from Redis in advance and spend
+    # locally; leases are only handed out while far from the limit
+    RATE_LIMIT_LEASE_MAX: int = 20  #: :no-index:
+
+    # Maximum time in seconds a worker keeps leased units before asking Redis again
+    RATE_LIMIT_LEASE_TTL: float = 1.0  #: :no-index:
+
+    # Request budget shared by all routes, per user for each role and per
+    # client address for requests without a valid token ("anonymous").
+    # Routes may cost more than one request, see `rate_limit_cost`
+    RATE_LIMIT_TIERS: Dict[str, str] = {
+        "anonymous": "120/minute",
+        "user": "600/minute",
+        "admin": "3000/minute",
+    }  #: :no-index:
+
+    # Registrations allowed per client address
+    RATE_LIMIT_REGISTER: str = "5/minute"  #: :no-index:
+
+    # SMTP server the email outbox sends through
+    SMTP_SERVER: str = "localhost"  #: :no-index:
+    SMTP_PORT: int = 25  #: :no-index:
+
+    # Sender address of outgoing emails, also used as the SMTP user name
+    SMTP_EMAIL: str = "noreply@example.com"  #: :no-index:
+
+    # SMTP password; without one, emails are sent without logging in
+    SMTP_PASSWORD: Optional[str] = None  #: :no-index:
+
+    # Upgrade the SMTP connection with STARTTLS, e.g. on port 587
+    SMTP_STARTTLS: bool = False  #: :no-index:
+
+    # Maximum number of emails the outbox worker sends per batch
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50  #: :no-index:
+
+    # Attempts before an email is moved to the dead letter list
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5  #: :no-index:
+
+    # Seconds between publications of each worker's metrics to Redis, so that
+    # /metrics covers every worker; 0 serves the answering worker's metrics only
+    METRICS_PUBLISH_INTERVAL: float = 5.0  #: :no-index:
+
     class ConfigDict:
         # Specify that environment variables are loaded from the .env file
         env_file = ".env"
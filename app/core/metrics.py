@@ -0,0 +1,362 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import redis
+from app.config import settings
+from app.database.database import get_pool_stats
+from app.database.replicas import replica_router
+from app.services import redis_cache
+from app.services.redis_client import redis_command_latency
+from app.utils.metrics import (
+    CounterFamily,
+    Gauge,
+    HistogramFamily,
+    counter_samples,
+    histogram_samples,
+    metric,
+)
+from app.utils.token_cache import token_cache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bucket bounds of the request duration histogram in seconds
+REQUEST_DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+# Bucket bounds of the response size histogram in bytes
+RESPONSE_SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Route label of requests no route matched, so unknown paths cannot add labels
+UNMATCHED_ROUTE = "unmatched"
+
+# Prefix of the Redis keys the workers publish their metrics under
+WORKER_KEY_PREFIX = "metrics:worker:"
+
+# Sorted set of the workers publishing metrics, scored by their last publication
+WORKERS_KEY = "metrics:workers"
+
+# Identifies this worker process in the published metrics
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Request metrics of this process
+http_requests_total = CounterFamily(("method", "route", "status"))
+http_request_duration = HistogramFamily(("method", "route"), REQUEST_DURATION_BUCKETS)
+http_response_size = HistogramFamily(("method", "route"), RESPONSE_SIZE_BUCKETS)
+http_requests_in_progress = Gauge()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the count, duration and response size of requests.
+
+    Requests are labelled with the path template of their route (e.g.
+    `/contacts/{contact_id}`) rather than the requested path. Recording a
+    request costs a few dictionary lookups and lock-protected increments in
+    this process; nothing is shared between workers on the request path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_and_record(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        http_requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            duration = time.perf_counter() - start
+            http_requests_in_progress.dec()
+            # The router stores the matched route in the scope it was given
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests_total.labels(method, route, str(status)).inc()
+            http_request_duration.labels(method, route).observe(duration)
+            http_response_size.labels(method, route).observe(size)
+
+
+def _histogram_family_samples(family: HistogramFamily) -> list:
+    samples = []
+    for values, snapshot in family.snapshot().items():
+        samples.extend(
+            histogram_samples(dict(zip(family.label_names, values)), snapshot)
+        )
+    return samples
+
+
+def _pool_metrics() -> list:
+    pools = {**get_pool_stats(), **replica_router.get_pool_stats()}
+    gauges = {
+        "size": "Configured size of the connection pool.",
+        "checked_out": "Connections checked out of the pool.",
+        "checked_in": "Idle connections in the pool.",
+        "overflow": "Connections opened beyond the pool size.",
+    }
+    metrics = [
+        metric(
+            f"db_pool_{name}",
+            "gauge",
+            help_text,
+            [["", {"pool": pool}, stats[name]] for pool, stats in pools.items()],
+        )
+        for name, help_text in gauges.items()
+    ]
+    metrics.append(
+        metric(
+            "db_pool_timeouts_total",
+            "counter",
+            "Checkouts that timed out waiting for a connection.",
+            [["", {"pool": pool}, stats["timeouts"]] for pool, stats in pools.items()],
+        )
+    )
+    wait_samples = []
+    for pool, stats in pools.items():
+        wait_samples.extend(histogram_samples({"pool": pool}, stats["wait_seconds"]))
+    metrics.append(
+        metric(
+            "db_pool_wait_seconds",
+            "histogram",
+            "Time spent waiting for a connection from the pool.",
+            wait_samples,
+        )
+    )
+    return metrics
+
+
+def collect_metrics() -> list:
+    """
+    Collect the current metrics of this worker process.
+
+    Caches report hit and miss counters rather than ratios, so that the hit
+    ratio can be computed over any time range and summed across workers.
+
+    Returns:
+        list: The metrics, in the JSON-serializable form of `metric()`.
+    """
+    token_stats = token_cache.stats()
+    contacts_stats = redis_cache.contacts_cache_stats
+    return [
+        metric(
+            "http_requests_total",
+            "counter",
+            "HTTP requests by method, route and status code.",
+            counter_samples(
+                http_requests_total.label_names, http_requests_total.snapshot()
+            ),
+        ),
+        metric(
+            "http_request_duration_seconds",
+            "histogram",
+            "Time taken to answer HTTP requests.",
+            _histogram_family_samples(http_request_duration),
+        ),
+        metric(
+            "http_response_size_bytes",
+            "histogram",
+            "Size of HTTP response bodies.",
+            _histogram_family_samples(http_response_size),
+        ),
+        metric(
+            "http_requests_in_progress",
+            "gauge",
+            "HTTP requests being answered.",
+            [["", {}, http_requests_in_progress.value]],
+        ),
+        metric(
+            "auth_token_cache_requests_total",
+            "counter",
+            "Lookups of verified access tokens in the token cache by result.",
+            [
+                ["", {"result": "hit"}, token_stats["hits"]],
+                ["", {"result": "miss"}, token_stats["misses"]],
+            ],
+        ),
+        metric(
+            "auth_token_cache_size",
+            "gauge",
+            "Verified access tokens in the token cache.",
+            [["", {}, token_stats["size"]]],
+        ),
+        metric(
+            "contacts_cache_requests_total",
+            "counter",
+            "Lookups of cached contact reads in Redis by result.",
+            [
+                ["", {"result": result}, contacts_stats[key]]
+                for key, result in (
+                    ("hits", "hit"),
+                    ("misses", "miss"),
+                    ("errors", "error"),
+                )
+            ],
+        ),
+        *_pool_metrics(),
+        metric(
+            "redis_command_duration_seconds",
+            "histogram",
+            "Latency of Redis commands; pipelines are reported as PIPELINE.",
+            _histogram_family_samples(redis_command_latency),
+        ),
+    ]
+
+
+def _label_worker(metrics: list, worker: str) -> list:
+    for item in metrics:
+        for sample in item["samples"]:
+            sample[1] = {**sample[1], "worker": worker}
+    return metrics
+
+
+async def collect_all_workers() -> list:
+    """
+    Collect the metrics of every worker process.
+
+    Each worker publishes its metrics to Redis every
+    `METRICS_PUBLISH_INTERVAL` seconds and registers in `metrics:workers`;
+    this worker's metrics are collected live. Workers that missed three
+    publications are dropped from the registry. Samples are labelled with the
+    worker they come from. Without publishing, or while Redis cannot be
+    reached, only this worker's metrics are returned.
+
+    Returns:
+        list: The metrics of every worker.
+    """
+    local = collect_metrics()
+    if settings.METRICS_PUBLISH_INTERVAL <= 0:
+        return local
+    metrics = _label_worker(local, WORKER_ID)
+    client = redis_cache.async_redis_client
+    stale = time.time() - settings.METRICS_PUBLISH_INTERVAL * 3
+    try:
+        pipeline = client.pipeline(transaction=True)
+        pipeline.zremrangebyscore(WORKERS_KEY, "-inf", stale)
+        pipeline.zrange(WORKERS_KEY, 0, -1)
+        _, registered = await pipeline.execute()
+        workers = [
+            worker.decode("utf-8")
+            for worker in registered
+            if worker.decode("utf-8") != WORKER_ID
+        ]
+        published = (
+            await client.mget([f"{WORKER_KEY_PREFIX}{worker}" for worker in workers])
+            if workers
+            else []
+        )
+    except (redis.RedisError, OSError) as e:
+        logger.warning(f"Metrics of other workers unavailable: {e}")
+        return metrics
+    for worker, data in zip(workers, published):
+        if data is not None:
+            metrics.extend(_label_worker(json.loads(data), worker))
+    return metrics
+
+
+class MetricsPublisher:
+    """
+    Background task publishing this worker's metrics to Redis.
+
+    The metrics are stored under `metrics:worker:{host}:{pid}`, and the worker
+    is registered in the `metrics:workers` sorted set scored by the time of
+    publication. Both expire after three missed publications, so workers that
+    stopped drop out of `/metrics` on their own.
+    """
+
+    def __init__(self):
+        self._task = None
+
+    async def publish_once(self) -> None:
+        """
+        Publish the current metrics of this worker.
+
+        Returns:
+            None
+        """
+        interval = settings.METRICS_PUBLISH_INTERVAL
+        pipeline = redis_cache.async_redis_client.pipeline(transaction=True)
+        pipeline.set(
+            f"{WORKER_KEY_PREFIX}{WORKER_ID}",
+            json.dumps(collect_metrics()),
+            px=int(interval * 3000),
+        )
+        pipeline.zadd(WORKERS_KEY, {WORKER_ID: time.time()})
+        await pipeline.execute()
+
+    async def run(self) -> None:
+        """
+        Publish the metrics every `METRICS_PUBLISH_INTERVAL` seconds until cancelled.
+
+        Returns:
+            None
+        """
+        while True:
+            try:
+                await self.publish_once()
+            except (redis.RedisError, OSError) as e:
+                logger.warning(f"Could not publish metrics: {e}")
+            await asyncio.sleep(settings.METRICS_PUBLISH_INTERVAL)
+
+    def start(self) -> None:
+        """
+        Start publishing on the running event loop, unless publishing is disabled.
+
+        Returns:
+            None
+        """
+        if self._task is None and settings.METRICS_PUBLISH_INTERVAL > 0:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stop publishing and withdraw this worker's metrics.
+
+        Returns:
+            None
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            pipeline = redis_cache.async_redis_client.pipeline(transaction=True)
+            pipeline.delete(f"{WORKER_KEY_PREFIX}{WORKER_ID}")
+            pipeline.zrem(WORKERS_KEY, WORKER_ID)
+            await pipeline.execute()
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Could not withdraw published metrics: {e}")
+
+
+# Publisher of this worker's metrics
+metrics_publisher = MetricsPublisher()
@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi.middleware import SlowAPIMiddleware
-from app.utils.limiter import limiter
+from app.core.metrics import MetricsMiddleware
+from app.core.server_timing import ServerTimingMiddleware
+from app.utils.limiter import RateLimitMiddleware, limiter
 import logging
 
 # Configure logging for the middleware module
@@ -16,6 +17,9 @@ def add_middlewares(app: FastAPI):
     It includes:
     - CORS middleware to handle Cross-Origin Resource Sharing.
     - SlowAPI middleware for rate limiting.
+    - Server-Timing middleware reporting the database statements of each request.
+    - Metrics middleware recording every request, added last so that it
+      also measures the time spent in the other middleware.
 
     Args:
         app (FastAPI): The FastAPI application instance to which middleware will be added.
@@ -34,5 +38,15 @@ def add_middlewares(app: FastAPI):
     # Add SlowAPI middleware for rate limiting
     logger.info("Adding SlowAPI middleware...")
     app.state.limiter = limiter  # Attach the rate limiter instance to the app state
-    app.add_middleware(SlowAPIMiddleware)
+    app.add_middleware(RateLimitMiddleware)
     logger.info("SlowAPI middleware added successfully.")
+
+    # Add Server-Timing middleware to report the database work of each request
+    logger.info("Adding Server-Timing middleware...")
+    app.add_middleware(ServerTimingMiddleware)
+    logger.info("Server-Timing middleware added successfully.")
+
+    # Add metrics middleware, outermost, to record every request
+    logger.info("Adding metrics middleware...")
+    app.add_middleware(MetricsMiddleware)
+    logger.info("Metrics middleware added successfully.")
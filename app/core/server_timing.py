@@ -0,0 +1,55 @@
+import logging
+from app.config import settings
+from app.database.query_stats import start_request
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware reporting the database work of each request.
+
+    The number of statements and their total duration are sent in a
+    `Server-Timing` header (`db;desc="3 queries";dur=4.2`), which browser
+    developer tools show next to the request. Statement shapes run more than
+    `DB_REPEATED_QUERY_THRESHOLD` times in one request, typically lazy loads
+    of a relationship in a loop, are logged as possible N+1 queries.
+
+    Statements run after the response headers were sent, e.g. while
+    streaming, are not included in the header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_request()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = (
+                    f'db;desc="{stats.count} queries";'
+                    f"dur={stats.duration * 1000:.1f}"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", header.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            threshold = settings.DB_REPEATED_QUERY_THRESHOLD
+            if threshold > 0:
+                route = getattr(scope.get("route"), "path", scope["path"])
+                for shape, runs in stats.repeated_shapes(threshold).items():
+                    logger.warning(
+                        f"Possible N+1 query in {scope['method']} {route}: "
+                        f"ran {runs} times: {shape}"
+                    )
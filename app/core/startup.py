@@ -1,4 +1,6 @@
-from app.database.database import Base, engine
+from app.database.database import Base, async_engine, engine
+from app.database.schema import ensure_contacts_schema
+from app.services.search import ensure_search_index
 import logging
 
 # Configure logger for this module
@@ -23,9 +25,36 @@ def initialize_database():
         # Create all tables defined in the SQLAlchemy models
         Base.metadata.create_all(bind=engine)
 
+        # Upgrade databases created by earlier releases: new columns and
+        # indexes of existing tables, and the search index
+        with engine.begin() as connection:
+            ensure_contacts_schema(connection)
+            ensure_search_index(connection)
+
         # Log success message
         logger.info("Database tables created successfully.")
     except Exception as e:
         # Log the error and re-raise the exception
         logger.error(f"Failed to create database tables: {e}")
         raise
+
+
+async def initialize_async_database():
+    """
+    Create and upgrade the tables through the async engine too.
+
+    Both engines normally share one database, so the statements find
+    everything in place. An in-memory SQLite database is private to its
+    engine, though, and the async routes would see no tables without this.
+
+    Raises:
+        Exception: If table creation fails, the exception is logged and re-raised.
+    """
+    try:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.run_sync(ensure_contacts_schema)
+            await connection.run_sync(ensure_search_index)
+    except Exception as e:
+        logger.error(f"Failed to create database tables (async): {e}")
+        raise
@@ -1,9 +1,14 @@
 import os
 import logging
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
+from app.config import settings
+from app.database.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.database.query_stats import instrument_engine
 
 # Load environment variables from a .env file
 load_dotenv()
@@ -20,6 +25,33 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in the environment variables.")
 
 
+def get_pool_options(url: str) -> dict:
+    """
+    Return the connection pool options of an engine for a non-SQLite database.
+
+    The pool is sized and tuned by the `DB_POOL_*` settings. Each worker
+    process has a sync and an async engine, so a deployment opens up to
+    `workers * 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW)` connections.
+
+    Args:
+        url (str): The database URL of the engine.
+
+    Returns:
+        dict: Keyword arguments for `create_engine` or `create_async_engine`.
+    """
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    # Only psycopg2 has several strategies for executemany()
+    if make_url(url).get_driver_name() == "psycopg2":
+        options["executemany_mode"] = settings.DB_EXECUTEMANY_MODE
+    return options
+
+
 def get_engine():
     """
     Create and return a SQLAlchemy engine based on the DATABASE_URL.
@@ -44,17 +76,86 @@ def get_engine():
             )
         # Configuration for non-SQLite databases
         logger.info("Using non-SQLite database.")
-        return create_engine(DATABASE_URL)
+        return create_engine(
+            DATABASE_URL,
+            poolclass=InstrumentedQueuePool,
+            **get_pool_options(DATABASE_URL),
+        )
     except Exception as e:
         # Log and re-raise any exceptions during engine creation
         logger.error(f"Failed to create database engine: {e}")
         raise
 
 
+# Async drivers used for each database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Convert a database URL to the equivalent URL for an async driver.
+
+    SQLite URLs use `aiosqlite` and PostgreSQL URLs use `asyncpg`; URLs of
+    other backends are returned unchanged.
+
+    Args:
+        url (str): The synchronous database URL.
+
+    Returns:
+        str: The database URL for the async engine.
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    """
+    Create and return a SQLAlchemy async engine based on the DATABASE_URL.
+
+    Note that an in-memory SQLite database is not shared between the sync
+    and the async engine.
+
+    Returns:
+        sqlalchemy.ext.asyncio.AsyncEngine: SQLAlchemy async engine instance.
+
+    Raises:
+        Exception: If the engine creation fails.
+    """
+    try:
+        url = get_async_database_url(DATABASE_URL)
+        if DATABASE_URL.startswith("sqlite://"):
+            # Special configuration for SQLite databases
+            logger.info("Using SQLite database (async).")
+            return create_async_engine(
+                url,
+                connect_args={"check_same_thread": False},  # Required for SQLite
+                poolclass=StaticPool,  # Use a static pool for SQLite
+            )
+        # Configuration for non-SQLite databases
+        logger.info("Using non-SQLite database (async).")
+        return create_async_engine(
+            url, poolclass=InstrumentedAsyncQueuePool, **get_pool_options(url)
+        )
+    except Exception as e:
+        # Log and re-raise any exceptions during engine creation
+        logger.error(f"Failed to create async database engine: {e}")
+        raise
+
+
 # Initialize the database engine
 try:
     engine = get_engine()
-    logger.info("Database engine created successfully.")
+    async_engine = get_async_engine()
+    # Time every statement for the per-request statistics and slow query log
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    logger.info("Database engines created successfully.")
 except Exception as e:
     # Log critical errors and terminate if the engine cannot be created
     logger.critical(f"Failed to initialize database engine: {e}")
@@ -65,3 +166,22 @@ Base = declarative_base()
 
 # Session factory for creating database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Session factory for creating async database sessions
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+def get_pool_stats() -> dict:
+    """
+    Return the live statistics of the connection pools of this process.
+
+    Returns:
+        dict: The statistics of each engine's pool by engine name; engines
+        without an instrumented pool (SQLite) are left out.
+    """
+    pools = {"sync": engine.pool, "async": async_engine.pool}
+    return {
+        name: pool.stats() for name, pool in pools.items() if hasattr(pool, "stats")
+    }
@@ -0,0 +1,58 @@
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.utils.metrics import Histogram
+
+# Bucket bounds of the connection wait time histogram in seconds
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class _InstrumentedPoolMixin:
+    """
+    Records how long checkouts wait for a connection and how often they time out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram(POOL_WAIT_BUCKETS)
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        """
+        Return the live statistics of the pool.
+
+        Returns:
+            dict: The pool size, the connections checked out, idle in the pool
+            and opened beyond the pool size, the number of checkout timeouts
+            and the histogram of checkout wait times in seconds.
+        """
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "timeouts": self.timeouts,
+            "wait_seconds": self.wait_time.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """
+    `QueuePool` publishing live statistics through `stats()`.
+    """
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """
+    `AsyncAdaptedQueuePool` publishing live statistics through `stats()`.
+    """
@@ -0,0 +1,143 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Patterns replaced by "?" to reduce a statement to its shape: string
+# literals, numbers and the bind parameter styles of the supported drivers
+_LITERALS = re.compile(
+    r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|%s|\$\d+|(?<!:):\w+"
+)
+
+# Lists of parameters, e.g. of expanding IN clauses or multi-row VALUES
+_PARAMETER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """
+    The statements run while answering one request.
+
+    Attributes:
+        count (int): The number of statements run.
+        duration (float): Their total duration in seconds.
+        shapes (Counter): The number of runs of each normalized statement.
+    """
+
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, shape: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[shape] += 1
+
+    def repeated_shapes(self, threshold: int) -> dict:
+        """
+        Return the statement shapes run more than `threshold` times.
+
+        Args:
+            threshold (int): The highest number of runs not reported.
+
+        Returns:
+            dict: The number of runs of each such shape.
+        """
+        return {shape: n for shape, n in self.shapes.items() if n > threshold}
+
+
+# Statistics of the request being answered, None outside requests
+_current = ContextVar("query_stats", default=None)
+
+
+def start_request() -> QueryStats:
+    """
+    Start collecting the statements of the current request.
+
+    The statistics follow the request into the tasks and worker threads
+    started from it, as these copy the context.
+
+    Returns:
+        QueryStats: The statistics, updated as statements run.
+    """
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape, without values or parameters.
+
+    Statements that differ only in literals, bind parameters or the length of
+    parameter lists normalize to the same string.
+
+    Args:
+        statement (str): The SQL statement.
+
+    Returns:
+        str: The statement on one line, with every value replaced by "?".
+    """
+    shape = _LITERALS.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    shape = _PARAMETER_LIST.sub("?", shape)
+    return _ROW_LIST.sub("(?)", shape)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is None and duration <= settings.DB_SLOW_QUERY_THRESHOLD:
+        return
+    shape = normalize_sql(statement)
+    if stats is not None:
+        stats.record(shape, duration)
+    if duration > settings.DB_SLOW_QUERY_THRESHOLD:
+        logger.warning(f"Slow query ({duration * 1000:.1f} ms): {shape}")
+
+
+def _handle_error(context):
+    # Failed statements never reach after_cursor_execute
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Time every statement run by an engine.
+
+    Statements are recorded in the statistics of the current request, and
+    statements slower than `DB_SLOW_QUERY_THRESHOLD` are logged. Pass the
+    `sync_engine` of async engines.
+
+    Args:
+        engine (Engine): The engine to instrument.
+
+    Returns:
+        None
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
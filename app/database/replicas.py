@@ -0,0 +1,150 @@
+import itertools
+import logging
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.config import settings
+from app.database.database import (
+    AsyncSessionLocal,
+    SessionLocal,
+    get_async_database_url,
+    get_pool_options,
+)
+from app.database.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.database.query_stats import instrument_engine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    """
+    A read replica with its sync and async engines and its health state.
+
+    Attributes:
+        url (str): The database URL of the replica.
+        engine (Engine): The sync engine.
+        async_engine (AsyncEngine): The async engine.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(
+            url, poolclass=InstrumentedQueuePool, **get_pool_options(url)
+        )
+        async_url = get_async_database_url(url)
+        self.async_engine = create_async_engine(
+            async_url,
+            poolclass=InstrumentedAsyncQueuePool,
+            **get_pool_options(async_url),
+        )
+        instrument_engine(self.engine)
+        instrument_engine(self.async_engine.sync_engine)
+        self._down_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self, error: Exception) -> None:
+        """
+        Take the replica out of rotation for `DB_REPLICA_RETRY_INTERVAL` seconds.
+
+        Args:
+            error (Exception): The error the replica failed with.
+
+        Returns:
+            None
+        """
+        self._down_until = time.monotonic() + settings.DB_REPLICA_RETRY_INTERVAL
+        logger.warning(f"Read replica {self.name} unavailable: {error}")
+
+
+class ReplicaRouter:
+    """
+    Balances read sessions across the healthy replicas, round robin.
+
+    Replicas are checked when a session is opened: the session connects
+    right away, and a replica that cannot be reached is skipped and taken
+    out of rotation for a while. When no replica is available, or none is
+    configured, sessions are opened on the primary.
+
+    Attributes:
+        replicas (list): The configured replicas.
+    """
+
+    def __init__(self, urls: list):
+        self.replicas = [Replica(url) for url in urls]
+        self._counter = itertools.count()
+
+    def _candidates(self) -> list:
+        if not self.replicas:
+            return []
+        start = next(self._counter) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.is_healthy()]
+
+    def open_session(self, primary: bool = False):
+        """
+        Open a sync session on a healthy replica, or on the primary.
+
+        Args:
+            primary (bool): Skip the replicas, e.g. to read the user's own writes.
+
+        Returns:
+            Session: The connected session.
+        """
+        for replica in [] if primary else self._candidates():
+            db = SessionLocal(bind=replica.engine)
+            try:
+                db.connection()
+                return db
+            except (DBAPIError, OSError) as e:
+                db.close()
+                replica.mark_down(e)
+        return SessionLocal()
+
+    async def open_async_session(self, primary: bool = False):
+        """
+        Open an async session on a healthy replica, or on the primary.
+
+        Args:
+            primary (bool): Skip the replicas, e.g. to read the user's own writes.
+
+        Returns:
+            AsyncSession: The connected session.
+        """
+        for replica in [] if primary else self._candidates():
+            db = AsyncSessionLocal(bind=replica.async_engine)
+            try:
+                await db.connection()
+                return db
+            except (DBAPIError, OSError) as e:
+                await db.close()
+                replica.mark_down(e)
+        return AsyncSessionLocal()
+
+    def get_pool_stats(self) -> dict:
+        """
+        Return the live statistics of the replicas' connection pools.
+
+        Returns:
+            dict: The statistics of each pool by replica and engine name.
+        """
+        return {
+            f"{replica.name} ({kind})": engine.pool.stats()
+            for replica in self.replicas
+            for kind, engine in (
+                ("sync", replica.engine),
+                ("async", replica.async_engine),
+            )
+            if hasattr(engine.pool, "stats")
+        }
+
+
+# Router of the read-only sessions of the application
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
@@ -0,0 +1,61 @@
+import logging
+from sqlalchemy import extract, inspect, text, update
+from app.models.contacts import Contact
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Indexes of the contacts table added after it was first released, created on
+# existing databases at startup
+CONTACT_INDEXES = (
+    "ix_contacts_owner_id_id",
+    "ix_contacts_owner_id_birthday_md",
+    "ix_contacts_owner_id_email",
+    "ix_contacts_owner_id_updated_at",
+)
+
+
+def _add_birthday_md(connection) -> None:
+    logger.info("Adding contacts.birthday_md and filling it from the birthdays...")
+    connection.execute(text("ALTER TABLE contacts ADD COLUMN birthday_md INTEGER"))
+    contacts = Contact.__table__
+    connection.execute(
+        update(contacts)
+        .where(contacts.c.birthday_md.is_(None))
+        .values(
+            birthday_md=extract("month", contacts.c.birthday) * 100
+            + extract("day", contacts.c.birthday)
+        )
+    )
+    # SQLite cannot add the constraint to an existing column; the model sets
+    # the key whenever a birthday is set
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text("ALTER TABLE contacts ALTER COLUMN birthday_md SET NOT NULL")
+        )
+
+
+def ensure_contacts_schema(connection) -> None:
+    """
+    Upgrade a contacts table created by an earlier release.
+
+    `create_all` skips tables that exist, so columns and indexes added to the
+    model since are added here: the `birthday_md` column is added and filled
+    from the birthdays, and missing indexes of `CONTACT_INDEXES` are created.
+    Every step checks the schema first, so this runs at each startup.
+
+    Args:
+        connection (Connection): A connection in a transaction.
+
+    Returns:
+        None
+    """
+    inspector = inspect(connection)
+    columns = {column["name"] for column in inspector.get_columns("contacts")}
+    if "birthday_md" not in columns:
+        _add_birthday_md(connection)
+    existing = {index["name"] for index in inspector.get_indexes("contacts")}
+    for index in Contact.__table__.indexes:
+        if index.name in CONTACT_INDEXES and index.name not in existing:
+            logger.info(f"Creating index {index.name}...")
+            index.create(connection)
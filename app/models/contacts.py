@@ -1,11 +1,28 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship, validates
 from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional
 from datetime import datetime, date
 from app.database.database import Base
 
 
+def birthday_key(value: date) -> int:
+    """
+    Compute the month-and-day key of a birthday.
+
+    The key is `month * 100 + day` (e.g. 1231 for December 31), so keys sort
+    in calendar order regardless of the year and a range of days maps to a
+    range of keys.
+
+    Args:
+        value (date): The birthday (or any date).
+
+    Returns:
+        int: The month-and-day key.
+    """
+    return value.month * 100 + value.day
+
+
 class Contact(Base):
     """
     SQLAlchemy model for the Contact entity.
@@ -20,6 +37,7 @@ class Contact(Base):
         email (str): The contact's email address.
         phone (str): The contact's phone number.
         birthday (datetime): The contact's birthday.
+        birthday_md (int): The month-and-day key of the birthday, kept in sync with `birthday`.
         owner_id (int): Foreign key referencing the User who owns this contact.
         owner (relationship): SQLAlchemy relationship to the User entity.
         created_at (datetime): Timestamp when the contact was created.
@@ -27,7 +45,17 @@ class Contact(Base):
     """
 
     __tablename__ = "contacts"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Composite index backing keyset pagination of a user's contacts
+        Index("ix_contacts_owner_id_id", "owner_id", "id"),
+        # Composite index backing the upcoming-birthdays range scan
+        Index("ix_contacts_owner_id_birthday_md", "owner_id", "birthday_md"),
+        # Composite index backing upserts by email
+        Index("ix_contacts_owner_id_email", "owner_id", "email"),
+        # Composite index backing list version stamps and staleness filters
+        Index("ix_contacts_owner_id_updated_at", "owner_id", "updated_at"),
+        {"extend_existing": True},
+    )
 
     # Primary key for the contact
     id = Column(Integer, primary_key=True, index=True)
@@ -41,6 +69,8 @@ class Contact(Base):
     phone = Column(String(20), nullable=False)
     # Contact's birthday (required)
     birthday = Column(DateTime, nullable=False)
+    # Month-and-day key of the birthday (see `birthday_key`)
+    birthday_md = Column(Integer, nullable=False)
     # Foreign key to the User entity
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     # Relationship to the User entity
@@ -50,6 +80,15 @@ class Contact(Base):
     # Timestamp when the contact was last updated
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @validates("birthday")
+    def _sync_birthday_md(self, key, value):
+        """
+        Keep `birthday_md` in sync whenever the birthday is set.
+        """
+        if value is not None:
+            self.birthday_md = birthday_key(value)
+        return value
+
 
 class ContactCreate(BaseModel):
     """
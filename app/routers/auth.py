@@ -1,19 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.schemas.user import Token
-from app.services.redis_cache import redis_client
-from app.utils.security import create_refresh_token, verify_refresh_token
+from typing import List
+from app.schemas.user import SessionResponse, Token
+from app.services.redis_cache import (
+    invalidate_user,
+    redis_client,
+    revoke_user_tokens,
+)
+from app.services.sessions import session_store
+from app.utils.security import (
+    REFRESH_TOKEN_EXPIRE,
+    create_refresh_token,
+    verify_refresh_claims,
+)
+from app.services import password_hasher, token_denylist
 from app.services.auth import (
     authenticate_user,
     create_access_token,
-    hash_password,
 )
-from app.utils.dependencies import get_db
+from app.services.tokens import TokenError, token_service
+from app.utils.dependencies import admin_required, get_current_user, get_db
+from app.utils.token_cache import token_cache
 from app.models.user import User
 from app.services.email import send_password_reset_email
-from app.config import settings
 import logging
+import time
 import uuid
 
 
@@ -25,14 +38,20 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/token", response_model=Token, status_code=200)
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
     """
     Authenticate a user and return an access token and refresh token.
 
+    The refresh token opens a session; the session and the user snapshot
+    are written to Redis in a single round trip. Blocking database and Redis
+    calls run in the threadpool, so logins never block the event loop.
+
     Args:
+        request (Request): The HTTP request object.
         form_data (OAuth2PasswordRequestForm): The form data containing username and password.
         db (Session): The database session dependency.
 
@@ -43,20 +62,26 @@ def login(
         HTTPException: If authentication fails due to invalid credentials.
     """
     logger.info(f"Authentication attempt for username: {form_data.username}")
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         logger.warning(f"Authentication failed for username: {form_data.username}")
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Generate access and refresh tokens
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email})
-
-    # Cache user ID and refresh token in Redis
-    redis_client.set(f"user:{user.email}", user.id, ex=3600)  # Cache for 1 hour
-    redis_client.set(
-        f"refresh_token:{user.email}", refresh_token, ex=86400
-    )  # Cache refresh token for 24 hours
+    session_id = uuid.uuid4().hex
+    access_token = create_access_token(data={"sub": user.email}, user=user)
+    refresh_token = create_refresh_token(
+        data={"sub": user.email, "sid": session_id}
+    )
+
+    # Store the session and cache the user snapshot in Redis
+    await run_in_threadpool(
+        session_store.create,
+        user,
+        session_id,
+        int(time.time() + REFRESH_TOKEN_EXPIRE.total_seconds()),
+        request.headers.get("user-agent"),
+    )
 
     logger.info(f"User {user.email} authenticated successfully. Tokens generated.")
     return {
@@ -74,6 +99,9 @@ def refresh_token(
     """
     Refresh the access token using a valid refresh token.
 
+    The refresh token's session must still be live in the session store,
+    so revoked sessions cannot mint new access tokens.
+
     Args:
         refresh_token (str): The refresh token provided by the user.
         db (Session): The database session dependency.
@@ -85,13 +113,21 @@ def refresh_token(
         HTTPException: If the refresh token is invalid or expired.
     """
     logger.info("Refresh token attempt.")
-    email = verify_refresh_token(refresh_token)
-    if not email:
+    claims = verify_refresh_claims(refresh_token)
+    if not claims or not claims.get("sid"):
         logger.warning("Invalid refresh token provided.")
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+    email = claims["sub"]
+    if not session_store.validate(email, claims["sid"]):
+        logger.warning(f"Refresh token of a revoked or expired session: {email}")
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    # Generate a new access token
-    access_token = create_access_token(data={"sub": email})
+    # Generate a new access token carrying the user's current claims
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        logger.warning(f"Refresh token of unknown user: {email}")
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    access_token = create_access_token(data={"sub": email}, user=user)
     logger.info(f"Access token refreshed successfully for user: {email}")
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -111,23 +147,35 @@ async def password_reset_request(email: str, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If the user with the provided email is not found.
     """
-    user = db.query(User).filter(User.email == email).first()
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == email).first()
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Generate a unique reset token and store it in Redis
     reset_token = str(uuid.uuid4())
-    redis_client.set(
-        f"password_reset:{reset_token}", user.email, ex=3600
+    await run_in_threadpool(
+        redis_client.set, f"password_reset:{reset_token}", user.email, ex=3600
     )  # Token valid for 1 hour
 
-    # Construct the password reset URL and send it via email
-    reset_url = f"{settings.BASE_URL}/auth/password-reset?token={reset_token}"
-    await send_password_reset_email(email, reset_url)
+    # Queue the email with the password reset link
+    await send_password_reset_email(email, reset_token)
 
     return {"message": "Password reset link has been sent to your email."}
 
 
+def _finish_password_reset(db: Session, user: User, token: str) -> None:
+    # Commit the new password, then drop everything issued with the old one
+    db.commit()
+    invalidate_user(user.email)
+    revoke_user_tokens(user.id)
+    session_store.revoke_all(user.email)
+
+    # Remove the reset token from Redis
+    redis_client.delete(f"password_reset:{token}")
+
+
 @router.post("/password-reset")
 async def password_reset(token: str, new_password: str, db: Session = Depends(get_db)):
     """
@@ -145,20 +193,118 @@ async def password_reset(token: str, new_password: str, db: Session = Depends(ge
         HTTPException: If the reset token is invalid or expired, or if the user is not found.
     """
     # Retrieve the email associated with the reset token from Redis
-    email = redis_client.get(f"password_reset:{token}")
+    email = await run_in_threadpool(redis_client.get, f"password_reset:{token}")
     if not email:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
 
     # Find the user in the database
-    user = db.query(User).filter(User.email == email.decode("utf-8")).first()
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == email.decode("utf-8")).first()
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Update the user's password and commit the changes
-    user.password = hash_password(new_password)
-    db.commit()
-
-    # Remove the reset token from Redis
-    redis_client.delete(f"password_reset:{token}")
+    # Update the user's password off the event loop
+    user.hashed_password = await password_hasher.hash_password(new_password)
+    await run_in_threadpool(_finish_password_reset, db, user, token)
 
     return {"message": "Password has been reset successfully."}
+
+
+@router.post("/logout")
+def logout(token: str, refresh_token: str = None):
+    """
+    Revoke the access token and, if given, the refresh token of a session.
+
+    Revoked tokens are rejected by every worker until they expire, and the
+    refresh token's session is removed from the session store.
+
+    Args:
+        token (str): The access token to revoke.
+        refresh_token (str, optional): The refresh token to revoke.
+
+    Returns:
+        dict: A message confirming the logout.
+
+    Raises:
+        HTTPException: If a token is invalid or expired.
+    """
+    for value in filter(None, (token, refresh_token)):
+        try:
+            payload = token_service.verify(value)
+        except TokenError as e:
+            logger.warning(f"Logout with an invalid token: {e}")
+            raise HTTPException(status_code=401, detail="Invalid token")
+        if payload.get("jti"):
+            token_denylist.revoke(payload["jti"], payload["exp"])
+        if payload.get("sid"):
+            session_store.revoke(payload["sub"], payload["sid"])
+    logger.info("User logged out.")
+    return {"message": "Logged out successfully."}
+
+
+@router.get("/sessions", response_model=List[SessionResponse])
+def list_sessions(current_user: User = Depends(get_current_user)):
+    """
+    List the live login sessions of the current user.
+
+    Args:
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        List[SessionResponse]: The sessions, oldest first.
+    """
+    return session_store.list_sessions(current_user.email)
+
+
+@router.delete("/sessions/{session_id}")
+def revoke_session(
+    session_id: str, current_user: User = Depends(get_current_user)
+):
+    """
+    Revoke one login session of the current user.
+
+    The session's refresh token stops working; access tokens already issued
+    remain valid until they expire.
+
+    Args:
+        session_id (str): The ID of the session to revoke.
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        dict: A message confirming the revocation.
+
+    Raises:
+        HTTPException: If the user has no such session.
+    """
+    if not session_store.revoke(current_user.email, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"message": "Session revoked."}
+
+
+@router.delete("/sessions")
+def revoke_all_sessions(current_user: User = Depends(get_current_user)):
+    """
+    Revoke every login session of the current user.
+
+    Args:
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        dict: The number of revoked sessions.
+    """
+    return {"revoked": session_store.revoke_all(current_user.email)}
+
+
+@router.get("/token-cache/stats")
+def token_cache_stats(current_user: User = Depends(admin_required)):
+    """
+    Report the usage of this process's verified-token cache (admin only).
+
+    Args:
+        current_user (User): The currently authenticated admin.
+
+    Returns:
+        dict: The size, hit, miss, eviction and expiration counters of the cache.
+    """
+    return token_cache.stats()
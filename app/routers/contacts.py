@@ -1,10 +1,44 @@
 from datetime import date, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
-from app.schemas.contact import ContactCreate, ContactResponse
-from app.models.contacts import Contact
-from app.utils.dependencies import get_db, get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.schemas.contact import (
+    ContactBulkCreate,
+    ContactBulkResult,
+    ContactBulkSelector,
+    ContactBulkUpdate,
+    ContactBulkWriteResult,
+    ContactCreate,
+    ContactPage,
+    ContactResponse,
+    ContactUpdate,
+)
+from app.models.contacts import Contact, birthday_key
+from app.utils.dependencies import (
+    admin_required,
+    get_async_db,
+    get_async_read_db,
+    get_current_user_async,
+)
+from app.services import contacts as contacts_service
+from app.services import redis_cache
+from app.services.search import get_search_backend
+from app.utils.etag import etag_matches, strong_etag, weak_etag
+from app.utils.limiter import rate_limit_cost
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+import calendar
+import csv
+import io
+import json
 import logging
 
 # Configure logging
@@ -12,64 +46,505 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Columns written by the export endpoint, in output order
+EXPORT_COLUMNS = (
+    Contact.id,
+    Contact.first_name,
+    Contact.last_name,
+    Contact.email,
+    Contact.phone,
+    Contact.birthday,
+)
+
+# Number of rows fetched from the server-side cursor per batch during export
+EXPORT_BATCH_SIZE = 1000
+
+# Media types of the supported export formats
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def check_list_etag(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    """
+    Dependency answering conditional GETs of the contact list endpoints.
+
+    The weak ETag is derived from the user's contacts version stamp, the
+    request's query parameters and the current date (birthday windows move
+    daily). If it matches `If-None-Match`, a 304 response is returned
+    before the list is queried or serialized.
+
+    Args:
+        request (Request): The HTTP request.
+        response (Response): The response whose headers receive the ETag.
+        db (AsyncSession): The read-only database session (replica or primary).
+        current_user: The currently authenticated user.
+
+    Raises:
+        HTTPException: A 304 Not Modified response if the client's copy is current.
+    """
+    updated_at, count = await contacts_service.contacts_version(db, current_user.id)
+    params = sorted(
+        (key, value)
+        for key, value in request.query_params.multi_items()
+        if key != "token"
+    )
+    etag = weak_etag(
+        current_user.id,
+        request.url.path,
+        params,
+        date.today(),
+        updated_at,
+        count,
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+
+def _page_response(body, response: Response) -> Response:
+    """
+    Wrap a serialized contact page in a response, keeping the list ETag.
+
+    Args:
+        body: The JSON body of the page.
+        response (Response): The response whose headers hold the ETag.
+
+    Returns:
+        Response: The JSON response.
+    """
+    headers = {"ETag": response.headers["etag"]} if "etag" in response.headers else {}
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def _cache_page(key: str, page: dict, response: Response) -> Response:
+    """
+    Serialize a contact page, store it under `key` and return it.
+
+    Args:
+        key (str): The cache key of the page (None if Redis is unavailable).
+        page (dict): The page with `items` and `next_cursor`.
+        response (Response): The response whose headers hold the ETag.
+
+    Returns:
+        Response: The JSON response.
+    """
+    body = ContactPage.model_validate(page, from_attributes=True).model_dump_json()
+    await redis_cache.cache_contacts(key, body)
+    return _page_response(body, response)
+
+
+def _birthday_window(today: date, days: int):
+    """
+    Build the filter matching birthdays from `today` up to `days` days ahead.
+
+    The filter is a range over the indexed `birthday_md` key, split in two
+    when the window wraps from December into January. In common years,
+    February 29 birthdays are treated as falling on February 28.
+
+    Args:
+        today (date): The first day of the window.
+        days (int): The number of days after `today` included in the window.
+
+    Returns:
+        ColumnElement: The filter condition.
+    """
+    if days >= 365:
+        return true()
+    end = today + timedelta(days=days)
+    start_key, end_key = birthday_key(today), birthday_key(end)
+    if end_key == 228 and not calendar.isleap(end.year):
+        end_key = 229
+    if start_key <= end_key:
+        return Contact.birthday_md.between(start_key, end_key)
+    return or_(Contact.birthday_md >= start_key, Contact.birthday_md <= end_key)
+
+
+async def _export_rows(db: AsyncSession, owner_id: int, export_format: str):
+    """
+    Stream a user's contacts in batches formatted as NDJSON or CSV.
+
+    The rows are read through a server-side cursor (`yield_per`), so memory
+    usage is bounded by the batch size rather than the number of contacts.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user whose contacts are exported.
+        export_format (str): The output format, either "ndjson" or "csv".
+
+    Yields:
+        str: Chunks of the formatted export.
+    """
+    names = [column.key for column in EXPORT_COLUMNS]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        # Send the header immediately so the client receives the first byte
+        # before the query runs
+        writer.writerow(names)
+        yield buffer.getvalue()
+
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .where(Contact.owner_id == owner_id)
+        .order_by(Contact.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    # The request's session is closed once the endpoint returns, before the
+    # body is streamed; a closed session reconnects on demand, so it is
+    # closed again here when streaming finishes.
+    try:
+        result = await db.stream(stmt)
+        async for batch in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            for row in batch:
+                values = list(row)
+                values[-1] = values[-1].date().isoformat()
+                if export_format == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(names, values))))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+        await result.close()
+    finally:
+        await db.close()
+
 
 @router.post("/", response_model=ContactResponse, status_code=201)
-def create_contact(
+async def create_contact(
     contact: ContactCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
 ):
     """
     Create a new contact and associate it with the currently authenticated user.
 
     Args:
         contact (ContactCreate): The contact data to create.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         current_user: The currently authenticated user.
 
     Returns:
         ContactResponse: The created contact.
     """
-    new_contact = Contact(**contact.dict(), owner_id=current_user.id)
-    db.add(new_contact)
-    db.commit()
-    db.refresh(new_contact)
+    new_contact = await contacts_service.create_contact(db, current_user.id, contact)
     logger.info(f"Contact created: {new_contact.id} by user {current_user.id}")
     return new_contact
 
 
-@router.get("/", response_model=List[ContactResponse], status_code=200)
-def get_contacts(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+@router.post("/bulk", response_model=ContactBulkResult, status_code=200)
+@rate_limit_cost(10)
+async def bulk_create(
+    payload: ContactBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
 ):
     """
-    Retrieve all contacts associated with the currently authenticated user.
+    Create (or, with `upsert`, update) many contacts in one request.
+
+    Invalid items are reported in `errors` and do not prevent the valid
+    items from being written.
 
     Args:
-        db (Session): The database session.
+        payload (ContactBulkCreate): The contacts to write and the upsert flag.
+        db (AsyncSession): The database session.
         current_user: The currently authenticated user.
 
     Returns:
-        List[ContactResponse]: A list of contacts.
+        ContactBulkResult: The outcome of every item.
     """
-    contacts = db.query(Contact).filter(Contact.owner_id == current_user.id).all()
+    # Validation is CPU-bound, so it runs off the event loop
+    items, errors = await run_in_threadpool(
+        contacts_service.validate_contacts, payload.items
+    )
+    results, rejected = await contacts_service.bulk_create_contacts(
+        db, current_user.id, items, upsert=payload.upsert
+    )
+    errors = sorted(errors + rejected, key=lambda error: error["index"])
+    return {
+        "created": sum(result["status"] == "created" for result in results),
+        "updated": sum(result["status"] == "updated" for result in results),
+        "items": results,
+        "errors": errors,
+    }
+
+
+@router.patch("/bulk", response_model=ContactBulkWriteResult, status_code=200)
+@rate_limit_cost(10)
+async def bulk_update(
+    payload: ContactBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    """
+    Apply the same changes to many contacts with one UPDATE statement.
+
+    Args:
+        payload (ContactBulkUpdate): The contacts to update and the changes to apply.
+        db (AsyncSession): The database session.
+        current_user: The currently authenticated user.
+
+    Returns:
+        ContactBulkWriteResult: The number of updated contacts and, optionally, their IDs.
+
+    Raises:
+        HTTPException: If no changes are given.
+    """
+    if not payload.changes.model_fields_set - {"additional_info"}:
+        raise HTTPException(status_code=422, detail="No changes provided")
+    count, ids = await contacts_service.bulk_update_contacts(
+        db, current_user.id, payload, payload.changes
+    )
+    return {"count": count, "ids": ids}
+
+
+@router.delete("/bulk", response_model=ContactBulkWriteResult, status_code=200)
+@rate_limit_cost(10)
+async def bulk_delete(
+    payload: ContactBulkSelector,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    """
+    Delete many contacts with one DELETE statement.
+
+    Args:
+        payload (ContactBulkSelector): The contacts to delete.
+        db (AsyncSession): The database session.
+        current_user: The currently authenticated user.
+
+    Returns:
+        ContactBulkWriteResult: The number of deleted contacts and, optionally, their IDs.
+    """
+    count, ids = await contacts_service.bulk_delete_contacts(
+        db, current_user.id, payload
+    )
+    return {"count": count, "ids": ids}
+
+
+@router.get(
+    "/",
+    response_model=ContactPage,
+    status_code=200,
+    dependencies=[Depends(check_list_etag)],
+)
+async def get_contacts(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    """
+    Retrieve a page of contacts associated with the currently authenticated user.
+
+    Contacts are ordered by ID and paginated with an opaque cursor, so the cost
+    of fetching a page does not depend on its position. Pages are cached in
+    Redis until the user's contacts change.
+
+    Args:
+        response (Response): The response whose headers hold the ETag.
+        limit (int): The maximum number of contacts to return.
+        cursor (Optional[str]): The `next_cursor` value from the previous page.
+        db (AsyncSession): The read-only database session (replica or primary).
+        current_user: The currently authenticated user.
+
+    Returns:
+        ContactPage: A page of contacts and the cursor for the next page.
+    """
+    key = await redis_cache.contacts_cache_key(
+        current_user.id, "list", limit=limit, cursor=cursor
+    )
+    cached = await redis_cache.get_cached_contacts(key)
+    if cached is not None:
+        return _page_response(cached, response)
+    stmt = select(Contact).where(Contact.owner_id == current_user.id)
+    contacts, next_cursor = await paginate(db, stmt, Contact.id, limit, cursor)
     logger.info(f"Retrieved {len(contacts)} contacts for user {current_user.id}")
-    return contacts
+    return await _cache_page(
+        key, {"items": contacts, "next_cursor": next_cursor}, response
+    )
+
+
+@router.get(
+    "/search",
+    response_model=ContactPage,
+    status_code=200,
+    dependencies=[Depends(check_list_etag)],
+)
+@rate_limit_cost(5)
+async def search_contacts(
+    response: Response,
+    query: str = Query(..., description="Search by first name, last name, or email"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    """
+    Search contacts by first name, last name, or email.
+
+    The search is served by the database's search index (FTS5 on SQLite,
+    `pg_trgm` on PostgreSQL) and results are ordered by relevance. Pages are
+    cached per case-insensitive query until the user's contacts change.
+
+    Args:
+        response (Response): The response whose headers hold the ETag.
+        query (str): The search query.
+        limit (int): The maximum number of contacts to return.
+        cursor (Optional[str]): The `next_cursor` value from the previous page.
+        db (AsyncSession): The read-only database session (replica or primary).
+        current_user: The currently authenticated user.
+
+    Returns:
+        ContactPage: A page of contacts matching the search query.
+    """
+    # Every backend matches case-insensitively
+    key = await redis_cache.contacts_cache_key(
+        current_user.id, "search", query=query.lower(), limit=limit, cursor=cursor
+    )
+    cached = await redis_cache.get_cached_contacts(key)
+    if cached is not None:
+        return _page_response(cached, response)
+    backend = get_search_backend(db.get_bind().dialect.name)
+    after = decode_cursor(cursor, types=(float, int)) if cursor is not None else None
+    stmt = backend.build(current_user.id, query, after).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].rank, rows[-1].Contact.id)
+    contacts = [row.Contact for row in rows]
+    logger.info(
+        f"Search query '{query}' returned {len(contacts)} results for user {current_user.id}"
+    )
+    return await _cache_page(
+        key, {"items": contacts, "next_cursor": next_cursor}, response
+    )
+
+
+@router.get(
+    "/birthdays",
+    response_model=ContactPage,
+    status_code=200,
+    dependencies=[Depends(check_list_etag)],
+)
+async def get_upcoming_birthdays(
+    response: Response,
+    days: int = Query(7, ge=0, le=365, description="Number of days to look ahead"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    """
+    Get contacts whose birthday falls within the next `days` days.
+
+    Pages are cached for the current date until the user's contacts change.
+
+    Args:
+        response (Response): The response whose headers hold the ETag.
+        days (int): The number of days to look ahead (default: 7).
+        limit (int): The maximum number of contacts to return.
+        cursor (Optional[str]): The `next_cursor` value from the previous page.
+        db (AsyncSession): The read-only database session (replica or primary).
+        current_user: The currently authenticated user.
+
+    Returns:
+        ContactPage: A page of contacts with upcoming birthdays.
+    """
+    today = date.today()
+    key = await redis_cache.contacts_cache_key(
+        current_user.id, "birthdays", today=today, days=days, limit=limit, cursor=cursor
+    )
+    cached = await redis_cache.get_cached_contacts(key)
+    if cached is not None:
+        return _page_response(cached, response)
+    stmt = select(Contact).where(
+        Contact.owner_id == current_user.id,
+        _birthday_window(today, days),
+    )
+    contacts, next_cursor = await paginate(db, stmt, Contact.id, limit, cursor)
+    logger.info(
+        f"Retrieved {len(contacts)} upcoming birthdays for user {current_user.id}"
+    )
+    return await _cache_page(
+        key, {"items": contacts, "next_cursor": next_cursor}, response
+    )
+
+
+@router.get("/cache/stats", status_code=200)
+async def get_cache_stats(current_user=Depends(admin_required)):
+    """
+    Report the hit and miss counters of the contact read cache (admin only).
+
+    The counters are kept per process, since the cache itself is shared.
+
+    Args:
+        current_user: The currently authenticated admin.
+
+    Returns:
+        dict: The hits, misses, errors and hit rate of this process.
+    """
+    return redis_cache.get_contacts_cache_stats()
+
+
+@router.get("/export", status_code=200)
+@rate_limit_cost(20)
+async def export_contacts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    """
+    Export all contacts of the currently authenticated user as NDJSON or CSV.
+
+    The response is streamed, so the first bytes are sent before the whole
+    address book has been read from the database.
+
+    Args:
+        format (str): The export format, either "ndjson" or "csv".
+        db (AsyncSession): The database session.
+        current_user: The currently authenticated user.
+
+    Returns:
+        StreamingResponse: The streamed export.
+    """
+    logger.info(f"Exporting contacts of user {current_user.id} as {format}")
+    return StreamingResponse(
+        _export_rows(db, current_user.id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
 
 
 @router.get("/{contact_id}", response_model=ContactResponse, status_code=200)
-def get_contact_by_id(
+async def get_contact_by_id(
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user_async),
 ):
     """
     Retrieve a specific contact by its ID.
 
+    The response carries a strong ETag built from the contact's ID and
+    `updated_at`; a matching `If-None-Match` gets a 304 without a body.
+
     Args:
         contact_id (int): The ID of the contact to retrieve.
-        db (Session): The database session.
+        request (Request): The HTTP request.
+        response (Response): The response whose headers receive the ETag.
+        db (AsyncSession): The read-only database session (replica or primary).
         current_user: The currently authenticated user.
 
     Returns:
@@ -78,32 +553,32 @@ def get_contact_by_id(
     Raises:
         HTTPException: If the contact is not found.
     """
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.owner_id == current_user.id)
-        .first()
-    )
+    contact = await contacts_service.get_contact(db, current_user.id, contact_id)
     if not contact:
         logger.warning(f"Contact {contact_id} not found for user {current_user.id}")
         raise HTTPException(status_code=404, detail="Contact not found")
+    etag = strong_etag(contact.id, contact.updated_at)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     logger.info(f"Retrieved contact {contact_id} for user {current_user.id}")
     return contact
 
 
 @router.put("/{contact_id}", response_model=ContactResponse, status_code=200)
-def update_contact(
+async def update_contact(
     contact_id: int,
     contact_data: ContactCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
 ):
     """
-    Update a specific contact by its ID.
+    Replace all fields of a specific contact by its ID.
 
     Args:
         contact_id (int): The ID of the contact to update.
         contact_data (ContactCreate): The updated contact data.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         current_user: The currently authenticated user.
 
     Returns:
@@ -112,115 +587,79 @@ def update_contact(
     Raises:
         HTTPException: If the contact is not found.
     """
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.owner_id == current_user.id)
-        .first()
+    contact = await contacts_service.update_contact(
+        db,
+        current_user.id,
+        contact_id,
+        contacts_service.contact_values(contact_data, current_user.id),
     )
-    if not contact:
+    if contact is None:
         logger.warning(f"Contact {contact_id} not found for user {current_user.id}")
         raise HTTPException(status_code=404, detail="Contact not found")
-    for key, value in contact_data.dict().items():
-        setattr(contact, key, value)
-    db.commit()
-    db.refresh(contact)
     logger.info(f"Contact {contact_id} updated by user {current_user.id}")
     return contact
 
 
-@router.delete("/{contact_id}", response_model=ContactResponse, status_code=200)
-def delete_contact(
+@router.patch("/{contact_id}", response_model=ContactResponse, status_code=200)
+async def patch_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    contact_data: ContactUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
 ):
     """
-    Delete a specific contact by its ID.
+    Partially update a specific contact by its ID.
+
+    Only the fields present in the request body are written.
 
     Args:
-        contact_id (int): The ID of the contact to delete.
-        db (Session): The database session.
+        contact_id (int): The ID of the contact to update.
+        contact_data (ContactUpdate): The fields to change.
+        db (AsyncSession): The database session.
         current_user: The currently authenticated user.
 
     Returns:
-        ContactResponse: The deleted contact.
+        ContactResponse: The updated contact.
 
     Raises:
         HTTPException: If the contact is not found.
     """
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.owner_id == current_user.id)
-        .first()
+    contact = await contacts_service.update_contact(
+        db,
+        current_user.id,
+        contact_id,
+        contacts_service.contact_changes(contact_data),
     )
-    if not contact:
+    if contact is None:
         logger.warning(f"Contact {contact_id} not found for user {current_user.id}")
         raise HTTPException(status_code=404, detail="Contact not found")
-    db.delete(contact)
-    db.commit()
-    logger.info(f"Contact {contact_id} deleted by user {current_user.id}")
+    logger.info(f"Contact {contact_id} patched by user {current_user.id}")
     return contact
 
 
-@router.get("/search", response_model=List[ContactResponse], status_code=200)
-def search_contacts(
-    query: str = Query(..., description="Search by first name, last name, or email"),
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+@router.delete("/{contact_id}", response_model=ContactResponse, status_code=200)
+async def delete_contact(
+    contact_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
 ):
     """
-    Search contacts by first name, last name, or email.
+    Delete a specific contact by its ID.
 
     Args:
-        query (str): The search query.
-        db (Session): The database session.
+        contact_id (int): The ID of the contact to delete.
+        db (AsyncSession): The database session.
         current_user: The currently authenticated user.
 
     Returns:
-        List[ContactResponse]: A list of contacts matching the search query.
-    """
-    contacts = (
-        db.query(Contact)
-        .filter(
-            Contact.owner_id == current_user.id,
-            (Contact.first_name.ilike(f"%{query}%"))
-            | (Contact.last_name.ilike(f"%{query}%"))
-            | (Contact.email.ilike(f"%{query}%")),
-        )
-        .all()
-    )
-    logger.info(
-        f"Search query '{query}' returned {len(contacts)} results for user {current_user.id}"
-    )
-    return contacts
-
-
-@router.get("/birthdays", response_model=List[ContactResponse], status_code=200)
-def get_upcoming_birthdays(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    """
-    Get contacts with birthdays in the next 7 days.
-
-    Args:
-        db (Session): The database session.
-        current_user: The currently authenticated user.
+        ContactResponse: The deleted contact.
 
-    Returns:
-        List[ContactResponse]: A list of contacts with upcoming birthdays.
+    Raises:
+        HTTPException: If the contact is not found.
     """
-    today = date.today()
-    next_week = today + timedelta(days=7)
-    contacts = (
-        db.query(Contact)
-        .filter(
-            Contact.owner_id == current_user.id,
-            Contact.birthday.between(today, next_week),
-        )
-        .all()
-    )
-    logger.info(
-        f"Retrieved {len(contacts)} upcoming birthdays for user {current_user.id}"
-    )
-    return contacts
+    contact = await contacts_service.delete_contact(db, current_user.id, contact_id)
+    if contact is None:
+        logger.warning(f"Contact {contact_id} not found for user {current_user.id}")
+        raise HTTPException(status_code=404, detail="Contact not found")
+    logger.info(f"Contact {contact_id} deleted by user {current_user.id}")
+    return contact
@@ -1,13 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from sqlalchemy.orm import Session
 
 from app.schemas.user import UserCreate, UserResponse
 from app.models.user import User
-from app.services.auth import get_password_hash
-from app.utils.dependencies import get_current_user, get_db
+from app.services import password_hasher
+from app.utils.dependencies import get_current_user_from_replica, get_db, get_read_db
 from app.utils.dependencies import admin_required
 from app.utils.limiter import limiter
+from app.config import settings
+from slowapi.util import get_remote_address
 
 import logging
 
@@ -28,9 +31,17 @@ async def list_users():
     return []
 
 
+def _save_user(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
 @router.post("/register/", response_model=UserResponse, status_code=201)
-@limiter.limit("5/minute")
-def register_user(request: Request, user: UserCreate, db: Session = Depends(get_db)):
+@limiter.limit(settings.RATE_LIMIT_REGISTER, key_func=get_remote_address)
+async def register_user(
+    request: Request, user: UserCreate, db: Session = Depends(get_db)
+):
     """
     Registers a new user.
 
@@ -45,40 +56,40 @@ def register_user(request: Request, user: UserCreate, db: Session = Depends(get_
     Raises:
         HTTPException: If a user with the same email already exists.
     """
-    # Check if the user already exists in the database.
-    db_user = db.query(User).filter(User.email == user.email).first()
+    # Check if the user already exists in the database. Database calls run
+    # in the threadpool, as the route is async to await the password hasher.
+    db_user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == user.email).first()
+    )
     if db_user:
         logger.warning(f"Registration failed: User {user.email} already exists.")
         raise HTTPException(status_code=409, detail="User already exists")
 
     # Hash the user's password and create a new user record.
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash_password(user.password)
     new_user = User(
         email=user.email,
         hashed_password=hashed_password,
         is_verified=False,
         role=user.role,
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(_save_user, db, new_user)
     logger.info(f"User registered successfully: {user.email}")
     return new_user
 
 
 @router.get("/me/", response_model=UserResponse, status_code=200)
-@limiter.limit("10/minute")
 def get_current_user_info(
     request: Request,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user_from_replica),
 ):
     """
     Retrieves the current authenticated user's information.
 
     Args:
         request (Request): The HTTP request object.
-        db (Session): The database session dependency.
+        db (Session): The read-only database session dependency.
         current_user: The currently authenticated user.
 
     Returns:
@@ -1,11 +1,14 @@
-from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional
-from datetime import date
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timezone
 import logging
 
 # Configure logging for the module
 logger = logging.getLogger(__name__)
 
+# Maximum number of contacts accepted by a single bulk request
+BULK_MAX_ITEMS = 10000
+
 
 class ContactCreate(BaseModel):
     """
@@ -44,7 +47,7 @@ class ContactCreate(BaseModel):
         if value > date.today():
             logger.warning(f"Invalid birthday: {value} (in the future)")
             raise ValueError("Birthday cannot be in the future.")
-        logger.info(f"Validated birthday: {value}")
+        logger.debug(f"Validated birthday: {value}")
         return value
 
     @field_validator("phone")
@@ -67,9 +70,65 @@ class ContactCreate(BaseModel):
             raise ValueError(
                 "Phone number must contain only digits and be 7-15 characters long."
             )
-        logger.info(f"Validated phone number: {value}")
+        logger.debug(f"Validated phone number: {value}")
+        return value
+
+
+class ContactUpdate(BaseModel):
+    """
+    ContactUpdate is a Pydantic model used for partially updating a contact.
+
+    Only the fields present in the request are changed; they follow the same
+    rules as in `ContactCreate` and cannot be set to null.
+
+    Attributes:
+        first_name (Optional[str]): The first name of the contact.
+        last_name (Optional[str]): The last name of the contact.
+        email (Optional[EmailStr]): The email address of the contact.
+        phone (Optional[str]): The phone number of the contact.
+        birthday (Optional[date]): The birthday of the contact.
+        additional_info (Optional[str]): Additional information about the contact.
+    """
+
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    birthday: Optional[date] = None
+    additional_info: Optional[str] = None
+
+    @field_validator("first_name", "last_name", "email", "phone", "birthday")
+    def validate_not_null(cls, value):
+        """
+        Reject explicit nulls for fields that are required on a contact.
+
+        Args:
+            value: The field value to validate.
+
+        Returns:
+            The validated value.
+
+        Raises:
+            ValueError: If the value is null.
+        """
+        if value is None:
+            raise ValueError("Field cannot be null.")
         return value
 
+    @field_validator("birthday")
+    def validate_birthday(cls, value: date) -> date:
+        """
+        Validate the birthday with the `ContactCreate` rules.
+        """
+        return ContactCreate.validate_birthday(value)
+
+    @field_validator("phone")
+    def validate_phone(cls, value: str) -> str:
+        """
+        Validate the phone number with the `ContactCreate` rules.
+        """
+        return ContactCreate.validate_phone(value)
+
 
 class ContactResponse(ContactCreate):
     """
@@ -83,3 +142,146 @@ class ContactResponse(ContactCreate):
 
     class ConfigDict:
         from_attributes = True  # Enable population of model fields from attributes
+
+
+class ContactPage(BaseModel):
+    """
+    ContactPage is a Pydantic model used for returning a page of contacts.
+
+    Attributes:
+        items (List[ContactResponse]): The contacts on the current page.
+        next_cursor (Optional[str]): An opaque cursor for the next page, or None if this is the last page.
+    """
+
+    items: List[ContactResponse]
+    next_cursor: Optional[str] = None
+
+
+class ContactBulkCreate(BaseModel):
+    """
+    ContactBulkCreate is a Pydantic model used for creating many contacts at once.
+
+    Items are validated one by one against `ContactCreate`, so an invalid item
+    is reported in the response instead of rejecting the whole request.
+
+    Attributes:
+        items (List[Dict[str, Any]]): The contacts to create, in `ContactCreate` format.
+        upsert (bool): If True, items whose email matches an existing contact of the user update that contact.
+    """
+
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+    upsert: bool = False
+
+
+class ContactBulkItem(BaseModel):
+    """
+    ContactBulkItem is a Pydantic model describing the outcome of one bulk item.
+
+    Attributes:
+        index (int): The position of the item in the request.
+        id (int): The ID of the created or updated contact.
+        status (str): Either "created" or "updated".
+    """
+
+    index: int
+    id: int
+    status: str
+
+
+class ContactBulkError(BaseModel):
+    """
+    ContactBulkError is a Pydantic model describing a rejected bulk item.
+
+    Attributes:
+        index (int): The position of the item in the request.
+        errors (List[Dict[str, Any]]): The validation errors, each with `loc` and `msg`.
+    """
+
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class ContactBulkResult(BaseModel):
+    """
+    ContactBulkResult is a Pydantic model used for returning the result of a bulk create.
+
+    Attributes:
+        created (int): The number of contacts created.
+        updated (int): The number of existing contacts updated.
+        items (List[ContactBulkItem]): The outcome of every accepted item.
+        errors (List[ContactBulkError]): The items that were rejected.
+    """
+
+    created: int
+    updated: int
+    items: List[ContactBulkItem]
+    errors: List[ContactBulkError]
+
+
+class ContactBulkSelector(BaseModel):
+    """
+    ContactBulkSelector is a Pydantic model selecting the contacts affected by a bulk request.
+
+    At least one criterion must be given; when several are given, a contact
+    must match all of them. Only the current user's contacts are ever selected.
+
+    Attributes:
+        ids (Optional[List[int]]): The IDs of the contacts.
+        updated_before (Optional[datetime]): Select contacts last updated before this time.
+        return_ids (bool): Whether to return the IDs of the affected contacts.
+    """
+
+    ids: Optional[List[int]] = Field(None, max_length=BULK_MAX_ITEMS)
+    updated_before: Optional[datetime] = None
+    return_ids: bool = False
+
+    @field_validator("updated_before")
+    def validate_updated_before(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """
+        Convert a timezone-aware time to naive UTC, as stored in `updated_at`.
+
+        Args:
+            value (Optional[datetime]): The time to validate.
+
+        Returns:
+            Optional[datetime]: The time in UTC without a timezone.
+        """
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @model_validator(mode="after")
+    def validate_criteria(self):
+        """
+        Ensure that at least one selection criterion is given.
+
+        Raises:
+            ValueError: If neither `ids` nor `updated_before` is set.
+        """
+        if self.ids is None and self.updated_before is None:
+            raise ValueError("Either ids or updated_before must be provided.")
+        return self
+
+
+class ContactBulkUpdate(ContactBulkSelector):
+    """
+    ContactBulkUpdate is a Pydantic model used for updating many contacts at once.
+
+    Attributes:
+        changes (ContactUpdate): The fields to set on every selected contact.
+    """
+
+    changes: ContactUpdate
+
+
+class ContactBulkWriteResult(BaseModel):
+    """
+    ContactBulkWriteResult is a Pydantic model used for returning the result of a bulk update or delete.
+
+    Attributes:
+        count (int): The number of affected contacts.
+        ids (Optional[List[int]]): The IDs of the affected contacts, if requested.
+    """
+
+    count: int
+    ids: Optional[List[int]] = None
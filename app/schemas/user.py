@@ -104,9 +104,22 @@ class Token(BaseModel):
     """
 
     access_token: str  # The access token string
+    refresh_token: Optional[str] = None  # The refresh token, issued on login
     token_type: str  # The type of token (e.g., Bearer)
 
 
+class SessionResponse(BaseModel):
+    """
+    Schema for a login session of the current user.
+    """
+
+    id: str  # Session ID, carried by the session's refresh token
+    user_agent: Optional[str] = None  # User-Agent of the client that logged in
+    created_at: datetime  # Time of the login
+    last_used_at: datetime  # Time the refresh token was last used
+    expires_at: datetime  # Time the session and its refresh token expire
+
+
 class UserResponse(BaseModel):
     """
     Schema for user response data.
@@ -1,23 +1,18 @@
-from passlib.context import CryptContext
-from jose import jwt
-from datetime import datetime, timedelta
+from datetime import timedelta
 from app.models.user import User
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-import os
+from app.services import password_hasher
+from app.services.password_hasher import pwd_context
+from app.services.tokens import token_service
+from app.config import settings
 import logging
 
 # Logging configuration
 logger = logging.getLogger(__name__)
 
-# Password hashing configuration using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# JWT configuration
-SECRET_KEY = os.getenv(
-    "SECRET_KEY", "default_secret_key"
-)  # Use the value from .env or a default value
-ALGORITHM = "HS256"  # Algorithm used for JWT encoding
-ACCESS_TOKEN_EXPIRE_MINUTES = 30  # Default token expiration time in minutes
+# Default token expiration time in minutes
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -54,10 +49,14 @@ def get_password_hash(password: str) -> str:
     return hashed_password
 
 
-def authenticate_user(db: Session, email: str, password: str) -> User:
+async def authenticate_user(db: Session, email: str, password: str) -> User:
     """
     Authenticate a user by verifying their email and password.
 
+    The user is looked up in the threadpool and the bcrypt check runs in the
+    password hashing executor, so a burst of logins neither blocks the event
+    loop nor holds threadpool threads while hashing.
+
     Args:
         db (Session): The database session.
         email (str): The user's email address.
@@ -67,18 +66,40 @@ def authenticate_user(db: Session, email: str, password: str) -> User:
         User: The authenticated user object if authentication is successful.
         None: If authentication fails.
     """
-    user = db.query(User).filter(User.email == email).first()
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == email).first()
+    )
     if not user:
         logger.warning(f"Authentication failed: User with email {email} not found.")
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.verify_password(password, user.hashed_password):
         logger.warning(f"Authentication failed: Incorrect password for email {email}.")
         return None
     logger.info(f"User {email} authenticated successfully.")
     return user
 
 
-def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
+def user_claims(user: User) -> dict:
+    """
+    Build the claims describing a user, carried by access tokens.
+
+    Args:
+        user (User): The user the token is issued to.
+
+    Returns:
+        dict: The `uid`, `role`, `is_active` and `is_verified` claims.
+    """
+    return {
+        "uid": user.id,
+        "role": getattr(user.role, "value", user.role),
+        "is_active": bool(user.is_active),
+        "is_verified": bool(user.is_verified),
+    }
+
+
+def create_access_token(
+    data: dict, expires_delta: timedelta = None, user: User = None
+) -> str:
     """
     Create a JSON Web Token (JWT) for user authentication.
 
@@ -86,18 +107,16 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
         data (dict): The payload data to include in the token.
         expires_delta (timedelta, optional): The duration for which the token
             will remain valid. Defaults to 30 minutes.
+        user (User, optional): The user the token is issued to. Their claims
+            are embedded, allowing stateless authentication.
 
     Returns:
         str: The encoded JWT as a string.
     """
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (
-        expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {**data, **user_claims(user)} if user is not None else data
+    return token_service.issue(
+        claims, expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire})
-    token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    logger.info("Access token created successfully.")
-    return token
 
 
 def hash_password(password: str) -> str:
@@ -125,9 +144,4 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None) -> str:
     Returns:
         str: The encoded JWT as a string.
     """
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(days=7))
-    to_encode.update({"exp": expire})
-    token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    logger.info("Refresh token created successfully.")
-    return token
+    return token_service.issue(data, expires_delta or timedelta(days=7))
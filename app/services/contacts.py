@@ -0,0 +1,443 @@
+from pydantic import ValidationError
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.contacts import Contact, birthday_key
+from app.schemas.contact import ContactBulkSelector, ContactCreate, ContactUpdate
+from app.services.redis_cache import invalidate_contacts
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Columns returned by single-contact writes. Plain rows are returned rather
+# than ORM instances, so they are not expired (and reloaded) by the commit.
+CONTACT_COLUMNS = tuple(Contact.__table__.columns)
+
+# Maximum lengths of the string columns. Bulk items are checked against them
+# up front, since PostgreSQL would reject the whole batch for one long value
+COLUMN_LENGTHS = {
+    column.name: column.type.length
+    for column in Contact.__table__.columns
+    if getattr(column.type, "length", None)
+}
+
+
+def contact_values(data: ContactCreate, owner_id: int) -> dict:
+    """
+    Map validated contact data to the column values of a contact row.
+
+    Fields without a database column (`additional_info`) are dropped and the
+    derived `birthday_md` key is added, since statement-level inserts and
+    updates bypass the ORM validators.
+
+    Args:
+        data (ContactCreate): The validated contact data.
+        owner_id (int): The ID of the user who owns the contact.
+
+    Returns:
+        dict: The column values.
+    """
+    values = data.model_dump(exclude={"additional_info"})
+    values["birthday_md"] = birthday_key(values["birthday"])
+    values["owner_id"] = owner_id
+    return values
+
+
+def contact_changes(data: ContactUpdate) -> dict:
+    """
+    Map a partial update to the column values it changes.
+
+    Args:
+        data (ContactUpdate): The validated partial update.
+
+    Returns:
+        dict: The column values of the fields that were sent.
+    """
+    values = data.model_dump(exclude_unset=True, exclude={"additional_info"})
+    if "birthday" in values:
+        values["birthday_md"] = birthday_key(values["birthday"])
+    return values
+
+
+def selector_criteria(owner_id: int, selector: ContactBulkSelector) -> list:
+    """
+    Build the WHERE criteria of a bulk update or delete.
+
+    Args:
+        owner_id (int): The ID of the user who owns the contacts.
+        selector (ContactBulkSelector): The selection criteria of the request.
+
+    Returns:
+        list: The filter conditions, always restricted to the owner's contacts.
+    """
+    criteria = [Contact.owner_id == owner_id]
+    if selector.ids is not None:
+        criteria.append(Contact.id.in_(selector.ids))
+    if selector.updated_before is not None:
+        criteria.append(Contact.updated_at < selector.updated_before)
+    return criteria
+
+
+async def get_contact(db: AsyncSession, owner_id: int, contact_id: int):
+    """
+    Fetch one contact of the user as a plain row.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user who owns the contact.
+        contact_id (int): The ID of the contact.
+
+    Returns:
+        Row: The contact's columns, or None if the user has no such contact.
+    """
+    result = await db.execute(
+        select(*CONTACT_COLUMNS).where(
+            Contact.id == contact_id, Contact.owner_id == owner_id
+        )
+    )
+    return result.first()
+
+
+async def contacts_version(db: AsyncSession, owner_id: int) -> tuple:
+    """
+    Compute a cheap version stamp of a user's contacts.
+
+    Any create, update or delete changes either the latest `updated_at` or
+    the number of contacts. Both aggregates are served by the
+    `(owner_id, updated_at)` index.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user who owns the contacts.
+
+    Returns:
+        tuple: The latest `updated_at` (or None) and the number of contacts.
+    """
+    result = await db.execute(
+        select(func.max(Contact.updated_at), func.count()).where(
+            Contact.owner_id == owner_id
+        )
+    )
+    return tuple(result.one())
+
+
+async def create_contact(db: AsyncSession, owner_id: int, data: ContactCreate):
+    """
+    Insert a contact with a single INSERT ... RETURNING statement and commit it.
+
+    Like every write below, it invalidates the owner's cached contact reads.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user who owns the contact.
+        data (ContactCreate): The validated contact data.
+
+    Returns:
+        Row: The columns of the created contact.
+    """
+    values = contact_values(data, owner_id)
+    if db.get_bind().dialect.insert_returning:
+        result = await db.execute(
+            insert(Contact).values(**values).returning(*CONTACT_COLUMNS)
+        )
+        row = result.one()
+    else:
+        contact = Contact(**values)
+        db.add(contact)
+        await db.flush()
+        row = await get_contact(db, owner_id, contact.id)
+    await db.commit()
+    await invalidate_contacts(owner_id)
+    return row
+
+
+async def update_contact(
+    db: AsyncSession, owner_id: int, contact_id: int, values: dict
+):
+    """
+    Update a contact with a single UPDATE ... RETURNING statement and commit it.
+
+    On dialects without `UPDATE ... RETURNING`, the row is selected after the update.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user who owns the contact.
+        contact_id (int): The ID of the contact.
+        values (dict): The column values to set.
+
+    Returns:
+        Row: The columns of the updated contact, or None if the user has no such contact.
+    """
+    if not values:
+        return await get_contact(db, owner_id, contact_id)
+    stmt = (
+        update(Contact)
+        .where(Contact.id == contact_id, Contact.owner_id == owner_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        result = await db.execute(stmt.returning(*CONTACT_COLUMNS))
+        row = result.first()
+    else:
+        row = None
+        result = await db.execute(stmt)
+        if result.rowcount:
+            row = await get_contact(db, owner_id, contact_id)
+    await db.commit()
+    if row is not None:
+        await invalidate_contacts(owner_id)
+    return row
+
+
+async def delete_contact(db: AsyncSession, owner_id: int, contact_id: int):
+    """
+    Delete a contact with a single DELETE ... RETURNING statement and commit it.
+
+    On dialects without `DELETE ... RETURNING`, the row is selected before the delete.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user who owns the contact.
+        contact_id (int): The ID of the contact.
+
+    Returns:
+        Row: The columns of the deleted contact, or None if the user has no such contact.
+    """
+    stmt = (
+        delete(Contact)
+        .where(Contact.id == contact_id, Contact.owner_id == owner_id)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.delete_returning:
+        result = await db.execute(stmt.returning(*CONTACT_COLUMNS))
+        row = result.first()
+    else:
+        row = await get_contact(db, owner_id, contact_id)
+        if row is not None:
+            await db.execute(stmt)
+    await db.commit()
+    if row is not None:
+        await invalidate_contacts(owner_id)
+    return row
+
+
+async def _execute_bulk(
+    db: AsyncSession, stmt, criteria: list, return_ids: bool
+) -> tuple:
+    """
+    Execute a set-based UPDATE or DELETE and commit it.
+
+    When IDs are requested, they come from `RETURNING` if the dialect
+    supports it; otherwise they are selected just before the statement runs.
+
+    Args:
+        db (AsyncSession): The database session.
+        stmt: The UPDATE or DELETE statement, with its criteria applied.
+        criteria (list): The criteria of the statement.
+        return_ids (bool): Whether to collect the IDs of the affected rows.
+
+    Returns:
+        tuple: The number of affected rows and their IDs (or None).
+    """
+    dialect = db.get_bind().dialect
+    supports_returning = (
+        dialect.update_returning if stmt.is_update else dialect.delete_returning
+    )
+    stmt = stmt.execution_options(synchronize_session=False)
+    ids = None
+    if return_ids and supports_returning:
+        result = await db.scalars(stmt.returning(Contact.id))
+        ids = result.all()
+        count = len(ids)
+    else:
+        if return_ids:
+            result = await db.scalars(select(Contact.id).where(*criteria))
+            ids = result.all()
+        result = await db.execute(stmt)
+        count = result.rowcount
+    await db.commit()
+    return count, ids
+
+
+async def bulk_update_contacts(
+    db: AsyncSession,
+    owner_id: int,
+    selector: ContactBulkSelector,
+    changes: ContactUpdate,
+) -> tuple:
+    """
+    Apply the same changes to many contacts with a single UPDATE statement.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user who owns the contacts.
+        selector (ContactBulkSelector): The contacts to update.
+        changes (ContactUpdate): The fields to set.
+
+    Returns:
+        tuple: The number of updated contacts and their IDs (or None).
+    """
+    criteria = selector_criteria(owner_id, selector)
+    stmt = update(Contact).where(*criteria).values(**contact_changes(changes))
+    count, ids = await _execute_bulk(db, stmt, criteria, selector.return_ids)
+    if count:
+        await invalidate_contacts(owner_id)
+    logger.info(f"Bulk update for user {owner_id}: {count} contacts updated")
+    return count, ids
+
+
+async def bulk_delete_contacts(
+    db: AsyncSession, owner_id: int, selector: ContactBulkSelector
+) -> tuple:
+    """
+    Delete many contacts with a single DELETE statement.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user who owns the contacts.
+        selector (ContactBulkSelector): The contacts to delete.
+
+    Returns:
+        tuple: The number of deleted contacts and their IDs (or None).
+    """
+    criteria = selector_criteria(owner_id, selector)
+    stmt = delete(Contact).where(*criteria)
+    count, ids = await _execute_bulk(db, stmt, criteria, selector.return_ids)
+    if count:
+        await invalidate_contacts(owner_id)
+    logger.info(f"Bulk delete for user {owner_id}: {count} contacts deleted")
+    return count, ids
+
+
+def validate_contacts(items: list) -> tuple:
+    """
+    Validate raw bulk items against `ContactCreate` and the column lengths.
+
+    Args:
+        items (list): The raw items of a bulk request.
+
+    Returns:
+        tuple: A list of `(index, ContactCreate)` pairs for the valid items and
+        a list of `{"index", "errors"}` dicts for the invalid ones.
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            contact = ContactCreate.model_validate(item)
+        except ValidationError as e:
+            errors.append(
+                {
+                    "index": index,
+                    "errors": [
+                        {"loc": list(error["loc"]), "msg": error["msg"]}
+                        for error in e.errors()
+                    ],
+                }
+            )
+            continue
+        too_long = [
+            {"loc": [name], "msg": f"String should have at most {length} characters"}
+            for name, length in COLUMN_LENGTHS.items()
+            if len(str(getattr(contact, name, ""))) > length
+        ]
+        if too_long:
+            errors.append({"index": index, "errors": too_long})
+        else:
+            valid.append((index, contact))
+    return valid, errors
+
+
+async def bulk_create_contacts(
+    db: AsyncSession, owner_id: int, items: list, upsert: bool = False
+) -> tuple:
+    """
+    Create many contacts with set-based statements and commit them.
+
+    New contacts are written with one multi-row INSERT ... RETURNING (split
+    into pages by SQLAlchemy for very large batches). With `upsert`, the
+    user's existing contacts with the same emails are found with a single
+    SELECT and updated with one executemany UPDATE. Items whose email
+    matches several existing contacts are rejected rather than updating all
+    of them.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner_id (int): The ID of the user who owns the contacts.
+        items (list): The `(index, ContactCreate)` pairs to write.
+        upsert (bool): Whether items matching an existing email update that contact.
+
+    Returns:
+        tuple: A list of `{"index", "id", "status"}` dicts ordered by index and
+        a list of `{"index", "errors"}` dicts for items rejected as duplicates
+        or ambiguous.
+    """
+    results, errors = [], []
+    to_insert, to_update = [], []
+    existing = {}
+    if upsert and items:
+        emails = {item.email for _, item in items}
+        result = await db.execute(
+            select(Contact.id, Contact.email).where(
+                Contact.owner_id == owner_id, Contact.email.in_(emails)
+            )
+        )
+        rows = result.all()
+        for row in rows:
+            existing.setdefault(row.email, []).append(row.id)
+
+    seen = set()
+    for index, item in items:
+        values = contact_values(item, owner_id)
+        if upsert:
+            if item.email in seen:
+                errors.append(
+                    {
+                        "index": index,
+                        "errors": [
+                            {"loc": ["email"], "msg": "Duplicate email in batch"}
+                        ],
+                    }
+                )
+                continue
+            seen.add(item.email)
+            matches = existing.get(item.email, [])
+            if len(matches) > 1:
+                errors.append(
+                    {
+                        "index": index,
+                        "errors": [
+                            {
+                                "loc": ["email"],
+                                "msg": "Email matches several existing contacts",
+                            }
+                        ],
+                    }
+                )
+                continue
+            if matches:
+                to_update.append({**values, "id": matches[0]})
+                results.append({"index": index, "id": matches[0], "status": "updated"})
+                continue
+        to_insert.append((index, values))
+
+    if to_update:
+        # ORM bulk UPDATE by primary key, executed as a single executemany
+        await db.execute(update(Contact), to_update)
+    if to_insert:
+        ids = await db.scalars(
+            insert(Contact).returning(Contact.id, sort_by_parameter_order=True),
+            [values for _, values in to_insert],
+        )
+        for (index, _), contact_id in zip(to_insert, ids):
+            results.append({"index": index, "id": contact_id, "status": "created"})
+    await db.commit()
+    if results:
+        await invalidate_contacts(owner_id)
+
+    results.sort(key=lambda result: result["index"])
+    logger.info(
+        f"Bulk write for user {owner_id}: {len(to_insert)} created, "
+        f"{len(to_update)} updated, {len(errors)} rejected"
+    )
+    return results, errors
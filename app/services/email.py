@@ -1,8 +1,6 @@
-import smtplib
-from email.message import EmailMessage
-from email.mime.text import MIMEText
 import os
 import logging
+from app.services.email_outbox import email_outbox
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -11,9 +9,12 @@ logger = logging.getLogger(__name__)
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 
 
-def send_email(to_email, subject, body):
+async def send_email(to_email, subject, body):
     """
-    Send a generic email using the SMTP protocol.
+    Send a generic email through the email outbox.
+
+    The email is only queued in Redis; the outbox worker delivers it over
+    SMTP in the background, retrying on failure.
 
     Args:
         to_email (str): The recipient's email address.
@@ -21,25 +22,12 @@ def send_email(to_email, subject, body):
         body (str): The body content of the email.
 
     Logs:
-        Logs success or failure of the email sending process.
+        Logs the queued message.
     """
-    # Create a plain text email message
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = "noreply@example.com"  # Sender's email address
-    msg["To"] = to_email  # Recipient's email address
-
-    try:
-        # Connect to the SMTP server and send the email
-        with smtplib.SMTP("localhost") as server:
-            server.send_message(msg)
-        logger.info(f"Email sent to {to_email}")
-    except Exception as e:
-        # Log any errors that occur during the email sending process
-        logger.error(f"Failed to send email to {to_email}: {e}")
+    await email_outbox.enqueue(to_email, subject, body)
 
 
-def send_verification_email(email: str, token: str):
+async def send_verification_email(email: str, token: str):
     """
     Send a verification email to the user with a unique verification link.
 
@@ -54,10 +42,10 @@ def send_verification_email(email: str, token: str):
     # Email body content
     body = f"Please verify your email by clicking the link: {verification_url}"
     # Send the email
-    send_email(email, "Verify your email", body)
+    await send_email(email, "Verify your email", body)
 
 
-def send_password_reset_email(email: str, token: str):
+async def send_password_reset_email(email: str, token: str):
     """
     Send a password reset email to the user with a unique reset link.
 
@@ -72,4 +60,4 @@ def send_password_reset_email(email: str, token: str):
     # Email body content
     body = f"Click the link to reset your password: {reset_url}"
     # Send the email
-    send_email(email, "Reset your password", body)
+    await send_email(email, "Reset your password", body)
@@ -0,0 +1,460 @@
+import asyncio
+import json
+import logging
+import smtplib
+import time
+import uuid
+from email.message import EmailMessage
+import redis
+from app.config import settings
+from app.services import redis_cache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Redis list of messages waiting to be sent; new messages are pushed on the left
+OUTBOX_KEY = "email:outbox"
+
+# Sorted set of messages waiting for a retry, scored by when it is due
+RETRY_KEY = "email:outbox:retry"
+
+# Redis list of messages that could not be delivered
+DEAD_KEY = "email:outbox:dead"
+
+# Prefix of the Redis lists of messages being sent, one per worker. Messages
+# stay there until they were sent or rescheduled, so none is lost if the
+# worker dies while sending
+PROCESSING_KEY_PREFIX = "email:outbox:processing:"
+
+# Sorted set of workers, scored by when they were last seen alive
+WORKERS_KEY = "email:outbox:workers"
+
+# Seconds without a sign of life after which a worker's messages are re-queued
+WORKER_TIMEOUT = 60
+
+# Delay before the first retry in seconds, doubled for every further attempt
+RETRY_BASE_DELAY = 5
+
+# Longest delay between two attempts in seconds
+RETRY_MAX_DELAY = 600
+
+# Moves the retries that are due back to the outbox and records that the
+# calling worker is alive. Moving them in one script keeps two workers from
+# both moving, and later sending, the same message
+PROMOTE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, message in ipairs(due) do
+    redis.call('ZREM', KEYS[1], message)
+    redis.call('RPUSH', KEYS[2], message)
+end
+redis.call('ZADD', KEYS[3], ARGV[1], ARGV[3])
+return #due
+"""
+
+# Moves the messages of workers not seen since ARGV[1], e.g. killed while
+# sending, back to the outbox to be sent next, oldest first
+REQUEUE_ABANDONED_SCRIPT = """
+local workers = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1])
+local moved = 0
+for _, worker in ipairs(workers) do
+    local processing = ARGV[2] .. worker
+    while redis.call('LMOVE', processing, KEYS[2], 'LEFT', 'RIGHT') do
+        moved = moved + 1
+    end
+    redis.call('ZREM', KEYS[1], worker)
+end
+return moved
+"""
+
+
+def build_message(to_email: str, subject: str, body: str) -> EmailMessage:
+    """
+    Build a plain text email.
+
+    Args:
+        to_email (str): The recipient's email address.
+        subject (str): The subject of the email.
+        body (str): The body content of the email.
+
+    Returns:
+        EmailMessage: The message, sent from `SMTP_EMAIL`.
+    """
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = settings.SMTP_EMAIL
+    message["To"] = to_email
+    message.set_content(body)
+    return message
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """
+    Check whether retrying a failed message is pointless.
+
+    Args:
+        error (Exception): The error raised while sending.
+
+    Returns:
+        bool: True for permanent (5xx) rejections by the SMTP server.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class SMTPSender:
+    """
+    Sends emails over one SMTP connection kept open between batches.
+
+    The connection is opened on first use and reopened when the server drops
+    it. The sender is blocking and not thread-safe; the outbox worker calls it
+    from one thread at a time.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = None,
+        password: str = None,
+        starttls: bool = False,
+        timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._smtp = None
+
+    @classmethod
+    def from_settings(cls) -> "SMTPSender":
+        """
+        Build a sender for the SMTP server of the application settings.
+
+        Returns:
+            SMTPSender: The configured sender.
+        """
+        return cls(
+            settings.SMTP_SERVER,
+            settings.SMTP_PORT,
+            settings.SMTP_EMAIL,
+            settings.SMTP_PASSWORD,
+            settings.SMTP_STARTTLS,
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.password:
+                smtp.login(self.username, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        logger.info(f"Connected to SMTP server {self.host}:{self.port}.")
+        return smtp
+
+    def send(self, message: EmailMessage) -> None:
+        """
+        Send one email, reconnecting once if the connection was dropped.
+
+        Args:
+            message (EmailMessage): The message to send.
+
+        Raises:
+            smtplib.SMTPException: If the server rejects the message.
+            OSError: If the server cannot be reached.
+        """
+        for attempt in range(2):
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                if attempt:
+                    raise
+
+    def send_batch(self, messages: list) -> list:
+        """
+        Send several emails over the same connection.
+
+        Args:
+            messages (list): The messages to send.
+
+        Returns:
+            list: For each message, None if it was sent, or the error it failed with.
+        """
+        errors = []
+        for message in messages:
+            try:
+                self.send(message)
+                errors.append(None)
+            except (smtplib.SMTPException, OSError) as e:
+                errors.append(e)
+                # Rejected messages leave the connection usable; start over
+                # with a new connection after anything else
+                if not isinstance(
+                    e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+                ):
+                    self.close()
+        return errors
+
+    def close(self) -> None:
+        """
+        Close the connection, if open.
+
+        Returns:
+            None
+        """
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+
+class EmailOutbox:
+    """
+    Redis-backed queue of outgoing emails and the worker that sends them.
+
+    Request handlers only push a message to Redis. A background task in every
+    application process moves messages in batches of up to
+    `EMAIL_OUTBOX_BATCH_SIZE` to its own processing list and sends them over a
+    persistent SMTP connection, removing each message once it was sent or
+    rescheduled. Failed messages are retried with exponential backoff, up to
+    `EMAIL_OUTBOX_MAX_ATTEMPTS` attempts; messages that fail permanently or
+    run out of attempts are moved to a dead letter list. Messages left in the
+    processing list of a worker not seen for `WORKER_TIMEOUT` seconds are
+    re-queued by the other workers, so delivery is at least once.
+
+    Attributes:
+        sender (SMTPSender): The sender used by the worker.
+        worker_id (str): Identifies this worker's processing list.
+    """
+
+    def __init__(self, sender: SMTPSender = None):
+        self.sender = sender or SMTPSender.from_settings()
+        self.worker_id = uuid.uuid4().hex
+        self._task = None
+        self._scripts = {}
+
+    @property
+    def client(self):
+        return redis_cache.async_redis_client
+
+    @property
+    def processing_key(self) -> str:
+        return f"{PROCESSING_KEY_PREFIX}{self.worker_id}"
+
+    def _script(self, source: str):
+        # Registered once per client, so the script's SHA1 is not recomputed per call
+        client = self.client
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not client:
+            script = self._scripts[source] = client.register_script(source)
+        return script
+
+    async def enqueue(self, to_email: str, subject: str, body: str) -> str:
+        """
+        Queue an email for sending.
+
+        Args:
+            to_email (str): The recipient's email address.
+            subject (str): The subject of the email.
+            body (str): The body content of the email.
+
+        Returns:
+            str: The ID of the queued message.
+        """
+        message_id = uuid.uuid4().hex
+        entry = {
+            "id": message_id,
+            "to": to_email,
+            "subject": subject,
+            "body": body,
+            "attempts": 0,
+        }
+        await self.client.lpush(OUTBOX_KEY, json.dumps(entry))
+        logger.info(f"Email {message_id} to {to_email} queued.")
+        return message_id
+
+    async def _next_batch(self, timeout: float) -> list:
+        first = await self.client.blmove(
+            OUTBOX_KEY, self.processing_key, timeout, "RIGHT", "LEFT"
+        )
+        if first is None:
+            return []
+        batch = [first]
+        if settings.EMAIL_OUTBOX_BATCH_SIZE > 1:
+            pipeline = self.client.pipeline(transaction=False)
+            for _ in range(settings.EMAIL_OUTBOX_BATCH_SIZE - 1):
+                pipeline.lmove(OUTBOX_KEY, self.processing_key, "RIGHT", "LEFT")
+            batch.extend(entry for entry in await pipeline.execute() if entry)
+        return batch
+
+    def _fail(self, pipeline, entry: dict, error: Exception) -> None:
+        entry["attempts"] += 1
+        entry["error"] = str(error)
+        if (
+            is_permanent_failure(error)
+            or entry["attempts"] >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        ):
+            pipeline.lpush(DEAD_KEY, json.dumps(entry))
+            logger.error(f"Email {entry['id']} to {entry['to']} dropped: {error}")
+            return
+        delay = min(RETRY_BASE_DELAY * 2 ** (entry["attempts"] - 1), RETRY_MAX_DELAY)
+        pipeline.zadd(RETRY_KEY, {json.dumps(entry): time.time() + delay})
+        logger.warning(
+            f"Email {entry['id']} to {entry['to']} failed, retrying in {delay}s: {error}"
+        )
+
+    async def _settle(self, batch: list, entries: list, errors: list) -> None:
+        # Reschedule the failed messages and release the batch in one transaction
+        pipeline = self.client.pipeline(transaction=True)
+        for raw, entry, error in zip(batch, entries, errors):
+            if error is not None:
+                self._fail(pipeline, entry, error)
+            pipeline.lrem(self.processing_key, 1, raw)
+        await pipeline.execute()
+
+    async def _wait_for_batch(self, sending: asyncio.Future) -> list:
+        # Keep this worker marked alive while a slow batch is being sent
+        while True:
+            done, _ = await asyncio.wait({sending}, timeout=WORKER_TIMEOUT / 3)
+            if done:
+                return sending.result()
+            await self.client.zadd(WORKERS_KEY, {self.worker_id: time.time()})
+
+    async def drain_once(self, timeout: float = 1.0) -> int:
+        """
+        Send one batch of queued emails, waiting up to `timeout` for the first one.
+
+        If cancelled while sending, the batch is finished first, so that the
+        SMTP connection is not closed under it and no sent email is re-queued.
+
+        Args:
+            timeout (float): How long to wait for a message in seconds.
+
+        Returns:
+            int: The number of emails sent.
+        """
+        await self._script(PROMOTE_RETRIES_SCRIPT)(
+            keys=[RETRY_KEY, OUTBOX_KEY, WORKERS_KEY],
+            args=[time.time(), settings.EMAIL_OUTBOX_BATCH_SIZE, self.worker_id],
+        )
+        batch = await self._next_batch(timeout)
+        if not batch:
+            return 0
+        entries = [json.loads(raw) for raw in batch]
+        messages = [
+            build_message(entry["to"], entry["subject"], entry["body"])
+            for entry in entries
+        ]
+        sending = asyncio.ensure_future(
+            asyncio.to_thread(self.sender.send_batch, messages)
+        )
+        try:
+            errors = await self._wait_for_batch(sending)
+        except asyncio.CancelledError:
+            errors = await sending
+            await self._settle(batch, entries, errors)
+            raise
+        await self._settle(batch, entries, errors)
+        sent = errors.count(None)
+        if sent:
+            logger.info(f"Sent {sent} queued emails.")
+        return sent
+
+    async def _requeue_own(self) -> None:
+        # Messages of a batch whose outcome could not be recorded
+        while await self.client.lmove(self.processing_key, OUTBOX_KEY, "LEFT", "RIGHT"):
+            pass
+
+    async def requeue_abandoned(self) -> int:
+        """
+        Re-queue the messages of workers not seen for `WORKER_TIMEOUT` seconds.
+
+        Returns:
+            int: The number of re-queued messages.
+        """
+        moved = await self._script(REQUEUE_ABANDONED_SCRIPT)(
+            keys=[WORKERS_KEY, OUTBOX_KEY],
+            args=[time.time() - WORKER_TIMEOUT, PROCESSING_KEY_PREFIX],
+        )
+        if moved:
+            logger.warning(f"Re-queued {moved} emails of stopped outbox workers.")
+        return moved
+
+    async def run(self) -> None:
+        """
+        Send queued emails until cancelled.
+
+        Returns:
+            None
+        """
+        delay = 1
+        next_requeue = 0
+        failed = False
+        while True:
+            try:
+                if failed:
+                    await self._requeue_own()
+                    failed = False
+                # Look for messages of dead workers at startup and now and then
+                if time.monotonic() >= next_requeue:
+                    await self.requeue_abandoned()
+                    next_requeue = time.monotonic() + WORKER_TIMEOUT
+                # Block for less than the Redis read timeout
+                await self.drain_once(
+                    timeout=min(1.0, settings.REDIS_SOCKET_TIMEOUT / 2)
+                )
+                delay = 1
+            except (redis.RedisError, OSError) as e:
+                failed = True
+                logger.warning(f"Email outbox unavailable, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    def start(self) -> None:
+        """
+        Start the background worker on the running event loop.
+
+        Returns:
+            None
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background worker and close the SMTP connection.
+
+        A batch being sent is finished before the connection is closed.
+
+        Returns:
+            None
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            try:
+                await self.client.zrem(WORKERS_KEY, self.worker_id)
+            except (redis.RedisError, OSError) as e:
+                logger.warning(f"Could not unregister the email outbox worker: {e}")
+        await asyncio.to_thread(self.sender.close)
+
+
+# Outbox used by the application to send emails
+email_outbox = EmailOutbox()
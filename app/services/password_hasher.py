@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Password hashing configuration using bcrypt
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Executor running bcrypt, created on first use
+_executor = None
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_executor():
+    """
+    Return the executor that runs bcrypt, creating it on first use.
+
+    With `PASSWORD_HASH_WORKERS` > 0, hashing runs in a pool of that many
+    worker processes, so it neither holds the GIL nor occupies the threadpool
+    shared by sync routes. Workers are spawned rather than forked, since the
+    application process is multi-threaded.
+
+    Returns:
+        ProcessPoolExecutor: The process pool, or None to use the default threadpool.
+    """
+    global _executor
+    if _executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(
+            f"Started {settings.PASSWORD_HASH_WORKERS} password hashing workers."
+        )
+    return _executor
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a plain text password off the event loop.
+
+    Args:
+        password (str): The plain text password to hash.
+
+    Returns:
+        str: The hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), _hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Check a plain text password against its hash off the event loop.
+
+    Args:
+        plain_password (str): The plain text password to verify.
+        hashed_password (str): The hashed password to compare against.
+
+    Returns:
+        bool: True if the passwords match, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), _verify, plain_password, hashed_password
+    )
+
+
+def shutdown() -> None:
+    """
+    Stop the worker processes, if they were started.
+
+    Returns:
+        None
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        logger.info("Password hashing workers stopped.")
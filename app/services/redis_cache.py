@@ -1,41 +1,400 @@
 import redis
 import os
 import json
+import hashlib
+import logging
+import struct
+import time
 from datetime import timedelta
+from app.config import settings
+from app.models.user import UserRole
+from app.services.redis_client import create_async_redis_client, create_redis_client
+from app.utils.token_cache import token_cache
+
+# Configure logging
+logger = logging.getLogger(__name__)
 
 # Initialize a Redis client to interact with the Redis database.
-redis_client = redis.StrictRedis(host="localhost", port=6379, db=0)
+redis_client = create_redis_client()
+
+# Redis client for async request handlers, sharing the same database
+async_redis_client = create_async_redis_client()
+
+# Version of the user snapshot format, embedded in the keys and payloads
+USER_SNAPSHOT_VERSION = 1
+
+# Fields of a user kept in the snapshot cache
+USER_SNAPSHOT_FIELDS = ("id", "email", "role", "is_active", "is_verified")
+
+# Lifetime of a cached user snapshot in seconds
+USER_CACHE_TTL = 1800
 
+# Snapshot header: format version, user id, status flags and role index
+_USER_SNAPSHOT_HEADER = struct.Struct(">BqBB")
+_USER_ROLES = tuple(UserRole)
 
-def cache_user(user_id: str, user_data: dict) -> None:
+# Per-process counters of the contact read cache
+contacts_cache_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def user_snapshot(user) -> dict:
     """
-    Cache user data in Redis.
+    Extract the fields of a user needed to authorize requests.
+
+    The password hash and timestamps are deliberately left out.
 
     Args:
-        user_id (str): The unique identifier for the user.
-        user_data (dict): The user data to be cached, serialized as JSON.
+        user (User): The user to snapshot.
 
     Returns:
-        None
+        dict: The user's id, email, role and status flags.
+    """
+    return {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+
+
+def encode_user_snapshot(snapshot: dict) -> bytes:
+    """
+    Encode a user snapshot in the compact binary format.
+
+    Layout: format version, id, status flags and role index in a fixed
+    header, followed by the UTF-8 email.
+
+    Args:
+        snapshot (dict): The snapshot from `user_snapshot`.
+
+    Returns:
+        bytes: The encoded snapshot.
+    """
+    flags = bool(snapshot["is_active"]) | bool(snapshot["is_verified"]) << 1
+    role = _USER_ROLES.index(UserRole(snapshot["role"] or UserRole.USER))
+    header = _USER_SNAPSHOT_HEADER.pack(
+        USER_SNAPSHOT_VERSION, snapshot["id"], flags, role
+    )
+    return header + snapshot["email"].encode("utf-8")
+
+
+def decode_user_snapshot(data: bytes) -> dict:
+    """
+    Decode a user snapshot written by `encode_user_snapshot`.
+
+    Args:
+        data (bytes): The encoded snapshot.
+
+    Returns:
+        dict: The snapshot, or None if it was written in another format version.
+    """
+    if len(data) < _USER_SNAPSHOT_HEADER.size or data[0] != USER_SNAPSHOT_VERSION:
+        return None
+    _, user_id, flags, role = _USER_SNAPSHOT_HEADER.unpack_from(data)
+    return {
+        "id": user_id,
+        "email": data[_USER_SNAPSHOT_HEADER.size :].decode("utf-8"),
+        "role": _USER_ROLES[role],
+        "is_active": bool(flags & 1),
+        "is_verified": bool(flags & 2),
+    }
+
+
+def user_cache_key(email: str) -> str:
+    """
+    Return the Redis key of a user's snapshot.
+
+    Args:
+        email (str): The user's email address.
+
+    Returns:
+        str: The key, which embeds the snapshot format version.
+    """
+    return f"user:v{USER_SNAPSHOT_VERSION}:{email}"
+
+
+def cache_user(user) -> dict:
+    """
+    Cache a snapshot of a user in Redis.
+
+    Args:
+        user (User): The user to cache.
+
+    Returns:
+        dict: The cached snapshot.
     """
-    # Serialize the user data to JSON and store it in Redis with the key "user:{user_id}".
-    redis_client.set(f"user:{user_id}", json.dumps(user_data))
+    snapshot = user_snapshot(user)
+    redis_client.set(
+        user_cache_key(snapshot["email"]),
+        encode_user_snapshot(snapshot),
+        ex=USER_CACHE_TTL,
+    )
+    return snapshot
 
 
 def get_cached_user(email: str) -> dict:
     """
-    Retrieve cached user data from Redis.
+    Retrieve a cached user snapshot from Redis.
+
+    Args:
+        email (str): The user's email address.
+
+    Returns:
+        dict: The user snapshot, or None if not found.
+    """
+    cached_user = redis_client.get(user_cache_key(email))
+    if cached_user:
+        return decode_user_snapshot(cached_user)
+    return None
+
+
+async def cache_user_async(user) -> dict:
+    """
+    Async variant of `cache_user`.
+
+    Args:
+        user (User): The user to cache.
+
+    Returns:
+        dict: The cached snapshot.
+    """
+    snapshot = user_snapshot(user)
+    await async_redis_client.set(
+        user_cache_key(snapshot["email"]),
+        encode_user_snapshot(snapshot),
+        ex=USER_CACHE_TTL,
+    )
+    return snapshot
+
+
+async def get_cached_user_async(email: str) -> dict:
+    """
+    Async variant of `get_cached_user`.
 
     Args:
-        email (str): The user's email address (used as the key).
+        email (str): The user's email address.
 
     Returns:
-        dict: The cached user data as a dictionary, or None if not found.
+        dict: The user snapshot, or None if not found.
     """
-    # Attempt to retrieve the cached user data from Redis using the key "user:{email}".
-    cached_user = redis_client.get(f"user:{email}")
+    cached_user = await async_redis_client.get(user_cache_key(email))
     if cached_user:
-        # If data is found, deserialize it from JSON and return it.
-        return json.loads(cached_user)
-    # Return None if no data is found in the cache.
+        return decode_user_snapshot(cached_user)
     return None
+
+
+def invalidate_user(email: str) -> None:
+    """
+    Drop a user's cached snapshot after their role, status or password changed.
+
+    The user's tokens are also dropped from this process's token cache.
+
+    Args:
+        email (str): The user's email address.
+
+    Returns:
+        None
+    """
+    redis_client.delete(user_cache_key(email))
+    token_cache.discard_user(email)
+
+
+def tokens_watermark_key(user_id: int) -> str:
+    return f"user:{user_id}:tokens_valid_after"
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """
+    Revoke every access token issued to a user so far.
+
+    The watermark only needs to outlive the tokens it revokes, so it expires
+    with the longest access token lifetime. It is set to the next second,
+    since token `iat` claims have a one second resolution.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        None
+    """
+    redis_client.set(
+        tokens_watermark_key(user_id),
+        int(time.time()) + 1,
+        ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
+def get_tokens_watermark(user_id: int) -> int:
+    """
+    Return the time before which the user's access tokens are revoked.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        int: The watermark as a UNIX timestamp, or None if none is set.
+    """
+    watermark = redis_client.get(tokens_watermark_key(user_id))
+    return int(watermark) if watermark else None
+
+
+async def get_tokens_watermark_async(user_id: int) -> int:
+    """
+    Async variant of `get_tokens_watermark`.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        int: The watermark as a UNIX timestamp, or None if none is set.
+    """
+    watermark = await async_redis_client.get(tokens_watermark_key(user_id))
+    return int(watermark) if watermark else None
+
+
+def _generation_key(owner_id: int) -> str:
+    return f"contacts:{owner_id}:generation"
+
+
+async def contacts_cache_key(owner_id: int, endpoint: str, **params) -> str:
+    """
+    Build the cache key of a contact read under the owner's current generation.
+
+    Every write to the owner's contacts increments the generation, so keys
+    built before the write are never read again and simply expire.
+
+    Args:
+        owner_id (int): The ID of the user who owns the contacts.
+        endpoint (str): The name of the cached read (e.g. "list", "search").
+        **params: The parameters that select the cached page.
+
+    Returns:
+        str: The cache key, or None if Redis is unavailable.
+    """
+    try:
+        generation = await async_redis_client.get(_generation_key(owner_id))
+    except (redis.RedisError, OSError) as e:
+        contacts_cache_stats["errors"] += 1
+        logger.warning(f"Contacts cache unavailable: {e}")
+        return None
+    digest = hashlib.sha1(
+        json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"contacts:{owner_id}:{int(generation or 0)}:{endpoint}:{digest}"
+
+
+async def get_cached_contacts(key: str) -> bytes:
+    """
+    Retrieve a cached contact read and count the hit or miss.
+
+    Args:
+        key (str): The key from `contacts_cache_key` (may be None).
+
+    Returns:
+        bytes: The cached JSON body, or None on a miss.
+    """
+    if key is None:
+        contacts_cache_stats["misses"] += 1
+        return None
+    try:
+        body = await async_redis_client.get(key)
+    except (redis.RedisError, OSError) as e:
+        contacts_cache_stats["errors"] += 1
+        logger.warning(f"Contacts cache unavailable: {e}")
+        body = None
+    contacts_cache_stats["hits" if body is not None else "misses"] += 1
+    return body
+
+
+async def cache_contacts(key: str, body: str) -> None:
+    """
+    Store a contact read for `CONTACTS_CACHE_TTL` seconds.
+
+    Args:
+        key (str): The key from `contacts_cache_key` (may be None).
+        body (str): The JSON body to cache.
+
+    Returns:
+        None
+    """
+    if key is None:
+        return
+    try:
+        await async_redis_client.set(key, body, ex=settings.CONTACTS_CACHE_TTL)
+    except (redis.RedisError, OSError) as e:
+        contacts_cache_stats["errors"] += 1
+        logger.warning(f"Contacts cache unavailable: {e}")
+
+
+async def invalidate_contacts(owner_id: int) -> None:
+    """
+    Invalidate all cached contact reads of a user by bumping their generation.
+
+    Args:
+        owner_id (int): The ID of the user whose contacts changed.
+
+    Returns:
+        None
+    """
+    try:
+        if settings.DATABASE_REPLICA_URLS:
+            # Also send the user's reads to the primary while replicas catch up
+            async with async_redis_client.pipeline(transaction=False) as pipeline:
+                pipeline.incr(_generation_key(owner_id))
+                pipeline.set(
+                    recent_write_key(owner_id),
+                    1,
+                    px=int(settings.DB_READ_YOUR_WRITES_WINDOW * 1000),
+                )
+                await pipeline.execute()
+        else:
+            await async_redis_client.incr(_generation_key(owner_id))
+    except (redis.RedisError, OSError) as e:
+        contacts_cache_stats["errors"] += 1
+        logger.warning(f"Failed to invalidate contacts cache of user {owner_id}: {e}")
+
+
+def recent_write_key(user_id: int) -> str:
+    return f"user:{user_id}:recent_write"
+
+
+def has_recent_write(user_id: int) -> bool:
+    """
+    Check whether a user wrote within the last `DB_READ_YOUR_WRITES_WINDOW` seconds.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        bool: True if the user's reads should go to the primary; also True
+        if Redis cannot be reached.
+    """
+    try:
+        return bool(redis_client.exists(recent_write_key(user_id)))
+    except (redis.RedisError, OSError) as e:
+        logger.warning(f"Failed to check recent writes of user {user_id}: {e}")
+        return True
+
+
+async def has_recent_write_async(user_id: int) -> bool:
+    """
+    Async variant of `has_recent_write`.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        bool: True if the user's reads should go to the primary.
+    """
+    try:
+        return bool(await async_redis_client.exists(recent_write_key(user_id)))
+    except (redis.RedisError, OSError) as e:
+        logger.warning(f"Failed to check recent writes of user {user_id}: {e}")
+        return True
+
+
+def get_contacts_cache_stats() -> dict:
+    """
+    Return the hit and miss counters of the contact read cache.
+
+    Returns:
+        dict: The counters of this process and the resulting hit rate.
+    """
+    lookups = contacts_cache_stats["hits"] + contacts_cache_stats["misses"]
+    hit_rate = contacts_cache_stats["hits"] / lookups if lookups else 0.0
+    return {**contacts_cache_stats, "hit_rate": round(hit_rate, 4)}
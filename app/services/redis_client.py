@@ -0,0 +1,147 @@
+import logging
+import time
+import redis
+import redis.asyncio
+from app.config import settings
+from app.utils.metrics import HistogramFamily
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bucket bounds of the Redis command latency histograms in seconds
+REDIS_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1)
+
+# Latency of the Redis commands of this process, by command name; pipelines
+# are timed as a whole under "PIPELINE"
+redis_command_latency = HistogramFamily(("command",), REDIS_LATENCY_BUCKETS)
+
+
+def _command_name(args) -> str:
+    name = args[0]
+    return (name.decode() if isinstance(name, bytes) else str(name)).upper()
+
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    """
+    Pipeline recording how long each `execute()` takes.
+    """
+
+    def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            redis_command_latency.labels("PIPELINE").observe(
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Redis client recording the latency of every command it runs.
+    """
+
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            redis_command_latency.labels(_command_name(args)).observe(
+                time.perf_counter() - start
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedAsyncPipeline(redis.asyncio.client.Pipeline):
+    """
+    Async pipeline recording how long each `execute()` takes.
+    """
+
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            redis_command_latency.labels("PIPELINE").observe(
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedAsyncRedis(redis.asyncio.Redis):
+    """
+    Async Redis client recording the latency of every command it runs.
+    """
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            redis_command_latency.labels(_command_name(args)).observe(
+                time.perf_counter() - start
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return InstrumentedAsyncPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def _connection_options() -> dict:
+    return {
+        "host": settings.REDIS_HOST,
+        "port": settings.REDIS_PORT,
+        "db": settings.REDIS_DB,
+        "password": settings.REDIS_PASSWORD or None,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "health_check_interval": 30,
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+    }
+
+
+def create_redis_client() -> InstrumentedRedis:
+    """
+    Create a Redis client from the `REDIS_*` settings.
+
+    The client draws connections from its own pool of at most
+    `REDIS_MAX_CONNECTIONS`; connecting and every read are bounded by
+    `REDIS_CONNECT_TIMEOUT` and `REDIS_SOCKET_TIMEOUT`, so an unresponsive
+    server fails requests with a `redis.TimeoutError` instead of stalling them.
+    A request waiting for a free connection fails once the pool is exhausted.
+
+    Returns:
+        InstrumentedRedis: The client.
+    """
+    pool = redis.ConnectionPool(**_connection_options())
+    return InstrumentedRedis(connection_pool=pool)
+
+
+def create_async_redis_client() -> InstrumentedAsyncRedis:
+    """
+    Create an async Redis client from the `REDIS_*` settings.
+
+    Configured like `create_redis_client`, for use in async request handlers.
+
+    Returns:
+        InstrumentedAsyncRedis: The client.
+    """
+    pool = redis.asyncio.ConnectionPool(**_connection_options())
+    return InstrumentedAsyncRedis(connection_pool=pool)
+
+
+def get_redis_latency_stats() -> dict:
+    """
+    Return the latency histograms of the Redis commands of this process.
+
+    Returns:
+        dict: The histogram of each command in seconds, by command name.
+    """
+    return {
+        command: histogram
+        for (command,), histogram in redis_command_latency.snapshot().items()
+    }
@@ -0,0 +1,259 @@
+from sqlalchemy import (
+    DDL,
+    Index,
+    and_,
+    column,
+    event,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from app.models.contacts import Contact
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Shortest query the SQLite trigram index can answer; shorter queries fall back to LIKE
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+# Columns that take part in contact search
+SEARCH_COLUMNS = ("first_name", "last_name", "email")
+
+# SQLite: FTS5 shadow table with a trigram tokenizer, kept in sync with the
+# contacts table by triggers. Trigrams allow the same substring matching as
+# `ILIKE '%query%'` while being served from the full-text index.
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5("
+    "first_name, last_name, email, content='contacts', content_rowid='id', "
+    "tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN "
+    "INSERT INTO contacts_fts(rowid, first_name, last_name, email) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN "
+    "INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN "
+    "INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); "
+    "INSERT INTO contacts_fts(rowid, first_name, last_name, email) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+)
+
+# Register the search DDL so it is created and dropped together with the contacts table
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Contact.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Contact.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite"),
+)
+
+# PostgreSQL: trigram GIN indexes on each searchable column
+event.listen(
+    Contact.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for name in SEARCH_COLUMNS:
+    Index(
+        f"ix_contacts_{name}_trgm",
+        Contact.__table__.c[name],
+        postgresql_using="gin",
+        postgresql_ops={name: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+
+
+def ensure_search_index(connection) -> None:
+    """
+    Create the search index of an existing database if it is missing.
+
+    `create_all` only creates the index together with the contacts table, so
+    databases created before the index existed are upgraded here. On SQLite,
+    a newly created FTS5 table is filled from the existing contacts with
+    FTS5's `rebuild` command. Every statement is idempotent, so this runs at
+    each startup.
+
+    Args:
+        connection (Connection): A connection in a transaction.
+
+    Returns:
+        None
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                "AND name = 'contacts_fts'"
+            )
+        ).first()
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        if exists is None:
+            logger.info("Building the contacts_fts search index...")
+            connection.execute(
+                text("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')")
+            )
+    elif dialect == "postgresql":
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for name in SEARCH_COLUMNS:
+            connection.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS ix_contacts_{name}_trgm "
+                    f"ON contacts USING gin ({name} gin_trgm_ops)"
+                )
+            )
+
+
+class SearchBackend:
+    """
+    Base class for contact search backends.
+
+    A backend builds a SELECT statement returning `(Contact, rank)` rows for
+    one owner, ordered by ascending rank (best match first) and then by ID.
+    The statement is executed by the caller, which keeps backends independent
+    of how the session is driven.
+
+    The base implementation ORs `ILIKE` filters on the searchable columns and
+    gives every match the same rank.
+    """
+
+    name = "like"
+
+    def ranked(self, owner_id: int, query: str):
+        """
+        Build a subquery of matching contact IDs and their rank.
+
+        Args:
+            owner_id (int): The ID of the user whose contacts are searched.
+            query (str): The search query.
+
+        Returns:
+            Subquery: A subquery with `id` and `rank` columns (lower rank is better).
+        """
+        return (
+            select(Contact.id, literal(0.0).label("rank"))
+            .where(Contact.owner_id == owner_id, self.like(query))
+            .subquery()
+        )
+
+    def like(self, query: str):
+        """
+        Build the condition matching the query as a substring of any searchable column.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            ColumnElement: The OR of the `ILIKE` filters.
+        """
+        return or_(
+            *(getattr(Contact, name).ilike(f"%{query}%") for name in SEARCH_COLUMNS)
+        )
+
+    def build(self, owner_id: int, query: str, after: list = None):
+        """
+        Build the search statement for one page of results.
+
+        Args:
+            owner_id (int): The ID of the user whose contacts are searched.
+            query (str): The search query.
+            after (list, optional): The `(rank, id)` key of the last row of the
+                previous page.
+
+        Returns:
+            Select: A statement returning `(Contact, rank)` rows.
+        """
+        ranked = self.ranked(owner_id, query)
+        stmt = (
+            select(Contact, ranked.c.rank)
+            .join(ranked, ranked.c.id == Contact.id)
+            .where(Contact.owner_id == owner_id)
+        )
+        if after is not None:
+            last_rank, last_id = after
+            stmt = stmt.where(
+                or_(
+                    ranked.c.rank > last_rank,
+                    and_(ranked.c.rank == last_rank, Contact.id > last_id),
+                )
+            )
+        return stmt.order_by(ranked.c.rank, Contact.id)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Search backend using the FTS5 trigram shadow table on SQLite.
+
+    Results are ranked with FTS5's built-in BM25 function. Queries shorter
+    than three characters cannot be answered by the trigram index and use
+    the `ILIKE` implementation instead.
+    """
+
+    name = "sqlite-fts5"
+
+    def ranked(self, owner_id: int, query: str):
+        if len(query) < MIN_TRIGRAM_QUERY_LENGTH:
+            return super().ranked(owner_id, query)
+        fts = table("contacts_fts", column("rowid"))
+        # Quote the query as an FTS5 phrase so operators in it are matched literally
+        phrase = '"' + query.replace('"', '""') + '"'
+        # Join the owner inside the subquery, so that only the owner's matches
+        # are ranked and paged instead of every user's
+        return (
+            select(
+                fts.c.rowid.label("id"),
+                func.bm25(literal_column("contacts_fts")).label("rank"),
+            )
+            .join(Contact, Contact.id == fts.c.rowid)
+            .where(
+                literal_column("contacts_fts").op("MATCH")(phrase),
+                Contact.owner_id == owner_id,
+            )
+            .subquery()
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Search backend using `pg_trgm` GIN indexes on PostgreSQL.
+
+    The `ILIKE` filters are served by the trigram indexes and results are
+    ranked by the best trigram similarity across the searchable columns.
+    """
+
+    name = "postgresql-trgm"
+
+    def ranked(self, owner_id: int, query: str):
+        similarity = func.greatest(
+            *(func.similarity(getattr(Contact, name), query) for name in SEARCH_COLUMNS)
+        )
+        return (
+            select(Contact.id, (-similarity).label("rank"))
+            .where(Contact.owner_id == owner_id, self.like(query))
+            .subquery()
+        )
+
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    """
+    Return the search backend for the given database dialect.
+
+    Args:
+        dialect_name (str): The name of the SQLAlchemy dialect (e.g. "sqlite").
+
+    Returns:
+        SearchBackend: The backend best suited to the dialect.
+    """
+    if dialect_name == "sqlite":
+        return SQLiteSearchBackend()
+    if dialect_name == "postgresql":
+        return PostgresSearchBackend()
+    return SearchBackend()
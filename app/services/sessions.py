@@ -0,0 +1,206 @@
+import logging
+import time
+from app.services import redis_cache
+from app.services.redis_cache import (
+    USER_CACHE_TTL,
+    encode_user_snapshot,
+    user_cache_key,
+    user_snapshot,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Marks a session as used if it exists and belongs to the user, in one round trip
+TOUCH_SESSION_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'email') == ARGV[1] then
+    redis.call('HSET', KEYS[1], 'last_used_at', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Deletes a session only if it is in the user's index, so users cannot
+# revoke sessions of others by ID
+REVOKE_SESSION_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 1 then
+    redis.call('DEL', KEYS[2])
+    return 1
+end
+return 0
+"""
+
+# Deletes every session in the user's index and the index itself, returning
+# the number of sessions, so no session created meanwhile can survive
+REVOKE_ALL_SESSIONS_SCRIPT = """
+local session_ids = redis.call('ZRANGE', KEYS[1], 0, -1)
+for _, session_id in ipairs(session_ids) do
+    redis.call('DEL', ARGV[1] .. session_id)
+end
+redis.call('DEL', KEYS[1])
+return #session_ids
+"""
+
+
+def session_key(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def user_sessions_key(email: str) -> str:
+    return f"user:{email}:sessions"
+
+
+class SessionStore:
+    """
+    Redis store of login sessions, one per refresh token.
+
+    Each session is a hash under `session:{id}` expiring with its refresh
+    token, indexed per user in a sorted set scored by expiry. Every write
+    goes out as one MULTI/EXEC pipeline or script call, and refresh tokens
+    are validated with a single script call, so each operation costs one
+    round trip (listing costs two).
+    """
+
+    def __init__(self):
+        self._scripts = {}
+
+    @property
+    def client(self):
+        return redis_cache.redis_client
+
+    def _script(self, source: str):
+        # Registered once per client, so the script's SHA1 is not recomputed per call
+        client = self.client
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not client:
+            script = self._scripts[source] = client.register_script(source)
+        return script
+
+    def create(
+        self, user, session_id: str, expires_at: int, user_agent: str = None
+    ) -> None:
+        """
+        Store a new session and the user's snapshot in one round trip.
+
+        Args:
+            user (User): The user who logged in.
+            session_id (str): The ID of the session, carried by the refresh token.
+            expires_at (int): The expiry of the refresh token as a UNIX timestamp.
+            user_agent (str, optional): The User-Agent of the client.
+
+        Returns:
+            None
+        """
+        now = int(time.time())
+        snapshot = user_snapshot(user)
+        email = snapshot["email"]
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.set(
+            user_cache_key(email), encode_user_snapshot(snapshot), ex=USER_CACHE_TTL
+        )
+        pipeline.hset(
+            session_key(session_id),
+            mapping={
+                "email": email,
+                "user_agent": user_agent or "",
+                "created_at": now,
+                "last_used_at": now,
+                "expires_at": expires_at,
+            },
+        )
+        pipeline.expireat(session_key(session_id), expires_at)
+        # Drop expired sessions from the index while at it
+        pipeline.zremrangebyscore(user_sessions_key(email), "-inf", now)
+        pipeline.zadd(user_sessions_key(email), {session_id: expires_at})
+        pipeline.expireat(user_sessions_key(email), expires_at)
+        pipeline.execute()
+
+    def validate(self, email: str, session_id: str) -> bool:
+        """
+        Check that a session is live and belongs to the user, and mark it used.
+
+        Args:
+            email (str): The email from the refresh token.
+            session_id (str): The session ID from the refresh token.
+
+        Returns:
+            bool: True if the refresh token may be used.
+        """
+        touch = self._script(TOUCH_SESSION_SCRIPT)
+        return bool(
+            touch(keys=[session_key(session_id)], args=[email, int(time.time())])
+        )
+
+    def list_sessions(self, email: str) -> list:
+        """
+        List the live sessions of a user, oldest first.
+
+        Args:
+            email (str): The user's email address.
+
+        Returns:
+            list: The sessions as dicts with `id`, `user_agent`, `created_at`,
+            `last_used_at` and `expires_at`.
+        """
+        session_ids = self.client.zrangebyscore(
+            user_sessions_key(email), int(time.time()), "+inf"
+        )
+        pipeline = self.client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipeline.hgetall(session_key(session_id.decode("utf-8")))
+        sessions = []
+        for session_id, data in zip(session_ids, pipeline.execute()):
+            if not data:
+                continue
+            data = {
+                key.decode("utf-8"): value.decode("utf-8")
+                for key, value in data.items()
+            }
+            sessions.append(
+                {
+                    "id": session_id.decode("utf-8"),
+                    "user_agent": data["user_agent"] or None,
+                    "created_at": int(data["created_at"]),
+                    "last_used_at": int(data["last_used_at"]),
+                    "expires_at": int(data["expires_at"]),
+                }
+            )
+        return sorted(sessions, key=lambda session: session["created_at"])
+
+    def revoke(self, email: str, session_id: str) -> bool:
+        """
+        Revoke one session of a user; its refresh token stops working.
+
+        Args:
+            email (str): The user's email address.
+            session_id (str): The ID of the session.
+
+        Returns:
+            bool: True if the session existed.
+        """
+        revoke = self._script(REVOKE_SESSION_SCRIPT)
+        return bool(
+            revoke(
+                keys=[user_sessions_key(email), session_key(session_id)],
+                args=[session_id],
+            )
+        )
+
+    def revoke_all(self, email: str) -> int:
+        """
+        Revoke every session of a user in one script call.
+
+        Args:
+            email (str): The user's email address.
+
+        Returns:
+            int: The number of revoked sessions.
+        """
+        revoke_all = self._script(REVOKE_ALL_SESSIONS_SCRIPT)
+        revoked = revoke_all(keys=[user_sessions_key(email)], args=[session_key("")])
+        logger.info(f"Revoked {revoked} sessions of user {email}.")
+        return revoked
+
+
+# Session store used by the authentication routes
+session_store = SessionStore()
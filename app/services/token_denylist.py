@@ -0,0 +1,225 @@
+import logging
+import threading
+import time
+import redis
+from app.config import settings
+from app.services import redis_cache
+from app.utils.bloom_filter import BloomFilter
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Redis channel announcing newly revoked token IDs to every worker
+DENYLIST_CHANNEL = "revoked_tokens"
+
+# Sorted set of revoked token IDs, scored by the expiry of each token
+DENYLIST_KEY = "revoked:jtis"
+
+# Longest delay between two attempts to reach Redis at startup, in seconds
+CONNECT_MAX_DELAY = 30
+
+# Local Bloom filter of revoked token IDs, replaced as a whole when reloaded
+_filter = BloomFilter(
+    settings.TOKEN_DENYLIST_CAPACITY, settings.TOKEN_DENYLIST_ERROR_RATE
+)
+
+# Whether the filter holds every live revocation. Until it does, every token
+# is checked in Redis
+_loaded = False
+
+# Serializes additions to the filter with its replacement by `load()`
+_lock = threading.RLock()
+
+# Pub/sub connection, the thread listening on it and the thread connecting them
+_pubsub = None
+_listener = None
+_connector = None
+_stopping = threading.Event()
+
+
+def load() -> None:
+    """
+    Rebuild the local Bloom filter from the revoked token IDs in Redis.
+
+    Expired IDs are dropped from Redis first, so reloading also sheds them
+    from the filter. The new filter is sized for at least twice the live IDs.
+    The lock is held throughout, so no revocation received meanwhile is lost.
+
+    Returns:
+        None
+    """
+    global _filter, _loaded
+    with _lock:
+        pipeline = redis_cache.redis_client.pipeline()
+        pipeline.zremrangebyscore(DENYLIST_KEY, "-inf", time.time())
+        pipeline.zrange(DENYLIST_KEY, 0, -1)
+        _, jtis = pipeline.execute()
+        bloom = BloomFilter(
+            max(settings.TOKEN_DENYLIST_CAPACITY, 2 * len(jtis)),
+            settings.TOKEN_DENYLIST_ERROR_RATE,
+        )
+        for jti in jtis:
+            bloom.add(jti.decode("utf-8"))
+        _filter = bloom
+        _loaded = True
+    logger.info(f"Token denylist loaded with {len(jtis)} revoked tokens.")
+
+
+def _add(jti: str) -> None:
+    with _lock:
+        _filter.add(jti)
+        full = _filter.count > _filter.capacity
+    if full:
+        load()
+
+
+def _on_revoked(message: dict) -> None:
+    _add(message["data"].decode("utf-8"))
+
+
+def _on_listener_error(error, pubsub, thread) -> None:
+    # Messages may have been missed while disconnected, so the filter is
+    # incomplete until it is reloaded once Redis is back
+    global _loaded
+    _loaded = False
+    logger.warning(f"Token denylist listener error: {error}")
+    time.sleep(1)
+    try:
+        load()
+    except (redis.RedisError, OSError) as e:
+        logger.warning(f"Failed to reload token denylist: {e}")
+
+
+def _connect() -> None:
+    # Subscribe, then load, retrying with backoff until both succeeded. The
+    # subscription is made before loading, so no revocation falls between them
+    global _pubsub, _listener
+    delay = 1
+    while not _stopping.is_set():
+        try:
+            if _pubsub is None:
+                pubsub = redis_cache.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{DENYLIST_CHANNEL: _on_revoked})
+                _pubsub = pubsub
+                _listener = pubsub.run_in_thread(
+                    sleep_time=1.0, daemon=True, exception_handler=_on_listener_error
+                )
+            load()
+            return
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Token denylist unavailable, retrying in {delay}s: {e}")
+        _stopping.wait(delay)
+        delay = min(delay * 2, CONNECT_MAX_DELAY)
+
+
+def start() -> None:
+    """
+    Subscribe to revocations announced by other workers and load the filter.
+
+    Connecting happens in a background thread that retries until Redis can
+    be reached. Until the filter is loaded, every token is checked in Redis
+    and rejected if Redis cannot be reached, so an unreachable Redis never
+    lets revoked tokens through.
+
+    Returns:
+        None
+    """
+    global _connector
+    if _connector is None:
+        _stopping.clear()
+        _connector = threading.Thread(
+            target=_connect, name="token-denylist", daemon=True
+        )
+        _connector.start()
+
+
+def stop() -> None:
+    """
+    Stop listening for revocations.
+
+    Returns:
+        None
+    """
+    global _pubsub, _listener, _connector, _loaded
+    _stopping.set()
+    if _connector is not None:
+        _connector.join(timeout=5)
+        _connector = None
+    _loaded = False
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _pubsub is not None:
+        _pubsub.close()
+        _pubsub = None
+
+
+def revoke(jti: str, expires_at: int) -> None:
+    """
+    Revoke a token until it expires and announce it to every worker.
+
+    Args:
+        jti (str): The ID of the token.
+        expires_at (int): The token's `exp` claim as a UNIX timestamp.
+
+    Returns:
+        None
+    """
+    ttl = int(expires_at - time.time())
+    if ttl <= 0:
+        return
+    pipeline = redis_cache.redis_client.pipeline()
+    pipeline.zadd(DENYLIST_KEY, {jti: expires_at})
+    # Drop expired revocations while at it
+    pipeline.zremrangebyscore(DENYLIST_KEY, "-inf", time.time())
+    pipeline.publish(DENYLIST_CHANNEL, jti)
+    pipeline.execute()
+    _add(jti)
+    logger.info(f"Token {jti} revoked for {ttl} seconds.")
+
+
+def is_revoked(jti: str) -> bool:
+    """
+    Check whether a token was revoked.
+
+    Tokens missing from the local Bloom filter are answered in process; only
+    filter hits, which may be false positives, are confirmed in Redis. While
+    the filter is not loaded, every token is checked in Redis. If Redis
+    cannot be reached, a token that needs checking counts as revoked.
+
+    Args:
+        jti (str): The ID of the token (may be None for tokens without one).
+
+    Returns:
+        bool: True if the token was revoked.
+    """
+    if not jti or (_loaded and jti not in _filter):
+        return False
+    try:
+        expires_at = redis_cache.redis_client.zscore(DENYLIST_KEY, jti)
+        return expires_at is not None and expires_at > time.time()
+    except (redis.RedisError, OSError) as e:
+        logger.warning(f"Token denylist unavailable, rejecting token {jti}: {e}")
+        return True
+
+
+async def is_revoked_async(jti: str) -> bool:
+    """
+    Check whether a token was revoked, like `is_revoked`, without blocking.
+
+    Redis is queried with the async client, for use on the event loop.
+
+    Args:
+        jti (str): The ID of the token (may be None for tokens without one).
+
+    Returns:
+        bool: True if the token was revoked.
+    """
+    if not jti or (_loaded and jti not in _filter):
+        return False
+    try:
+        expires_at = await redis_cache.async_redis_client.zscore(DENYLIST_KEY, jti)
+        return expires_at is not None and expires_at > time.time()
+    except (redis.RedisError, OSError) as e:
+        logger.warning(f"Token denylist unavailable, rejecting token {jti}: {e}")
+        return True
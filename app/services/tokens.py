@@ -0,0 +1,180 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import time
+import uuid
+from datetime import timedelta
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Key ID of `SECRET_KEY`, also used for tokens issued without a `kid` header
+DEFAULT_KID = "default"
+
+# Hash functions of the supported HMAC algorithms
+HMAC_ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+class TokenError(Exception):
+    """
+    Raised when a token is malformed, wrongly signed or expired.
+    """
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class TokenService:
+    """
+    Issues and verifies HMAC-signed JWTs.
+
+    The HMAC state of every key is derived once, when the service is built,
+    and copied for each token, so the key is not re-padded and re-hashed per
+    call. The encoded header of every key is precomputed as well. Tokens are
+    signed with the key `signing_kid` and carry it in their `kid` header;
+    any configured key verifies its own tokens, which allows keys to be
+    rotated without invalidating the tokens already issued.
+
+    Attributes:
+        algorithm (str): The JWT algorithm (HS256, HS384 or HS512).
+        signing_kid (str): The ID of the key new tokens are signed with.
+    """
+
+    def __init__(self, keys: dict, signing_kid: str, algorithm: str = "HS256"):
+        if algorithm not in HMAC_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+        if signing_kid not in keys:
+            raise ValueError(f"Unknown signing key: {signing_kid}")
+        self.algorithm = algorithm
+        self.signing_kid = signing_kid
+        digestmod = HMAC_ALGORITHMS[algorithm]
+        self._macs = {
+            kid: hmac.new(secret.encode("utf-8"), digestmod=digestmod)
+            for kid, secret in keys.items()
+        }
+        # Encoded header of each key, and the key of each encoded header
+        self._headers = {
+            kid: _b64encode(
+                json.dumps(
+                    {"alg": algorithm, "kid": kid, "typ": "JWT"},
+                    separators=(",", ":"),
+                ).encode("utf-8")
+            )
+            for kid in keys
+        }
+        self._kids = {
+            header.decode("ascii"): kid for kid, header in self._headers.items()
+        }
+
+    @classmethod
+    def from_settings(cls) -> "TokenService":
+        """
+        Build the service from the application settings.
+
+        `SECRET_KEY` is registered as the "default" key next to `JWT_KEYS`.
+
+        Returns:
+            TokenService: The configured service.
+        """
+        keys = {DEFAULT_KID: settings.SECRET_KEY, **settings.JWT_KEYS}
+        return cls(keys, settings.JWT_SIGNING_KID, settings.ALGORITHM)
+
+    def _sign(self, kid: str, signing_input: bytes) -> bytes:
+        mac = self._macs[kid].copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def issue(self, claims: dict, expires_in: timedelta) -> str:
+        """
+        Issue a token carrying `claims` plus `exp`, `iat` and a random `jti`.
+
+        Args:
+            claims (dict): The claims of the token; the dict is not modified.
+            expires_in (timedelta): The lifetime of the token.
+
+        Returns:
+            str: The encoded token.
+        """
+        now = int(time.time())
+        payload = {
+            **claims,
+            "exp": now + int(expires_in.total_seconds()),
+            "iat": now,
+            "jti": uuid.uuid4().hex,
+        }
+        signing_input = (
+            self._headers[self.signing_kid]
+            + b"."
+            + _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        )
+        signature = _b64encode(self._sign(self.signing_kid, signing_input))
+        return (signing_input + b"." + signature).decode("ascii")
+
+    def _kid(self, header_segment: str) -> str:
+        kid = self._kids.get(header_segment)
+        if kid is not None:
+            return kid
+        # Tokens from other issuers, e.g. issued before key IDs were introduced
+        try:
+            header = json.loads(_b64decode(header_segment))
+        except (binascii.Error, ValueError) as e:
+            raise TokenError("Malformed token header") from e
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise TokenError("Unexpected token algorithm")
+        kid = header.get("kid", DEFAULT_KID)
+        if kid not in self._macs:
+            raise TokenError(f"Unknown key: {kid}")
+        return kid
+
+    def verify(self, token: str) -> dict:
+        """
+        Verify a token's signature and expiry and return its claims.
+
+        Args:
+            token (str): The encoded token.
+
+        Returns:
+            dict: The claims of the token.
+
+        Raises:
+            TokenError: If the token is malformed, wrongly signed or expired.
+        """
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            signature = _b64decode(signature_segment)
+            signing_input = f"{header_segment}.{payload_segment}".encode("ascii")
+        except (AttributeError, ValueError, binascii.Error) as e:
+            raise TokenError("Malformed token") from e
+        kid = self._kid(header_segment)
+        if not hmac.compare_digest(self._sign(kid, signing_input), signature):
+            raise TokenError("Signature verification failed")
+        try:
+            payload = json.loads(_b64decode(payload_segment))
+        except (binascii.Error, ValueError) as e:
+            raise TokenError("Malformed token payload") from e
+        if not isinstance(payload, dict):
+            raise TokenError("Malformed token payload")
+        exp = payload.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise TokenError("Invalid expiration claim")
+            if exp < time.time():
+                raise TokenError("Token has expired")
+        return payload
+
+
+# Service used to issue and verify every token of the application
+token_service = TokenService.from_settings()
@@ -0,0 +1,55 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of strings.
+
+    Membership tests never give false negatives; false positives happen with
+    roughly the configured probability once `capacity` items were added.
+    Positions are derived from one BLAKE2b digest with double hashing.
+
+    Attributes:
+        capacity (int): The number of items the filter is sized for.
+        error_rate (float): The target false positive probability at capacity.
+        size (int): The number of bits.
+        hash_count (int): The number of bit positions per item.
+        count (int): The number of items added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        """
+        Add an item to the filter.
+
+        Args:
+            item (str): The item to add.
+
+        Returns:
+            None
+        """
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
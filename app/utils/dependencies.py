@@ -1,12 +1,24 @@
 import logging
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from jose import jwt, JWTError
-from app.database.database import SessionLocal
+from app.database.database import AsyncSessionLocal, SessionLocal
 from app.models.user import User
-from app.services.auth import SECRET_KEY, ALGORITHM
-from app.services.redis_cache import redis_client  # Import Redis client
-import json
+from app.services.tokens import TokenError, token_service
+from app.config import settings
+from app.services import token_denylist
+from app.services.redis_cache import cache_user, get_cached_user, get_tokens_watermark
+from app.services.redis_cache import (
+    cache_user_async,
+    get_cached_user_async,
+    get_tokens_watermark_async,
+)
+from app.services.redis_cache import has_recent_write, has_recent_write_async
+from app.database.replicas import replica_router
+from app.utils.principal import principal_claims, resolve_principal
+from app.utils.token_cache import token_cache
+import time
 
 
 # Configure logging
@@ -30,16 +42,159 @@ def get_db():
         db.close()
 
 
-def get_current_user(token: str, db: Session = Depends(get_db)) -> User:
+async def get_async_db():
+    """
+    Dependency to provide an async database session.
+
+    Yields:
+        AsyncSession: A SQLAlchemy async database session, closed after use.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request):
+    """
+    Dependency to provide a database session for read-only endpoints.
+
+    The session is opened on one of the read replicas (see `ReplicaRouter`),
+    or on the primary if none is available. A user who wrote within the last
+    `DB_READ_YOUR_WRITES_WINDOW` seconds reads from the primary.
+
+    Args:
+        request (Request): The incoming request.
+
+    Yields:
+        Session: A SQLAlchemy database session, closed after use.
+    """
+    primary = False
+    if replica_router.replicas:
+        claims = resolve_principal(request)
+        if claims and "uid" in claims:
+            primary = has_recent_write(claims["uid"])
+    db = replica_router.open_session(primary=primary)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    """
+    Dependency to provide an async database session for read-only endpoints.
+
+    Routed like `get_read_db`.
+
+    Args:
+        request (Request): The incoming request.
+
+    Yields:
+        AsyncSession: A SQLAlchemy async database session, closed after use.
+    """
+    primary = False
+    if replica_router.replicas:
+        claims = resolve_principal(request)
+        if claims and "uid" in claims:
+            primary = await has_recent_write_async(claims["uid"])
+    db = await replica_router.open_async_session(primary=primary)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=401,
+        detail="Invalid token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _cached_token_user(token: str):
+    # Return the claims and user of a token verified recently by this
+    # process, if any; the caller checks the denylist
+    cached_token = token_cache.get(token)
+    if not cached_token:
+        return None
+    claims, user_data = cached_token
+    return claims, User(**user_data)
+
+
+def _check_revoked(payload: dict, revoked: bool) -> None:
+    # Reject tokens found in the token denylist
+    if revoked:
+        logger.warning(f"Revoked token used for user {payload.get('sub')}.")
+        raise _credentials_exception()
+
+
+def _verified_claims(token: str, request: Request = None) -> dict:
+    # Decode the JWT token, unless the rate limiter already did
+    try:
+        payload = principal_claims(request, token) if request is not None else None
+        if payload is None:
+            payload = token_service.verify(token)
+    except TokenError as e:
+        # Handle JWT decoding errors
+        logger.error(f"JWT decoding error: {e}")
+        raise _credentials_exception()
+    email = payload.get("sub")
+    if email is None:
+        logger.warning("Token does not contain a valid email.")
+        raise _credentials_exception()
+    return payload
+
+
+def _stateless_user(token: str, payload: dict):
+    # Trust the claims of fresh tokens without any lookup
+    issued_at = payload.get("iat", 0)
+    if time.time() - issued_at > settings.AUTH_CLAIMS_MAX_AGE:
+        return None
+    user_data = {
+        "id": payload["uid"],
+        "email": payload["sub"],
+        "role": payload["role"],
+        "is_active": payload["is_active"],
+        "is_verified": payload["is_verified"],
+    }
+    # Keep the token cached no longer than its claims are trusted
+    expires_at = issued_at + settings.AUTH_CLAIMS_MAX_AGE
+    token_cache.set(
+        token, {**payload, "exp": min(payload["exp"], expires_at)}, user_data
+    )
+    return User(**user_data)
+
+
+def _check_watermark(payload: dict, watermark) -> None:
+    # Reject older tokens issued before the user's tokens were revoked
+    if watermark is not None and payload.get("iat", 0) < watermark:
+        logger.warning(f"Revoked token used for user {payload['sub']}.")
+        raise _credentials_exception()
+
+
+def get_current_user(
+    token: str, request: Request = None, db: Session = Depends(get_db)
+) -> User:
     """
     Retrieve the current user based on the provided JWT token, with Redis caching.
 
-    This function decodes the JWT token to extract the user's email, checks if the user
+    A token seen recently by this process is answered from the in-process token
+    cache, skipping both the signature check and Redis. Revoked tokens are
+    rejected on every path by the token denylist. Otherwise this function
+    decodes the JWT token to extract the user's email, checks if the user
     is cached in Redis, and retrieves the user from the database if not found in the cache.
     The user is then cached in Redis for future requests.
 
+    With `AUTH_STATELESS`, a token carrying user claims and younger than
+    `AUTH_CLAIMS_MAX_AGE` is trusted as is. Older tokens are checked against
+    the user's revocation watermark before the regular lookup.
+
+    A token already verified for this request by the rate limiter is not
+    verified again. Async routes use `get_current_user_async` instead.
+
     Args:
         token (str): The JWT token provided by the client for authentication.
+        request (Request): The incoming request, if any.
         db (Session): A SQLAlchemy database session dependency for querying the database.
 
     Returns:
@@ -48,40 +203,123 @@ def get_current_user(token: str, db: Session = Depends(get_db)) -> User:
     Raises:
         HTTPException: If the token is invalid, expired, or the user does not exist.
     """
-    credentials_exception = HTTPException(
-        status_code=401,
-        detail="Invalid token",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        # Decode the JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if email is None:
-            logger.warning("Token does not contain a valid email.")
-            raise credentials_exception
-
-        # Check if the user is cached in Redis
-        cached_user = redis_client.get(email)
-        if cached_user:
-            logger.info(f"User {email} retrieved from cache.")
-            user_data = json.loads(cached_user)
-            return User(**user_data)
-
-        # If the user is not in the cache, retrieve them from the database
-        user = db.query(User).filter(User.email == email).first()
-        if user is None:
-            logger.warning(f"User with email {email} not found.")
-            raise credentials_exception
-
-        # Cache the user in Redis for 30 minutes
-        redis_client.set(email, json.dumps(user.__dict__), ex=1800)
-        logger.info(f"User {email} cached successfully.")
+    # Check if the token was already verified by this process
+    cached = _cached_token_user(token)
+    if cached is not None:
+        claims, user = cached
+        _check_revoked(claims, token_denylist.is_revoked(claims.get("jti")))
         return user
-    except JWTError as e:
-        # Handle JWT decoding errors
-        logger.error(f"JWT decoding error: {e}")
-        raise credentials_exception
+
+    payload = _verified_claims(token, request)
+    _check_revoked(payload, token_denylist.is_revoked(payload.get("jti")))
+    email = payload["sub"]
+    if settings.AUTH_STATELESS and "uid" in payload:
+        user = _stateless_user(token, payload)
+        if user is not None:
+            return user
+        _check_watermark(payload, get_tokens_watermark(payload["uid"]))
+
+    # Check if the user is cached in Redis
+    user_data = get_cached_user(email)
+    if user_data:
+        logger.info(f"User {email} retrieved from cache.")
+        token_cache.set(token, payload, user_data)
+        return User(**user_data)
+
+    # If the user is not in the cache, retrieve them from the database
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        logger.warning(f"User with email {email} not found.")
+        raise _credentials_exception()
+
+    # Cache a snapshot of the user in Redis for 30 minutes
+    user_data = cache_user(user)
+    logger.info(f"User {email} cached successfully.")
+    token_cache.set(token, payload, user_data)
+    return user
+
+
+async def get_current_user_async(
+    token: str, request: Request, db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Retrieve the current user like `get_current_user`, without blocking.
+
+    Redis, including the token denylist, is queried with the async client
+    and the user is loaded with the async session, so async routes authenticate on the event loop without
+    taking a threadpool thread or a sync database connection. The session is
+    the route's own when the route depends on `get_async_db`; it only
+    connects when the user is not cached.
+
+    Args:
+        token (str): The JWT token provided by the client for authentication.
+        request (Request): The incoming request.
+        db (AsyncSession): A SQLAlchemy async database session.
+
+    Returns:
+        User: The authenticated user.
+
+    Raises:
+        HTTPException: If the token is invalid, expired, or the user does not exist.
+    """
+    # Check if the token was already verified by this process
+    cached = _cached_token_user(token)
+    if cached is not None:
+        claims, user = cached
+        _check_revoked(
+            claims, await token_denylist.is_revoked_async(claims.get("jti"))
+        )
+        return user
+
+    payload = _verified_claims(token, request)
+    _check_revoked(
+        payload, await token_denylist.is_revoked_async(payload.get("jti"))
+    )
+    email = payload["sub"]
+    if settings.AUTH_STATELESS and "uid" in payload:
+        user = _stateless_user(token, payload)
+        if user is not None:
+            return user
+        _check_watermark(payload, await get_tokens_watermark_async(payload["uid"]))
+
+    # Check if the user is cached in Redis
+    user_data = await get_cached_user_async(email)
+    if user_data:
+        logger.info(f"User {email} retrieved from cache.")
+        token_cache.set(token, payload, user_data)
+        return User(**user_data)
+
+    # If the user is not in the cache, retrieve them from the database
+    user = await db.scalar(select(User).where(User.email == email))
+    if user is None:
+        logger.warning(f"User with email {email} not found.")
+        raise _credentials_exception()
+
+    # Cache a snapshot of the user in Redis for 30 minutes
+    user_data = await cache_user_async(user)
+    logger.info(f"User {email} cached successfully.")
+    token_cache.set(token, payload, user_data)
+    return user
+
+
+def get_current_user_from_replica(
+    token: str, request: Request, db: Session = Depends(get_read_db)
+) -> User:
+    """
+    Retrieve the current user like `get_current_user`, reading from a replica.
+
+    Args:
+        token (str): The JWT token provided by the client for authentication.
+        request (Request): The incoming request.
+        db (Session): A read-only database session (replica or primary).
+
+    Returns:
+        User: The authenticated user.
+
+    Raises:
+        HTTPException: If the token is invalid, expired, or the user does not exist.
+    """
+    return get_current_user(token, request=request, db=db)
 
 
 def admin_required(current_user: User = Depends(get_current_user)):
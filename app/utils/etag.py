@@ -0,0 +1,59 @@
+import hashlib
+import logging
+from datetime import datetime
+
+# Configure logging for the module
+logger = logging.getLogger(__name__)
+
+
+def strong_etag(resource_id: int, updated_at: datetime) -> str:
+    """
+    Build a strong ETag for a single resource.
+
+    Args:
+        resource_id (int): The ID of the resource.
+        updated_at (datetime): The time the resource was last updated.
+
+    Returns:
+        str: The quoted ETag value.
+    """
+    version = updated_at.isoformat() if updated_at else ""
+    return f'"{resource_id}-{version}"'
+
+
+def weak_etag(*parts) -> str:
+    """
+    Build a weak ETag from a version stamp of a collection.
+
+    Args:
+        *parts: Values that change whenever the representation changes.
+
+    Returns:
+        str: The weak ETag value (`W/"..."`).
+    """
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an `If-None-Match` header against an ETag.
+
+    The weak comparison function is used, as required for `If-None-Match`.
+
+    Args:
+        if_none_match (str): The value of the request header (may be None).
+        etag (str): The current ETag of the resource.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
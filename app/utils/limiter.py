@@ -1,26 +1,231 @@
+import inspect
 import logging
-from slowapi import Limiter
+import threading
+from fastapi import Request
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.middleware import SlowAPIMiddleware, _find_route_handler
 from slowapi.util import get_remote_address
+from slowapi.wrappers import LimitGroup
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.models.user import UserRole
+from app.utils.principal import resolve_principal
+from app.utils.sliding_window import SlidingWindowRateLimiter
 
 # Configure logging for the module
 logger = logging.getLogger(__name__)
 
+# Tier of requests without a valid access token, limited per client address
+ANONYMOUS_TIER = "anonymous"
+
+# Costs of routes against the principal's budget, by qualified function name
+_route_costs = {}
+
+
+def get_rate_limit_key(request: Request) -> str:
+    """
+    Identify the principal a request is limited as.
+
+    Requests with a valid access token are limited per user, so users behind
+    one shared address do not share a limit. Other requests are limited per
+    client address. The key starts with the principal's tier.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        str: The key, e.g. `user:42` or `anonymous:203.0.113.7`.
+    """
+    claims = resolve_principal(request)
+    if claims:
+        role = claims.get("role", UserRole.USER.value)
+        return f"{role}:{claims.get('uid', claims['sub'])}"
+    return f"{ANONYMOUS_TIER}:{get_remote_address(request)}"
+
+
+def principal_limit(key: str) -> str:
+    """
+    Return the request budget of a principal's tier.
+
+    Args:
+        key (str): The key from `get_rate_limit_key`.
+
+    Returns:
+        str: The limit of the tier from `RATE_LIMIT_TIERS`.
+    """
+    tier = key.split(":", 1)[0]
+    tiers = settings.RATE_LIMIT_TIERS
+    return tiers.get(tier) or tiers[UserRole.USER.value]
+
+
+def rate_limit_cost(cost: int):
+    """
+    Set how much of the principal's budget a route consumes per request.
+
+    Routes without a cost consume 1. Apply it to the route function, in any
+    position relative to `limiter.limit`.
+
+    Args:
+        cost (int): The cost of one request.
+
+    Returns:
+        Callable: The decorator, returning the route function unchanged.
+    """
+
+    def decorator(func):
+        _route_costs[f"{func.__module__}.{func.__name__}"] = cost
+        return func
+
+    return decorator
+
+
+def route_cost(request: Request) -> int:
+    """
+    Return the cost of the route a request is for.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        int: The cost set with `rate_limit_cost`, or 1.
+    """
+    endpoint = getattr(request.state, "rate_limit_endpoint", None)
+    if endpoint is None:
+        return 1
+    return _route_costs.get(f"{endpoint.__module__}.{endpoint.__name__}", 1)
+
+
+class _ThreadLocalLimitGroup(LimitGroup):
+    """
+    LimitGroup keeping the request it resolves limits for per thread.
+
+    SlowAPI stores the request on the group shared by all requests, and
+    checks run concurrently in the threadpool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._local = threading.local()
+        super().__init__(*args, **kwargs)
+
+    @property
+    def request(self):
+        return getattr(self._local, "request", None)
+
+    @request.setter
+    def request(self, request):
+        self._local.request = request
+
+
+class DistributedLimiter(Limiter):
+    """
+    SlowAPI limiter enforcing its limits with a Redis sliding window.
+
+    The limits are shared by every worker and survive restarts. The in-memory
+    storage SlowAPI creates is only used while Redis cannot be reached.
+    Application-wide limits are charged `application_cost` per request, which
+    may be a callable of the request, instead of SlowAPI's fixed 1.
+    """
+
+    def __init__(self, *args, application_limits=(), application_cost=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._limiter = SlidingWindowRateLimiter(self._storage)
+        self._application_limits = [
+            _ThreadLocalLimitGroup(
+                limit,
+                self._key_func,
+                "global",
+                False,
+                None,
+                None,
+                None,
+                application_cost,
+                False,
+            )
+            for limit in application_limits
+        ]
+
+    def _check_request_limit(self, request, endpoint_func, in_middleware=True):
+        # Remember the endpoint, so its cost can be looked up by `route_cost`
+        request.state.rate_limit_endpoint = endpoint_func
+        # SlowAPI only hands the request to route limits; application limits
+        # need it too, to resolve tiers from the key. Groups keep it per thread
+        for group in self._application_limits:
+            group.with_request(request)
+        super()._check_request_limit(request, endpoint_func, in_middleware)
+
+
+class RateLimitMiddleware(SlowAPIMiddleware):
+    """
+    SlowAPI middleware checking the limits in the threadpool.
+
+    SlowAPI checks limits synchronously, and a check not covered by a lease
+    is a Redis round trip, which on the event loop would stall every request
+    of the worker. Limits of routes decorated with `limiter.limit` are checked
+    here as well, so the decorator finds the check done and does not repeat it
+    on the event loop.
+    """
+
+    async def dispatch(self, request, call_next):
+        app = request.app
+        limiter = app.state.limiter
+        if not limiter.enabled or not limiter._auto_check:
+            return await call_next(request)
+
+        handler = _find_route_handler(app.routes, request.scope)
+        if handler is None:
+            return await call_next(request)
+        name = f"{handler.__module__}.{handler.__name__}"
+        if name in limiter._exempt_routes:
+            return await call_next(request)
+        decorated = (
+            name in limiter._route_limits or name in limiter._dynamic_route_limits
+        )
+
+        try:
+            await run_in_threadpool(
+                limiter._check_request_limit, request, handler, not decorated
+            )
+        except Exception as e:
+            exception_handler = app.exception_handlers.get(
+                type(e), _rate_limit_exceeded_handler
+            )
+            response = exception_handler(request, e)
+            if inspect.isawaitable(response):
+                response = await response
+            return response
+
+        if decorated:
+            request.state._rate_limiting_complete = True
+            return await call_next(request)
+        response = await call_next(request)
+        return limiter._inject_headers(response, request.state.view_rate_limit)
+
+
 # Initialize the rate limiter
-# The `key_func` determines how to identify clients (e.g., by their remote address)
-limiter = Limiter(key_func=get_remote_address)
+# Every request spends its route's cost from one budget per principal
+limiter = DistributedLimiter(
+    key_func=get_rate_limit_key,
+    application_limits=[principal_limit],
+    application_cost=route_cost,
+)
 
 # Log the initialization of the rate limiter
-logger.info("Rate limiter initialized with key function: get_remote_address")
+logger.info("Rate limiter initialized with key function: get_rate_limit_key")
 
 """
 This module sets up a rate limiter using the `slowapi` library.
 
 Classes and Variables:
-- limiter: An instance of `Limiter` that uses the client's remote address as the key function.
+- DistributedLimiter: A `Limiter` whose limits are kept in Redis and shared by all workers.
+- RateLimitMiddleware: The SlowAPI middleware, checking limits in the threadpool.
+- limiter: An instance of `DistributedLimiter` giving every principal one budget per tier.
 
 Functions:
-- get_remote_address: A utility function from `slowapi` to retrieve the client's IP address.
+- get_rate_limit_key: Identifies the principal (user or client address) of a request.
+- principal_limit: Returns the budget of a principal's tier.
+- rate_limit_cost: Decorator setting the cost of a route.
+- route_cost: Returns the cost of a request's route.
 
 Usage:
-Import this module and use the `limiter` instance to apply rate limiting to your Flask routes.
+Import this module and use the `limiter` instance to apply rate limiting to your FastAPI routes.
 """
@@ -0,0 +1,247 @@
+import threading
+from bisect import bisect_left
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values, with Prometheus-style buckets.
+
+    Observing a value costs one binary search and one increment under a lock.
+
+    Attributes:
+        buckets (tuple): The upper bounds of the buckets, in increasing order.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Record one value.
+
+        Args:
+            value (float): The observed value.
+
+        Returns:
+            None
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        """
+        Return the current state of the histogram.
+
+        Returns:
+            dict: The cumulative `buckets` by upper bound ("+Inf" for the last
+            one), and the `sum` and `count` of the observed values.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"buckets": buckets, "sum": total, "count": cumulative}
+
+
+class HistogramFamily:
+    """
+    Histograms sharing their buckets, one per combination of label values.
+
+    Attributes:
+        label_names (tuple): The names of the labels.
+        buckets (tuple): The upper bounds of the buckets of every histogram.
+    """
+
+    def __init__(self, label_names, buckets):
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Histogram:
+        """
+        Return the histogram of some label values, creating it on first use.
+
+        Args:
+            *values: The label values, in the order of `label_names`.
+
+        Returns:
+            Histogram: The histogram of these values.
+        """
+        histogram = self._histograms.get(values)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(values, Histogram(self.buckets))
+        return histogram
+
+    def snapshot(self) -> dict:
+        """
+        Return the current state of every histogram.
+
+        Returns:
+            dict: The snapshot of each histogram by its tuple of label values.
+        """
+        return {
+            values: histogram.snapshot()
+            for values, histogram in list(self._histograms.items())
+        }
+
+
+class Counter:
+    """
+    Monotonically increasing value.
+    """
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Gauge(Counter):
+    """
+    Value that goes up and down, e.g. the number of requests in progress.
+    """
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+
+class CounterFamily:
+    """
+    Counters (or gauges) of one metric, one per combination of label values.
+
+    Attributes:
+        label_names (tuple): The names of the labels.
+    """
+
+    def __init__(self, label_names, kind=Counter):
+        self.label_names = tuple(label_names)
+        self._kind = kind
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Counter:
+        """
+        Return the counter of some label values, creating it on first use.
+
+        Args:
+            *values: The label values, in the order of `label_names`.
+
+        Returns:
+            Counter: The counter of these values.
+        """
+        counter = self._values.get(values)
+        if counter is None:
+            with self._lock:
+                counter = self._values.setdefault(values, self._kind())
+        return counter
+
+    def snapshot(self) -> dict:
+        """
+        Return the current value of every counter.
+
+        Returns:
+            dict: The value of each counter by its tuple of label values.
+        """
+        return {values: counter.value for values, counter in list(self._values.items())}
+
+
+def metric(name: str, kind: str, help_text: str, samples: list) -> dict:
+    """
+    Build a metric in the JSON-serializable form collected and rendered here.
+
+    Args:
+        name (str): The metric name.
+        kind (str): The Prometheus type ("counter", "gauge" or "histogram").
+        help_text (str): The description of the metric.
+        samples (list): The samples as `[suffix, labels, value]` lists.
+
+    Returns:
+        dict: The metric.
+    """
+    return {"name": name, "type": kind, "help": help_text, "samples": samples}
+
+
+def counter_samples(label_names, snapshot: dict) -> list:
+    """
+    Turn a `CounterFamily` snapshot into samples.
+
+    Args:
+        label_names (tuple): The names of the labels.
+        snapshot (dict): The values by tuple of label values.
+
+    Returns:
+        list: The samples.
+    """
+    return [
+        ["", dict(zip(label_names, values)), value]
+        for values, value in snapshot.items()
+    ]
+
+
+def histogram_samples(labels: dict, snapshot: dict) -> list:
+    """
+    Turn a `Histogram` snapshot into `_bucket`, `_sum` and `_count` samples.
+
+    Args:
+        labels (dict): The labels of the histogram.
+        snapshot (dict): The snapshot from `Histogram.snapshot()`.
+
+    Returns:
+        list: The samples.
+    """
+    samples = [
+        ["_bucket", {**labels, "le": bound}, count]
+        for bound, count in snapshot["buckets"].items()
+    ]
+    samples.append(["_sum", labels, snapshot["sum"]])
+    samples.append(["_count", labels, snapshot["count"]])
+    return samples
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(metrics: list) -> str:
+    """
+    Render metrics in the Prometheus text exposition format.
+
+    Metrics of the same name (e.g. from several worker processes) are
+    rendered under one HELP and TYPE header.
+
+    Args:
+        metrics (list): The metrics from `metric()`.
+
+    Returns:
+        str: The exposition text.
+    """
+    grouped = {}
+    for item in metrics:
+        grouped.setdefault(item["name"], (item, []))[1].extend(item["samples"])
+    lines = []
+    for name, (item, samples) in grouped.items():
+        lines.append(f"# HELP {name} {_escape(item['help'])}")
+        lines.append(f"# TYPE {name} {item['type']}")
+        for suffix, labels, value in samples:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(
+                f"{name}{suffix}{{{label_text}}} {value}"
+                if label_text
+                else f"{name}{suffix} {value}"
+            )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,91 @@
+import base64
+import json
+import logging
+from fastapi import HTTPException
+
+# Configure logging for the module
+logger = logging.getLogger(__name__)
+
+# Default and maximum number of items returned in a single page
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort key of the last returned row into an opaque cursor.
+
+    Args:
+        *values: The values of the sort key (e.g. the contact ID).
+
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: tuple = (int,)) -> list:
+    """
+    Decode an opaque cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor string received from the client.
+        types (tuple): The expected type of each value of the sort key. Integers
+            are accepted where floats are expected.
+
+    Returns:
+        list: The values of the sort key stored in the cursor.
+
+    Raises:
+        HTTPException: If the cursor is malformed or holds values of other types.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(f"Cursor must contain a list of {len(types)} values.")
+        for value, expected in zip(values, types):
+            accepted = (int, float) if expected is float else expected
+            # JSON booleans are ints in Python, but never valid keys
+            if isinstance(value, bool) or not isinstance(value, accepted):
+                raise ValueError(
+                    f"Cursor value {value!r} is not a {expected.__name__}."
+                )
+        return values
+    except ValueError as e:
+        logger.warning(f"Invalid pagination cursor: {e}")
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate(db, stmt, key_column, limit: int, cursor: str = None):
+    """
+    Fetch one page of a SELECT statement using keyset pagination.
+
+    Rows are ordered by `key_column` and the page starts right after the key
+    stored in `cursor`, so every page is served by an index range scan
+    regardless of how deep the client has paged.
+
+    Args:
+        db (AsyncSession): The database session.
+        stmt (Select): The statement selecting the ORM entities to paginate.
+        key_column: The unique, indexed column used as the sort key.
+        limit (int): The maximum number of rows to return.
+        cursor (str, optional): The cursor returned with the previous page.
+
+    Returns:
+        tuple: The rows of the page and the cursor for the next page
+        (None if this is the last page).
+    """
+    if cursor is not None:
+        (last_key,) = decode_cursor(cursor, types=(key_column.type.python_type,))
+        stmt = stmt.where(key_column > last_key)
+
+    # Fetch one extra row to find out whether another page exists
+    result = await db.scalars(stmt.order_by(key_column).limit(limit + 1))
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], key_column.key))
+    return rows, next_cursor
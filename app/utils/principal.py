@@ -0,0 +1,60 @@
+import logging
+from typing import Optional
+from fastapi import Request
+from app.services.tokens import TokenError, token_service
+from app.utils.token_cache import token_cache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def resolve_principal(request: Request) -> Optional[dict]:
+    """
+    Return the verified claims of the access token a request carries.
+
+    The token is verified at most once per request: the result is kept on
+    `request.state`, where the rate limiter (which runs first) and
+    `get_current_user` both find it. Tokens verified recently by this process
+    are taken from the token cache without verifying them again. Revocation
+    is not checked here; `get_current_user` still does that.
+
+    Args:
+        request (Request): The incoming request, with the token in its `token`
+            query parameter.
+
+    Returns:
+        dict: The claims of the token, or None if there is no valid token.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal[1]
+    token = request.query_params.get("token")
+    claims = None
+    if token:
+        cached_token = token_cache.get(token)
+        if cached_token:
+            claims = cached_token[0]
+        else:
+            try:
+                claims = token_service.verify(token)
+            except TokenError as e:
+                logger.debug(f"Request token rejected: {e}")
+    request.state.principal = (token, claims)
+    return claims
+
+
+def principal_claims(request: Request, token: str) -> Optional[dict]:
+    """
+    Return the claims verified by `resolve_principal` if they belong to `token`.
+
+    Args:
+        request (Request): The incoming request.
+        token (str): The token being authenticated.
+
+    Returns:
+        dict: The claims of the token, or None if it was not verified yet.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None and principal[0] == token:
+        return principal[1]
+    return None
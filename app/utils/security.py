@@ -1,7 +1,7 @@
 from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from jose import jwt, JWTError
-from app.config import settings
+from datetime import timedelta
+from app.services import token_denylist
+from app.services.tokens import TokenError, token_service
 import logging
 
 # Configure logging
@@ -48,16 +48,8 @@ def create_access_token(data: dict) -> str:
     Returns:
         str: The encoded JWT access token.
     """
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(
-        minutes=15
-    )  # Access token valid for 15 minutes
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    logger.info("Access token created successfully.")
-    return encoded_jwt
+    # Access token valid for 15 minutes
+    return token_service.issue(data, timedelta(minutes=15))
 
 
 def verify_access_token(token: str) -> str:
@@ -71,20 +63,21 @@ def verify_access_token(token: str) -> str:
         str: The email extracted from the token if valid, None otherwise.
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = token_service.verify(token)
         email: str = payload.get("sub")
         if email is None:
             logger.warning("Access token verification failed: no email found.")
             return None
-        logger.info("Access token verified successfully.")
         return email
-    except JWTError as e:
+    except TokenError as e:
         logger.error(f"Access token verification failed: {e}")
         return None
 
 
+# Lifetime of refresh tokens and of the sessions they belong to
+REFRESH_TOKEN_EXPIRE = timedelta(days=1)
+
+
 def create_refresh_token(data: dict) -> str:
     """
     Create a refresh token with a longer expiration time (e.g., 1 day).
@@ -95,36 +88,44 @@ def create_refresh_token(data: dict) -> str:
     Returns:
         str: The encoded JWT refresh token.
     """
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=1)  # Refresh token valid for 1 day
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    logger.info("Refresh token created successfully.")
-    return encoded_jwt
+    return token_service.issue(data, REFRESH_TOKEN_EXPIRE)
 
 
-def verify_refresh_token(token: str) -> str:
+def verify_refresh_claims(token: str) -> dict:
     """
-    Verify the refresh token and extract the email if valid.
+    Verify the refresh token and return its claims if valid.
+
+    Revoked refresh tokens (see `/auth/logout`) are rejected.
 
     Args:
         token (str): The JWT refresh token to verify.
 
     Returns:
-        str: The email extracted from the token if valid, None otherwise.
+        dict: The claims of the token if valid, None otherwise.
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
+        payload = token_service.verify(token)
+        if payload.get("sub") is None:
             logger.warning("Refresh token verification failed: no email found.")
             return None
-        logger.info("Refresh token verified successfully.")
-        return email
-    except JWTError as e:
+        if token_denylist.is_revoked(payload.get("jti")):
+            logger.warning("Refresh token verification failed: token revoked.")
+            return None
+        return payload
+    except TokenError as e:
         logger.error(f"Refresh token verification failed: {e}")
         return None
+
+
+def verify_refresh_token(token: str) -> str:
+    """
+    Verify the refresh token and extract the email if valid.
+
+    Args:
+        token (str): The JWT refresh token to verify.
+
+    Returns:
+        str: The email extracted from the token if valid, None otherwise.
+    """
+    payload = verify_refresh_claims(token)
+    return payload["sub"] if payload else None
@@ -0,0 +1,274 @@
+import logging
+import threading
+import time
+import uuid
+from itertools import count
+import redis
+from limits import RateLimitItem
+from limits.storage import Storage
+from limits.strategies import MovingWindowRateLimiter, RateLimiter
+from limits.util import WindowStats
+from app.config import settings
+from app.services import redis_cache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Sliding-window check in one round trip. The window is a sorted set of one
+# member per consumed unit, scored by the Redis server's clock in milliseconds.
+# Members given after the member prefix are unused units of an earlier lease
+# and are removed first. When the request fits, up to ARGV[4] extra units are
+# consumed as a lease for the calling worker, but never more than a tenth of
+# what would remain.
+# ARGV: window in ms, limit, cost, maximum lease, member prefix, refunded members.
+# Returns {allowed, remaining, leased or reset time in ms}.
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+if #ARGV > 5 then
+    redis.call('ZREM', KEYS[1], unpack(ARGV, 6))
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local used = redis.call('ZCARD', KEYS[1])
+if used + cost > limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    local reset = now + window
+    if oldest[2] then
+        reset = tonumber(oldest[2]) + window
+    end
+    return {0, limit - used, reset}
+end
+local lease = math.min(tonumber(ARGV[4]), math.floor((limit - used - cost) / 10))
+local members = {}
+for i = 1, cost + lease do
+    members[#members + 1] = now
+    members[#members + 1] = ARGV[5] .. ':' .. i
+end
+redis.call('ZADD', KEYS[1], unpack(members))
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, limit - used - cost - lease, lease}
+"""
+
+
+class _Lease:
+    """
+    Units of a limit consumed in Redis ahead of time by this worker.
+
+    The units are the window members `{member}:{first}` onwards, spent in order.
+    """
+
+    __slots__ = ("units", "expires_at", "member", "first")
+
+    def __init__(self, units: int, expires_at: float, member: str, first: int):
+        self.units = units
+        self.expires_at = expires_at
+        self.member = member
+        self.first = first
+
+    def unused_members(self) -> list:
+        return [
+            f"{self.member}:{i}" for i in range(self.first, self.first + self.units)
+        ]
+
+
+class SlidingWindowRateLimiter(RateLimiter):
+    """
+    Sliding-window rate limiting shared by every worker through Redis.
+
+    Each hit runs one Lua script that trims the window, counts it and records
+    the hit atomically, so a limit holds across workers and restarts. While a
+    key is far from its limit, the script also hands the worker a small lease
+    of units (at most `RATE_LIMIT_LEASE_MAX`, and a tenth of the remaining
+    budget) that the worker spends locally for up to `RATE_LIMIT_LEASE_TTL`
+    seconds without calling Redis. Leased units count as used from the moment
+    they are leased, so leasing can only make a limit stricter; near the limit
+    no units are leased and every hit goes to Redis. Units left when a lease
+    expires or is replaced are removed from the window by the worker's next
+    script call for the key, so only the units actually spent stay counted.
+
+    If Redis cannot be reached, hits are counted in the per-process storage
+    given to the constructor instead.
+    """
+
+    def __init__(self, storage: Storage):
+        super().__init__(storage)
+        self._fallback = MovingWindowRateLimiter(storage)
+        self._leases = {}
+        # Unused members of dropped leases, removed with the next call per key
+        self._refunds = {}
+        self._lock = threading.Lock()
+        self._member_prefix = uuid.uuid4().hex[:12]
+        self._sequence = count()
+        self._script = None
+
+    @property
+    def client(self):
+        return redis_cache.redis_client
+
+    def _sliding_window(self):
+        # Registered once per client, so the script's SHA1 is not recomputed per hit
+        client = self.client
+        if self._script is None or self._script.registered_client is not client:
+            self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        return self._script
+
+    def _redis_key(self, item: RateLimitItem, identifiers) -> str:
+        return f"ratelimit:{item.key_for(*identifiers)}"
+
+    def _take_lease(self, key: str, cost: int):
+        # Returns whether the lease covered the hit, and otherwise the members
+        # of dropped leases to remove from the window
+        with self._lock:
+            lease = self._leases.get(key)
+            if (
+                lease is not None
+                and lease.expires_at > time.monotonic()
+                and lease.units >= cost
+            ):
+                lease.units -= cost
+                lease.first += cost
+                return True, []
+            refund = self._refunds.pop(key, [])
+            if lease is not None:
+                del self._leases[key]
+                refund.extend(lease.unused_members())
+            return False, refund
+
+    def _store_lease(
+        self, key: str, units: int, window: float, member: str, first: int
+    ) -> dict:
+        # Returns the unused members of leases evicted for inactivity, by key
+        now = time.monotonic()
+        ttl = min(settings.RATE_LIMIT_LEASE_TTL, window / 10)
+        evicted = {}
+        with self._lock:
+            # A hit of another thread may have stored a lease meanwhile
+            replaced = self._leases.pop(key, None)
+            if replaced is not None and replaced.units:
+                self._refunds.setdefault(key, []).extend(replaced.unused_members())
+            if units:
+                self._leases[key] = _Lease(units, now + ttl, member, first)
+            # Keys of inactive clients would otherwise accumulate forever
+            if len(self._leases) > 10000:
+                leases = {}
+                for k, lease in self._leases.items():
+                    if lease.expires_at > now:
+                        leases[k] = lease
+                    elif lease.units:
+                        evicted[k] = lease.unused_members()
+                self._leases = leases
+                for k in [k for k in self._refunds if k not in leases]:
+                    evicted.setdefault(k, []).extend(self._refunds.pop(k))
+        return evicted
+
+    def _refund(self, refunds: dict) -> None:
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for key, members in refunds.items():
+                pipeline.zrem(key, *members)
+            pipeline.execute()
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Could not return unused rate limit units: {e}")
+
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        """
+        Consume `cost` units of a limit.
+
+        Args:
+            item (RateLimitItem): The rate limit.
+            *identifiers (str): The strings identifying the limited client and route.
+            cost (int): The number of units the request consumes.
+
+        Returns:
+            bool: True if the request is within the limit.
+        """
+        key = self._redis_key(item, identifiers)
+        taken, refund = self._take_lease(key, cost)
+        if taken:
+            return True
+        window = item.get_expiry()
+        member = f"{self._member_prefix}:{next(self._sequence)}"
+        try:
+            allowed, _, leased = self._sliding_window()(
+                keys=[key],
+                args=[
+                    window * 1000,
+                    item.amount,
+                    cost,
+                    settings.RATE_LIMIT_LEASE_MAX,
+                    member,
+                    *refund,
+                ],
+            )
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Rate limit storage unavailable, limiting locally: {e}")
+            return self._fallback.hit(item, *identifiers, cost=cost)
+        # The script names the leased units after the cost's units
+        evicted = self._store_lease(
+            key, leased if allowed else 0, window, member, cost + 1
+        )
+        if evicted:
+            self._refund(evicted)
+        return bool(allowed)
+
+    def test(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        """
+        Check whether `cost` units of a limit are available, without consuming them.
+
+        Args:
+            item (RateLimitItem): The rate limit.
+            *identifiers (str): The strings identifying the limited client and route.
+            cost (int): The number of units the request would consume.
+
+        Returns:
+            bool: True if the request would be within the limit.
+        """
+        return self.get_window_stats(item, *identifiers).remaining >= cost
+
+    def get_window_stats(self, item: RateLimitItem, *identifiers: str) -> WindowStats:
+        """
+        Return the remaining units of a limit and when the window frees up.
+
+        Args:
+            item (RateLimitItem): The rate limit.
+            *identifiers (str): The strings identifying the limited client and route.
+
+        Returns:
+            WindowStats: The reset time as a UNIX timestamp and the remaining units.
+        """
+        key = self._redis_key(item, identifiers)
+        window = item.get_expiry()
+        now = time.time()
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.zcount(key, (now - window) * 1000, "+inf")
+            pipeline.zrangebyscore(
+                key, (now - window) * 1000, "+inf", start=0, num=1, withscores=True
+            )
+            used, oldest = pipeline.execute()
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Rate limit storage unavailable, limiting locally: {e}")
+            return self._fallback.get_window_stats(item, *identifiers)
+        reset = oldest[0][1] / 1000 + window if oldest else now + window
+        return WindowStats(reset, max(0, item.amount - used))
+
+    def clear(self, item: RateLimitItem, *identifiers: str) -> None:
+        """
+        Reset a limit.
+
+        Args:
+            item (RateLimitItem): The rate limit.
+            *identifiers (str): The strings identifying the limited client and route.
+
+        Returns:
+            None
+        """
+        key = self._redis_key(item, identifiers)
+        with self._lock:
+            self._leases.pop(key, None)
+            self._refunds.pop(key, None)
+        self._fallback.clear(item, *identifiers)
+        self.client.delete(key)
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from app.config import settings
+
+# Configure logging for the module
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    Bounded in-process LRU cache of verified access tokens.
+
+    Entries are keyed by a SHA-256 digest of the token, so raw tokens are
+    never kept in memory. Each entry holds the decoded claims and a snapshot
+    of the user's columns, and expires at the token's `exp` or after `ttl`
+    seconds, whichever comes first. The cache is shared by the threadpool
+    workers running sync dependencies, hence the lock.
+
+    Attributes:
+        maxsize (int): The maximum number of cached tokens.
+        ttl (int): The maximum lifetime of an entry in seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str):
+        """
+        Look up a verified token.
+
+        Args:
+            token (str): The raw access token.
+
+        Returns:
+            tuple: The cached `(claims, user_data)` pair, or None if the token
+            is not cached or its entry has expired.
+        """
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims, user_data = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims, user_data
+
+    def set(self, token: str, claims: dict, user_data: dict) -> None:
+        """
+        Cache a verified token, evicting the least recently used entry if full.
+
+        Args:
+            token (str): The raw access token.
+            claims (dict): The decoded and verified claims of the token.
+            user_data (dict): A snapshot of the user's columns.
+
+        Returns:
+            None
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if claims.get("exp") is not None:
+            expires_at = min(expires_at, claims["exp"])
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims, user_data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard_user(self, email: str) -> None:
+        """
+        Drop every cached token of a user whose snapshot was invalidated.
+
+        Other processes keep their entries until `ttl` runs out.
+
+        Args:
+            email (str): The user's email address.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            for key in [
+                key
+                for key, (_, _, user_data) in self._entries.items()
+                if user_data.get("email") == email
+            ]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Drop every cached token, e.g. after users were changed or deleted.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Return the usage counters of the cache.
+
+        Returns:
+            dict: The size, hits, misses, evictions, expirations and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Process-wide cache used by `get_current_user`
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
@@ -0,0 +1,106 @@
+"""
+Benchmark contacts endpoint throughput under concurrent clients.
+
+The script opens N concurrent clients against one or more running
+deployments and reports requests per second and latency percentiles for
+each concurrency level. To compare the threadpool-bound sync handlers
+with the async stack, start one server per build and pass both as
+targets.
+
+Usage:
+    uvicorn main:app --port 8000 --workers 1
+    python -m benchmarks.contacts_concurrency --token <JWT> \\
+        --target async=http://127.0.0.1:8000 --target sync=http://127.0.0.1:8001 \\
+        --concurrency 50 200 1000 --duration 15
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def client_loop(
+    client: httpx.AsyncClient, path: str, token: str, deadline: float, results: dict
+) -> None:
+    """
+    Issue requests back to back until the deadline and record their latency.
+    """
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, params={"token": token})
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            results["latencies"].append(time.perf_counter() - started)
+        else:
+            results["errors"] += 1
+
+
+async def run_level(
+    base_url: str, path: str, token: str, concurrency: int, duration: float
+) -> dict:
+    """
+    Run one concurrency level against one target.
+    """
+    results = {"latencies": [], "errors": 0}
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            *(
+                client_loop(client, path, token, deadline, results)
+                for _ in range(concurrency)
+            )
+        )
+    return results
+
+
+def summarize(results: dict, duration: float) -> str:
+    latencies = sorted(results["latencies"])
+    if len(latencies) < 2:
+        return f"{'-':>10} {'-':>9} {'-':>9} {results['errors']:>8}"
+    percentiles = statistics.quantiles(latencies, n=100)
+    return (
+        f"{len(latencies) / duration:>10.1f} "
+        f"{percentiles[49] * 1000:>9.1f} {percentiles[98] * 1000:>9.1f} "
+        f"{results['errors']:>8}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        help="name=base_url of a running deployment (repeatable)",
+    )
+    parser.add_argument("--token", required=True, help="Access token of a test user")
+    parser.add_argument("--path", default="/contacts/")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    targets = [target.split("=", 1) for target in args.target]
+    print(
+        f"{'target':>10} {'clients':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>8}"
+    )
+    for concurrency in args.concurrency:
+        for name, base_url in targets:
+            results = await run_level(
+                base_url, args.path, args.token, concurrency, args.duration
+            )
+            print(f"{name:>10} {concurrency:>8} {summarize(results, args.duration)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark login throughput and contact-route latency during a login burst.
+
+The script runs `--logins` concurrent clients posting credentials to
+`/auth/token` and `--readers` concurrent clients reading `/contacts/` at
+the same time, then reports logins per second and the p50/p99 latency of
+the contact reads. Run it once with `PASSWORD_HASH_WORKERS=0` (bcrypt in
+the threadpool) and once with worker processes to compare.
+
+Usage:
+    PASSWORD_HASH_WORKERS=4 uvicorn main:app --port 8000 --workers 1
+    python -m benchmarks.login_throughput --base-url http://127.0.0.1:8000 \\
+        --username user@example.com --password secret --token <JWT> \\
+        --logins 32 --readers 64 --duration 15
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login_loop(
+    client: httpx.AsyncClient, credentials: dict, deadline: float, results: dict
+) -> None:
+    """
+    Log in back to back until the deadline and count successful logins.
+    """
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.post("/auth/token", data=credentials)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        results["logins" if ok else "errors"] += 1
+
+
+async def read_loop(
+    client: httpx.AsyncClient, token: str, deadline: float, results: dict
+) -> None:
+    """
+    Read the contact list back to back until the deadline and record the latency.
+    """
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get("/contacts/", params={"token": token})
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            results["latencies"].append(time.perf_counter() - started)
+        else:
+            results["errors"] += 1
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--token", required=True, help="Access token of a test user")
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    credentials = {"username": args.username, "password": args.password}
+    results = {"logins": 0, "latencies": [], "errors": 0}
+    concurrency = args.logins + args.readers
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=60.0
+    ) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(
+                login_loop(client, credentials, deadline, results)
+                for _ in range(args.logins)
+            ),
+            *(
+                read_loop(client, args.token, deadline, results)
+                for _ in range(args.readers)
+            ),
+        )
+
+    print(f"logins/s:      {results['logins'] / args.duration:.1f}")
+    latencies = results["latencies"]
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100)
+        print(f"reads/s:       {len(latencies) / args.duration:.1f}")
+        print(f"read p50 ms:   {percentiles[49] * 1000:.1f}")
+        print(f"read p99 ms:   {percentiles[98] * 1000:.1f}")
+    print(f"errors:        {results['errors']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark the user snapshot codec against the previous JSON cache format.
+
+The JSON path serializes every column of the user (as the old
+`json.dumps(user.__dict__)` cache did, with datetimes as strings) and
+rebuilds a `User` from all of them. The snapshot path encodes only the
+authorization fields in the binary format. The script reports the
+payload size and the encode and decode time per user.
+
+Usage:
+    python -m benchmarks.user_snapshot_codec --iterations 200000
+"""
+
+import argparse
+import json
+import os
+import timeit
+from datetime import datetime
+
+# The application modules require DATABASE_URL at import time
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.redis_cache import (  # noqa: E402
+    decode_user_snapshot,
+    encode_user_snapshot,
+    user_snapshot,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    user = User(
+        id=123456,
+        email="someone.with.a.long.address@example.com",
+        hashed_password="$2b$12$" + "x" * 53,
+        role=UserRole.USER,
+        is_active=True,
+        is_verified=True,
+        created_at=datetime(2024, 1, 1, 12, 0, 0),
+        updated_at=datetime(2024, 6, 1, 12, 0, 0),
+    )
+    columns = {
+        column.name: getattr(user, column.name) for column in User.__table__.columns
+    }
+    json_payload = json.dumps(columns, default=str)
+    snapshot = user_snapshot(user)
+    binary_payload = encode_user_snapshot(snapshot)
+
+    cases = {
+        "json": (
+            lambda: json.dumps(columns, default=str),
+            lambda: User(**json.loads(json_payload)),
+            len(json_payload.encode("utf-8")),
+        ),
+        "snapshot": (
+            lambda: encode_user_snapshot(user_snapshot(user)),
+            lambda: User(**decode_user_snapshot(binary_payload)),
+            len(binary_payload),
+        ),
+    }
+    print(f"{'format':>10} {'bytes':>7} {'encode us':>10} {'decode us':>10}")
+    for name, (encode, decode, size) in cases.items():
+        encode_us = timeit.timeit(encode, number=args.iterations) / args.iterations
+        decode_us = timeit.timeit(decode, number=args.iterations) / args.iterations
+        print(f"{name:>10} {size:>7} {encode_us * 1e6:>10.2f} {decode_us * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 from app.core.middleware import add_middlewares
+from app.core.metrics import collect_all_workers, metrics_publisher
 from app.core.exception_handlers import add_exception_handlers
 from app.core.routers import add_routers
-from app.core.startup import initialize_database
+from app.core.startup import initialize_async_database, initialize_database
+from app.database.database import get_pool_stats
+from app.database.replicas import replica_router
+from app.services.redis_client import get_redis_latency_stats
+from app.services import password_hasher, token_denylist
+from app.services.email_outbox import email_outbox
+from app.utils.metrics import render_prometheus
 import logging
 
 # Initialize logging
@@ -18,7 +26,8 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for the FastAPI application.
 
     This function is called when the application starts and stops.
-    It initializes the database and logs the application lifecycle events.
+    It initializes the database, starts the token denylist listener, stops
+    the background workers on shutdown and logs the application lifecycle events.
 
     Args:
         app (FastAPI): The FastAPI application instance.
@@ -28,11 +37,19 @@ async def lifespan(app: FastAPI):
     """
     logger.info("Starting application...")
     initialize_database()  # Initialize the database connection or setup
+    await initialize_async_database()  # Same for the async engine's database
+    token_denylist.start()  # Load revoked tokens and follow new revocations
+    email_outbox.start()  # Send queued emails in the background
+    metrics_publisher.start()  # Share this worker's metrics with the others
     logger.info("Application started successfully.")
     yield
     logger.info(
         "Shutting down application..."
     )  # Log when the application is shutting down
+    token_denylist.stop()
+    await email_outbox.stop()
+    await metrics_publisher.stop()
+    password_hasher.shutdown()
 
 
 # Initialize FastAPI application with the lifespan manager
@@ -53,6 +70,46 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/db")
+async def database_pool_health():
+    """
+    Report the live statistics of the database connection pools.
+
+    Returns:
+        dict: The statistics of each pool of this worker process, primary and
+        replicas, including checked out connections, overflow and a histogram
+        of checkout wait times.
+    """
+    return {**get_pool_stats(), **replica_router.get_pool_stats()}
+
+
+@app.get("/health/redis")
+async def redis_latency_health():
+    """
+    Report the latency of the Redis commands run by this worker process.
+
+    Returns:
+        dict: A histogram of latencies in seconds for each Redis command.
+    """
+    return get_redis_latency_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Expose the metrics of every worker process in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Request counts, latency and response size histograms
+        per route, requests in progress, cache hits and misses, connection pool
+        statistics and Redis command latencies.
+    """
+    return PlainTextResponse(
+        render_prometheus(await collect_all_workers()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 # Add middlewares to the application
 add_middlewares(app)
 
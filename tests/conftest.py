@@ -3,6 +3,9 @@ from sqlalchemy.orm import sessionmaker
 from app.database.database import Base
 from app.utils.dependencies import get_db
 from app.models.user import User
+from app.services import token_denylist
+from app.utils.bloom_filter import BloomFilter
+from app.utils.token_cache import token_cache
 from main import app
 import pytest
 
@@ -45,6 +48,18 @@ def setup_test_database():
     Base.metadata.drop_all(bind=engine)
     # Recreate all tables before each test
     Base.metadata.create_all(bind=engine)
+    # Forget tokens verified by previous tests
+    token_cache.clear()
+
+
+# Fixture standing in for a denylist loaded at startup, without revocations
+@pytest.fixture(autouse=True)
+def loaded_token_denylist(monkeypatch):
+    """
+    Gives every test a loaded, empty token denylist, as after startup.
+    """
+    monkeypatch.setattr(token_denylist, "_filter", BloomFilter(100))
+    monkeypatch.setattr(token_denylist, "_loaded", True)
 
 
 # Inspect the database and print the list of tables
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+import fakeredis.aioredis
+import redis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.metrics import (
+    WORKER_ID,
+    WORKER_KEY_PREFIX,
+    WORKERS_KEY,
+    MetricsMiddleware,
+    collect_all_workers,
+    http_request_duration,
+    http_requests_total,
+    metrics_publisher,
+)
+from app.utils.metrics import Histogram, histogram_samples, metric, render_prometheus
+
+
+def create_app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+def test_render_prometheus_groups_samples_by_name():
+    """
+    Test that samples of one metric from several sources share one header.
+    """
+    histogram = Histogram((0.1, 1))
+    histogram.observe(0.5)
+    text = render_prometheus(
+        [
+            metric("requests_total", "counter", "Requests.", [["", {"a": "1"}, 2]]),
+            metric("requests_total", "counter", "Requests.", [["", {"a": "2"}, 3]]),
+            metric(
+                "latency_seconds",
+                "histogram",
+                "Latency.",
+                histogram_samples({}, histogram.snapshot()),
+            ),
+        ]
+    )
+
+    assert text.count("# TYPE requests_total counter") == 1
+    assert 'requests_total{a="1"} 2' in text
+    assert 'requests_total{a="2"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "latency_seconds_count 1" in text
+
+
+def test_middleware_labels_requests_by_route_template():
+    """
+    Test that requests are counted and timed per route template and status.
+    """
+    client = TestClient(create_app())
+    counter = http_requests_total.labels("GET", "/items/{item_id}", "200")
+    before = counter.value
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert counter.value == before + 2
+    assert http_requests_total.labels("GET", "unmatched", "404").value >= 1
+    assert (
+        http_request_duration.labels("GET", "/items/{item_id}").snapshot()["count"] >= 2
+    )
+
+
+def test_collect_all_workers_merges_published_metrics(monkeypatch):
+    """
+    Test that metrics published by other workers are labelled and merged.
+    """
+    fake = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr("app.services.redis_cache.async_redis_client", fake)
+    published = json.dumps(
+        [metric("http_requests_in_progress", "gauge", "In progress.", [["", {}, 7]])]
+    )
+
+    async def scenario():
+        await metrics_publisher.publish_once()
+        await fake.set(f"{WORKER_KEY_PREFIX}other:1", published)
+        await fake.set(f"{WORKER_KEY_PREFIX}gone:2", published)
+        await fake.zadd(WORKERS_KEY, {"other:1": time.time(), "gone:2": 0})
+        metrics = await collect_all_workers()
+        return metrics, await fake.zrange(WORKERS_KEY, 0, -1)
+
+    metrics, registered = asyncio.run(scenario())
+    text = render_prometheus(metrics)
+
+    assert 'http_requests_in_progress{worker="other:1"} 7' in text
+    assert f'http_requests_in_progress{{worker="{WORKER_ID}"}}' in text
+    assert text.count("# TYPE http_requests_in_progress gauge") == 1
+    # Workers that stopped publishing are dropped from the registry
+    assert "gone:2" not in text
+    assert sorted(registered) == sorted([b"other:1", WORKER_ID.encode("utf-8")])
+
+
+def test_collect_all_workers_without_redis(monkeypatch):
+    """
+    Test that the local metrics are still served while Redis is down.
+    """
+    client = MagicMock()
+    client.pipeline.return_value.execute.side_effect = redis.ConnectionError("down")
+    monkeypatch.setattr("app.services.redis_cache.async_redis_client", client)
+
+    text = render_prometheus(asyncio.run(collect_all_workers()))
+
+    assert f'http_requests_in_progress{{worker="{WORKER_ID}"}}' in text
+
+
+def test_metrics_are_local_when_publishing_is_disabled(monkeypatch):
+    """
+    Test that samples carry no worker label when publishing is disabled.
+    """
+    monkeypatch.setattr("app.core.metrics.settings.METRICS_PUBLISH_INTERVAL", 0)
+
+    text = render_prometheus(asyncio.run(collect_all_workers()))
+
+    assert "http_requests_in_progress 0" in text
+    assert "worker=" not in text
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.middleware import SlowAPIMiddleware
+from app.core.metrics import MetricsMiddleware
 from app.core.middleware import add_middlewares
 
 
@@ -35,7 +36,7 @@ def test_add_slowapi_middleware():
         (
             middleware
             for middleware in app.user_middleware
-            if middleware.cls is SlowAPIMiddleware
+            if issubclass(middleware.cls, SlowAPIMiddleware)
         ),
         None,
     )
@@ -54,3 +55,13 @@ def test_limiter_state():
         app.state, "limiter"
     ), "Limiter was not set in the application state."
     assert app.state.limiter is not None, "Limiter is None in the application state."
+
+
+def test_add_metrics_middleware():
+    """
+    Test that the metrics middleware is added as the outermost middleware.
+    """
+    app = FastAPI()
+    add_middlewares(app)
+
+    assert app.user_middleware[0].cls is MetricsMiddleware
@@ -1,5 +1,8 @@
+import asyncio
 from unittest.mock import MagicMock, patch
-from app.core.startup import initialize_database
+from sqlalchemy import inspect
+from app.core.startup import initialize_async_database, initialize_database
+from app.database.database import async_engine
 
 
 def test_initialize_database_success():
@@ -50,3 +53,21 @@ def test_initialize_database_failure():
         mock_logger.error.assert_called_once_with(
             "Failed to create database tables: Database error"
         )
+
+
+def test_initialize_async_database_creates_tables():
+    """
+    Test case: Verifies that the tables exist for the async engine, whose
+    in-memory SQLite database is separate from the sync engine's.
+    """
+
+    async def table_names():
+        await initialize_async_database()
+        async with async_engine.connect() as connection:
+            return await connection.run_sync(
+                lambda sync_connection: inspect(sync_connection).get_table_names()
+            )
+
+    names = asyncio.run(table_names())
+    assert "contacts" in names
+    assert "contacts_fts" in names
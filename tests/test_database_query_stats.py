@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.core.server_timing import ServerTimingMiddleware
+from app.database.query_stats import (
+    current_stats,
+    instrument_engine,
+    normalize_sql,
+    start_request,
+)
+
+
+def create_instrumented_engines():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async_engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    return engine, async_engine
+
+
+def test_normalize_sql():
+    """
+    Test that statements differing only in values normalize to one shape.
+    """
+    assert normalize_sql(
+        "SELECT * FROM contacts\n  WHERE id = 42 AND name = 'O''Brien'"
+    ) == ("SELECT * FROM contacts WHERE id = ? AND name = ?")
+    assert normalize_sql("SELECT * FROM users WHERE id IN (%(id_1)s, %(id_2)s)") == (
+        normalize_sql("SELECT * FROM users WHERE id IN ($1, $2, $3)")
+    )
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == (
+        "INSERT INTO t (a, b) VALUES (?)"
+    )
+    assert (
+        normalize_sql("SELECT CAST(x AS TEXT)::text") == "SELECT CAST(x AS TEXT)::text"
+    )
+
+
+def test_statements_are_recorded_per_request():
+    """
+    Test that statements of the sync and async engines count for the request.
+    """
+    engine, async_engine = create_instrumented_engines()
+
+    async def run_queries():
+        stats = start_request()
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 2"))
+        return stats
+
+    stats = asyncio.run(run_queries())
+
+    assert stats.count == 2
+    assert stats.duration > 0
+    assert stats.shapes["SELECT ?"] == 2
+    assert current_stats() is None
+
+
+def test_slow_statements_are_logged(monkeypatch, caplog):
+    """
+    Test that statements over the threshold are logged with their shape.
+    """
+    monkeypatch.setattr("app.database.query_stats.settings.DB_SLOW_QUERY_THRESHOLD", 0)
+    engine, _ = create_instrumented_engines()
+
+    with caplog.at_level(logging.WARNING, logger="app.database.query_stats"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1 WHERE 'a' = 'a'"))
+
+    assert "Slow query" in caplog.text
+    assert "SELECT ? WHERE ? = ?" in caplog.text
+
+
+def test_server_timing_header_and_repeated_statements(monkeypatch, caplog):
+    """
+    Test that the database work is reported and repeated statements are logged.
+    """
+    monkeypatch.setattr(
+        "app.core.server_timing.settings.DB_REPEATED_QUERY_THRESHOLD", 2
+    )
+    engine, _ = create_instrumented_engines()
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/items")
+    def list_items():
+        with engine.connect() as connection:
+            for item_id in range(3):
+                connection.execute(text(f"SELECT {item_id}"))
+        return []
+
+    with caplog.at_level(logging.WARNING, logger="app.core.server_timing"):
+        response = TestClient(app).get("/items")
+
+    assert response.headers["server-timing"].startswith('db;desc="3 queries";dur=')
+    assert "Possible N+1 query in GET /items: ran 3 times: SELECT ?" in caplog.text
@@ -0,0 +1,99 @@
+import asyncio
+from unittest.mock import patch
+from sqlalchemy import text
+from starlette.requests import Request
+from app.database.replicas import ReplicaRouter
+from app.services.auth import create_access_token
+from app.models.user import User
+from app.utils.dependencies import get_read_db
+
+
+def database_name(db) -> str:
+    """
+    Return the file name of the database a session is bound to.
+    """
+    return db.get_bind().url.database
+
+
+def test_replicas_round_robin(tmp_path):
+    """
+    Test that read sessions alternate between healthy replicas.
+    """
+    router = ReplicaRouter(
+        [f"sqlite:///{tmp_path}/replica1.db", f"sqlite:///{tmp_path}/replica2.db"]
+    )
+    names = []
+    for _ in range(4):
+        db = router.open_session()
+        names.append(database_name(db).rsplit("/", 1)[-1])
+        db.close()
+
+    assert names == ["replica1.db", "replica2.db"] * 2
+
+
+def test_unreachable_replica_falls_back_to_primary(tmp_path):
+    """
+    Test that an unreachable replica is taken out of rotation and the
+    primary is used instead.
+    """
+    router = ReplicaRouter([f"sqlite:///{tmp_path}/missing/replica.db"])
+    db = router.open_session()
+    assert db.execute(text("SELECT 1")).scalar() == 1
+    assert db.get_bind().url.database != router.replicas[0].engine.url.database
+    db.close()
+
+    assert router.replicas[0].is_healthy() is False
+    assert router._candidates() == []
+
+
+def test_async_replica_session(tmp_path):
+    """
+    Test that async read sessions are opened on the replicas too.
+    """
+    router = ReplicaRouter([f"sqlite:///{tmp_path}/replica.db"])
+
+    async def scenario():
+        db = await router.open_async_session()
+        name = db.get_bind().url.database
+        await db.close()
+        primary = await router.open_async_session(primary=True)
+        primary_name = primary.get_bind().url.database
+        await primary.close()
+        return name, primary_name
+
+    name, primary_name = asyncio.run(scenario())
+    assert name.endswith("replica.db")
+    assert not (primary_name or "").endswith("replica.db")
+
+
+def test_get_read_db_sticks_to_primary_after_write(tmp_path):
+    """
+    Test that a user who just wrote reads from the primary.
+    """
+    router = ReplicaRouter([f"sqlite:///{tmp_path}/replica.db"])
+    user = User(
+        id=7, email="test@example.com", role="user", is_active=True, is_verified=True
+    )
+    token = create_access_token({"sub": user.email}, user=user)
+    request = Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/users/me/",
+            "query_string": f"token={token}".encode(),
+            "headers": [],
+        }
+    )
+
+    def read_database(recent_write: bool) -> str:
+        with patch("app.utils.dependencies.replica_router", router), patch(
+            "app.utils.dependencies.has_recent_write", return_value=recent_write
+        ) as has_recent_write:
+            dependency = get_read_db(request)
+            name = database_name(next(dependency)) or ""
+            dependency.close()
+        has_recent_write.assert_called_once_with(7)
+        return name
+
+    assert read_database(False).endswith("replica.db")
+    assert not read_database(True).endswith("replica.db")
@@ -0,0 +1,76 @@
+from datetime import datetime
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from app.database.database import Base
+from app.database.schema import CONTACT_INDEXES, ensure_contacts_schema
+from app.models.contacts import Contact
+
+# The users and contacts tables as created by the first release
+OLD_SCHEMA = (
+    """
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY,
+        email VARCHAR NOT NULL UNIQUE,
+        hashed_password VARCHAR NOT NULL,
+        is_active BOOLEAN,
+        is_verified BOOLEAN,
+        role VARCHAR(5) NOT NULL,
+        created_at DATETIME,
+        updated_at DATETIME
+    )
+    """,
+    """
+    CREATE TABLE contacts (
+        id INTEGER PRIMARY KEY,
+        first_name VARCHAR(255) NOT NULL,
+        last_name VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        phone VARCHAR(20) NOT NULL,
+        birthday DATETIME NOT NULL,
+        owner_id INTEGER NOT NULL REFERENCES users (id),
+        created_at DATETIME,
+        updated_at DATETIME
+    )
+    """,
+    "CREATE INDEX ix_contacts_id ON contacts (id)",
+    "INSERT INTO users (id, email, hashed_password, role) "
+    "VALUES (1, 'owner@example.com', 'hash', 'USER')",
+    "INSERT INTO contacts (id, first_name, last_name, email, phone, birthday, owner_id) "
+    "VALUES (1, 'Ann', 'Lee', 'ann@example.com', '123', '1990-12-31 00:00:00.000000', 1)",
+)
+
+
+def test_ensure_contacts_schema_upgrades_old_database():
+    """
+    Test that starting on a database of the first release adds and fills the
+    birthday key and creates the missing indexes, and that it can run again.
+    """
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as connection:
+        for statement in OLD_SCHEMA:
+            connection.execute(text(statement))
+
+    for _ in range(2):
+        with engine.begin() as connection:
+            Base.metadata.create_all(connection)
+            ensure_contacts_schema(connection)
+
+    inspector = inspect(engine)
+    assert "birthday_md" in {c["name"] for c in inspector.get_columns("contacts")}
+    indexes = {index["name"] for index in inspector.get_indexes("contacts")}
+    assert set(CONTACT_INDEXES) <= indexes
+
+    with Session(engine) as session:
+        assert session.get(Contact, 1).birthday_md == 1231
+        session.add(
+            Contact(
+                first_name="Bob",
+                last_name="Ray",
+                email="bob@example.com",
+                phone="456",
+                birthday=datetime(1985, 3, 7),
+                owner_id=1,
+            )
+        )
+        session.commit()
+        assert session.query(Contact).filter(Contact.birthday_md == 307).count() == 1
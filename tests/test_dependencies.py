@@ -1,9 +1,15 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+import fakeredis.aioredis
 from fastapi import HTTPException
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, get_current_user_async
 from app.models.user import User
 from app.services.auth import create_access_token
+from app.services import token_denylist
+from app.services.redis_cache import encode_user_snapshot
+from app.services.tokens import token_service
 import pytest
+import time
 
 
 def test_get_current_user_not_found():
@@ -20,8 +26,9 @@ def test_get_current_user_not_found():
     mock_redis_client.get.return_value = None
 
     # Patch Redis client and JWT decode function
-    with patch("app.utils.dependencies.redis_client", mock_redis_client), patch(
-        "app.utils.dependencies.jwt.decode", return_value={"sub": "test@example.com"}
+    with patch("app.services.redis_cache.redis_client", mock_redis_client), patch(
+        "app.utils.dependencies.token_service.verify",
+        return_value={"sub": "test@example.com"},
     ):
         # Expect an HTTPException to be raised
         with pytest.raises(HTTPException) as exc_info:
@@ -45,11 +52,163 @@ def test_get_current_user_from_cache():
     valid_token = create_access_token({"sub": "test@example.com"})
 
     # Mock Redis to return a cached user
-    mock_redis_client.get.return_value = '{"id": 1, "email": "test@example.com"}'
+    mock_redis_client.get.return_value = encode_user_snapshot(
+        {
+            "id": 1,
+            "email": "test@example.com",
+            "role": "user",
+            "is_active": True,
+            "is_verified": True,
+        }
+    )
 
     # Patch Redis client
-    with patch("app.utils.dependencies.redis_client", mock_redis_client):
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
         # Call the function and retrieve the user
         user = get_current_user(valid_token, db=mock_db)
         # Assert the user's email matches the cached data
         assert user.email == "test@example.com"
+
+
+def test_get_current_user_reuses_verified_token():
+    """
+    Test case to verify that a repeated token is answered from the in-process
+    token cache without decoding it or querying Redis again.
+    """
+    mock_db = MagicMock()
+    mock_redis_client = MagicMock()
+    mock_redis_client.get.return_value = encode_user_snapshot(
+        {
+            "id": 1,
+            "email": "test@example.com",
+            "role": "user",
+            "is_active": True,
+            "is_verified": True,
+        }
+    )
+    valid_token = create_access_token({"sub": "test@example.com"})
+
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        get_current_user(valid_token, db=mock_db)
+        with patch("app.utils.dependencies.token_service.verify") as mock_decode:
+            user = get_current_user(valid_token, db=mock_db)
+        # Assert the second call skipped verification and Redis
+        mock_decode.assert_not_called()
+        assert mock_redis_client.get.call_count == 1
+        assert user.email == "test@example.com"
+
+
+def make_claims_user():
+    return User(
+        id=7, email="claims@example.com", role="admin", is_active=True, is_verified=True
+    )
+
+
+def test_get_current_user_stateless_claims(monkeypatch):
+    """
+    Test case to verify that in stateless mode a fresh token carrying user
+    claims is accepted without touching Redis or the database.
+    """
+    monkeypatch.setattr("app.config.settings.AUTH_STATELESS", True)
+    mock_db = MagicMock()
+    mock_redis_client = MagicMock()
+    token = create_access_token({"sub": "claims@example.com"}, user=make_claims_user())
+
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        user = get_current_user(token, db=mock_db)
+
+    assert (user.id, user.email, user.role) == (7, "claims@example.com", "admin")
+    mock_redis_client.get.assert_not_called()
+    mock_db.query.assert_not_called()
+
+
+def test_get_current_user_stateless_watermark(monkeypatch):
+    """
+    Test case to verify that a token older than the claims window is rejected
+    when it was issued before the user's tokens were revoked.
+    """
+    monkeypatch.setattr("app.config.settings.AUTH_STATELESS", True)
+    monkeypatch.setattr("app.config.settings.AUTH_CLAIMS_MAX_AGE", -1)
+    mock_redis_client = MagicMock()
+    mock_redis_client.get.return_value = str(int(time.time()) + 1).encode()
+    token = create_access_token({"sub": "claims@example.com"}, user=make_claims_user())
+
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user(token, db=MagicMock())
+    assert exc_info.value.status_code == 401
+    mock_redis_client.get.assert_called_once_with("user:7:tokens_valid_after")
+
+
+def test_get_current_user_async_uses_async_redis_and_session():
+    """
+    Test that the async dependency loads an uncached user with the async
+    session and caches it with the async Redis client.
+    """
+    mock_redis_client = AsyncMock()
+    mock_redis_client.get.return_value = None
+    mock_db = AsyncMock()
+    mock_db.scalar.return_value = User(
+        id=1, email="async@example.com", role="user", is_active=True, is_verified=True
+    )
+    token = create_access_token({"sub": "async@example.com"})
+
+    with patch("app.services.redis_cache.async_redis_client", mock_redis_client):
+        user = asyncio.run(
+            get_current_user_async(token, request=MagicMock(), db=mock_db)
+        )
+
+    assert user.email == "async@example.com"
+    mock_db.scalar.assert_awaited_once()
+    mock_redis_client.set.assert_awaited_once()
+
+
+def test_get_current_user_async_rejects_unknown_user():
+    """
+    Test that the async dependency raises 401 when the user does not exist.
+    """
+    mock_redis_client = AsyncMock()
+    mock_redis_client.get.return_value = None
+    mock_db = AsyncMock()
+    mock_db.scalar.return_value = None
+    token = create_access_token({"sub": "missing@example.com"})
+
+    with patch("app.services.redis_cache.async_redis_client", mock_redis_client):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(get_current_user_async(token, request=MagicMock(), db=mock_db))
+    assert exc_info.value.status_code == 401
+
+
+def test_get_current_user_async_checks_denylist_without_sync_redis(monkeypatch):
+    """
+    Test that the async dependency checks the token denylist with the async
+    client, also while the filter is not loaded and for cached tokens.
+    """
+    monkeypatch.setattr(token_denylist, "_loaded", False)
+    sync_client = MagicMock()
+    async_client = fakeredis.aioredis.FakeRedis()
+    user = User(
+        id=1, email="async@example.com", role="user", is_active=True, is_verified=True
+    )
+    token = create_access_token({"sub": user.email}, user=user)
+    mock_db = AsyncMock()
+    mock_db.scalar.return_value = user
+
+    async def authenticate():
+        return await get_current_user_async(token, request=MagicMock(), db=mock_db)
+
+    with patch("app.services.redis_cache.redis_client", sync_client), patch(
+        "app.services.redis_cache.async_redis_client", async_client
+    ):
+        assert asyncio.run(authenticate()).email == user.email
+        # Answered from the token cache, with the denylist still checked
+        jti = token_service.verify(token)["jti"]
+        asyncio.run(
+            async_client.zadd(token_denylist.DENYLIST_KEY, {jti: time.time() + 60})
+        )
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(authenticate())
+
+    assert exc_info.value.status_code == 401
+    sync_client.zscore.assert_not_called()
+    assert sync_client.method_calls == []
@@ -36,3 +36,13 @@ def test_contact_create_invalid_birthday():
             phone="0987654321",
             birthday=future_birthday,
         )
+
+
+def test_contact_birthday_md_follows_birthday():
+    """
+    Test that the month-and-day key is kept in sync with the birthday.
+    """
+    contact = Contact(birthday=date(1990, 12, 31))
+    assert contact.birthday_md == 1231
+    contact.birthday = date(1992, 2, 29)
+    assert contact.birthday_md == 229
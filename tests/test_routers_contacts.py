@@ -1,41 +1,94 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import fakeredis.aioredis
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from datetime import date
+from app.config import settings
 from app.database.database import Base
 from app.models.contacts import Contact
-from app.utils.dependencies import get_db
+from app.models.user import User
+from app.utils.dependencies import (
+    get_async_db,
+    get_async_read_db,
+    get_current_user_async,
+)
+from app.routers.contacts import _birthday_window
+from app.services import redis_cache
+from app.utils.pagination import encode_cursor
 from main import app
 
-# Define the in-memory SQLite database URL for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Use a temporary SQLite file so the sync engine (used to prepare and inspect
+# data) and the async engine (used by the routes) share the same database
+SQLALCHEMY_DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "contacts.db")
+
+# Create a database engine for preparing and inspecting test data
+engine = create_engine(f"sqlite:///{SQLALCHEMY_DATABASE_PATH}")
 
-# Create a database engine with SQLite in-memory database
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# Create an async engine for the routes; NullPool avoids reusing aiosqlite
+# connections across the event loops started by the test client
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{SQLALCHEMY_DATABASE_PATH}", poolclass=NullPool
 )
 
-# Create a session factory for the testing database
+# Create session factories for the testing database
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 # Create all database tables based on the models
 Base.metadata.create_all(bind=engine)
 
+
 # Override the dependency to use the testing database session
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-# Replace the default database dependency with the testing one
-app.dependency_overrides[get_db] = override_get_db
 
 # Initialize the FastAPI test client
 client = TestClient(app)
 
+
+# Pytest fixture giving every test an empty Redis for the contacts cache
+@pytest.fixture
+def fake_redis():
+    """
+    Fixture providing the in-memory Redis used as the async client.
+    """
+    return fakeredis.aioredis.FakeRedis()
+
+
+# Pytest fixture to authenticate requests and isolate the database
+@pytest.fixture(autouse=True)
+def override_dependencies(monkeypatch, fake_redis):
+    """
+    Fixture to reset the test database and cache and authenticate every request as user 1.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(redis_cache, "async_redis_client", fake_redis)
+    monkeypatch.setattr(
+        redis_cache, "contacts_cache_stats", {"hits": 0, "misses": 0, "errors": 0}
+    )
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    app.dependency_overrides[get_current_user_async] = lambda: User(
+        id=1, email="owner@example.com"
+    )
+    yield
+    app.dependency_overrides.pop(get_current_user_async, None)
+
+
 # Pytest fixture to set up test data in the database
 @pytest.fixture
 def setup_test_data():
@@ -68,3 +121,463 @@ def setup_test_data():
     db.refresh(contact_1)
     db.refresh(contact_2)
     db.close()
+
+
+def test_get_contacts_paginates_with_cursor(setup_test_data):
+    """
+    Test that contacts are returned page by page using the `next_cursor` value.
+    """
+    first_page = client.get("/contacts/", params={"limit": 1})
+    assert first_page.status_code == 200
+    body = first_page.json()
+    assert [item["first_name"] for item in body["items"]] == ["John"]
+    assert body["next_cursor"] is not None
+
+    second_page = client.get(
+        "/contacts/", params={"limit": 1, "cursor": body["next_cursor"]}
+    )
+    assert second_page.status_code == 200
+    body = second_page.json()
+    assert [item["first_name"] for item in body["items"]] == ["Jane"]
+    assert body["next_cursor"] is None
+
+
+def test_get_contacts_invalid_cursor(setup_test_data):
+    """
+    Test that a malformed cursor is rejected with a 400 status code.
+    """
+    response = client.get("/contacts/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_search_contacts_cursor_of_wrong_types(setup_test_data):
+    """
+    Test that a well-formed search cursor holding non-numeric keys is rejected.
+    """
+    cursor = encode_cursor("rank", {"id": 1})
+    response = client.get(
+        "/contacts/search", params={"query": "john", "cursor": cursor}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_get_contacts_conditional_get(setup_test_data):
+    """
+    Test that the list ETag answers `If-None-Match` with 304 until contacts change.
+    """
+    response = client.get("/contacts/", params={"limit": 1})
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        "/contacts/", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # Other query parameters are a different representation
+    response = client.get(
+        "/contacts/", params={"limit": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    client.patch("/contacts/2", json={"phone": "5555555"})
+    response = client.get(
+        "/contacts/", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_contact_by_id_conditional_get(setup_test_data):
+    """
+    Test that a single contact carries a strong ETag that changes on update.
+    """
+    response = client.get("/contacts/1")
+    etag = response.headers["ETag"]
+    assert etag.startswith('"1-')
+
+    response = client.get("/contacts/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    client.patch("/contacts/1", json={"phone": "5555555"})
+    response = client.get("/contacts/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_contact_reads_are_cached_until_a_write(setup_test_data, fake_redis):
+    """
+    Test that list pages are served from the cache, expire and are invalidated
+    by writes, which bump the user's cache generation.
+    """
+    first = client.get("/contacts/")
+    second = client.get("/contacts/")
+    assert first.json() == second.json()
+    assert redis_cache.contacts_cache_stats["hits"] == 1
+
+    async def cache_state():
+        keys = await fake_redis.keys("*")
+        generation = [key for key in keys if key.endswith(b":generation")]
+        ttls = [await fake_redis.ttl(key) for key in keys if key not in generation]
+        values = [await fake_redis.get(key) for key in generation]
+        return ttls, values
+
+    ttls, generations = asyncio.run(cache_state())
+    assert ttls and all(0 < ttl <= settings.CONTACTS_CACHE_TTL for ttl in ttls)
+    assert generations == []
+
+    # Searches differing only in case share an entry
+    client.get("/contacts/search", params={"query": "Doe"})
+    client.get("/contacts/search", params={"query": "dOE"})
+    assert redis_cache.contacts_cache_stats["hits"] == 2
+
+    client.patch("/contacts/2", json={"phone": "5555555"})
+    assert asyncio.run(cache_state())[1] == [b"1"]
+    response = client.get("/contacts/")
+    assert response.json()["items"][1]["phone"] == "5555555"
+    assert redis_cache.get_contacts_cache_stats()["misses"] == 3
+
+
+def test_contact_reads_without_redis(setup_test_data, monkeypatch):
+    """
+    Test that the endpoints keep working when Redis is unreachable.
+    """
+    monkeypatch.setattr(
+        redis_cache, "async_redis_client", fakeredis.aioredis.FakeRedis(connected=False)
+    )
+    assert len(client.get("/contacts/").json()["items"]) == 2
+    assert client.delete("/contacts/1").status_code == 200
+    assert redis_cache.contacts_cache_stats["errors"] == 2
+
+
+def test_search_contacts_paginates(setup_test_data):
+    """
+    Test that the search endpoint is reachable and returns a page of matches.
+    """
+    response = client.get("/contacts/search", params={"query": "doe", "limit": 1})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["items"]) == 1
+    assert body["next_cursor"] is not None
+
+
+def test_export_contacts_ndjson(setup_test_data):
+    """
+    Test that contacts are exported as newline-delimited JSON.
+    """
+    response = client.get("/contacts/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["email"] for line in lines] == [
+        "john.doe@example.com",
+        "jane.doe@example.com",
+    ]
+    assert lines[0]["birthday"] == "1990-05-15"
+
+
+def test_export_contacts_csv(setup_test_data):
+    """
+    Test that contacts are exported as CSV with a header row.
+    """
+    response = client.get("/contacts/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "first_name", "last_name", "email", "phone", "birthday"]
+    assert len(rows) == 3
+
+
+def test_export_contacts_invalid_format():
+    """
+    Test that an unsupported export format is rejected.
+    """
+    response = client.get("/contacts/export", params={"format": "xml"})
+    assert response.status_code == 422
+
+
+def add_birthdays(*birthdays):
+    """
+    Add a contact of user 1 for each of the given birthdays.
+    """
+    db = TestingSessionLocal()
+    for index, birthday in enumerate(birthdays):
+        db.add(
+            Contact(
+                first_name=f"Person{index}",
+                last_name="Doe",
+                email=f"person{index}@example.com",
+                phone="1234567890",
+                birthday=birthday,
+                owner_id=1,
+            )
+        )
+    db.commit()
+    db.close()
+
+
+def birthdays_in_window(today, days):
+    """
+    Return the birthdays matched by the upcoming-birthday window.
+    """
+    db = TestingSessionLocal()
+    contacts = db.query(Contact).filter(_birthday_window(today, days)).all()
+    db.close()
+    return sorted(contact.birthday.date() for contact in contacts)
+
+
+def test_birthday_window_wraps_year_end():
+    """
+    Test that a window crossing New Year matches birthdays in both years.
+    """
+    add_birthdays(date(1980, 12, 30), date(1985, 1, 2), date(1990, 1, 10))
+    assert birthdays_in_window(date(2025, 12, 28), 7) == [
+        date(1980, 12, 30),
+        date(1985, 1, 2),
+    ]
+
+
+def test_birthday_window_leap_day():
+    """
+    Test that February 29 birthdays are matched on February 28 in common years.
+    """
+    add_birthdays(date(1992, 2, 29), date(1990, 3, 1))
+    assert birthdays_in_window(date(2025, 2, 21), 7) == [date(1992, 2, 29)]
+    assert birthdays_in_window(date(2024, 2, 21), 7) == []
+    assert birthdays_in_window(date(2025, 3, 1), 7) == [date(1990, 3, 1)]
+
+
+def test_get_upcoming_birthdays_days_parameter():
+    """
+    Test that the endpoint honours the `days` window.
+    """
+    # 1992 is a leap year, so any of today's month and day exists in it
+    add_birthdays(date.today().replace(year=1992))
+    response = client.get("/contacts/birthdays", params={"days": 0})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+    response = client.get("/contacts/birthdays", params={"days": 400})
+    assert response.status_code == 422
+
+
+def bulk_item(index, **overrides):
+    """
+    Build a valid bulk item, optionally overriding some fields.
+    """
+    item = {
+        "first_name": f"Bulk{index}",
+        "last_name": "Doe",
+        "email": f"bulk{index}@example.com",
+        "phone": "1234567890",
+        "birthday": "1990-01-01",
+    }
+    item.update(overrides)
+    return item
+
+
+def test_bulk_create_reports_invalid_items():
+    """
+    Test that valid items are created while invalid ones are reported.
+    """
+    items = [bulk_item(0), bulk_item(1, phone="abc"), bulk_item(2)]
+    response = client.post("/contacts/bulk", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 2
+    assert [item["index"] for item in body["items"]] == [0, 2]
+    assert [error["index"] for error in body["errors"]] == [1]
+    assert body["errors"][0]["errors"][0]["loc"] == ["phone"]
+
+    db = TestingSessionLocal()
+    created = db.query(Contact).order_by(Contact.id).all()
+    assert [contact.first_name for contact in created] == ["Bulk0", "Bulk2"]
+    assert created[0].birthday_md == 101
+    db.close()
+
+
+def test_bulk_create_upsert_by_email(setup_test_data):
+    """
+    Test that upsert updates contacts with a matching email and creates the rest.
+    """
+    items = [
+        bulk_item(0, email="john.doe@example.com", first_name="Johnny"),
+        bulk_item(1),
+        bulk_item(2, email="bulk1@example.com"),
+    ]
+    response = client.post("/contacts/bulk", json={"items": items, "upsert": True})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"]) == (1, 1)
+    assert body["items"][0] == {"index": 0, "id": 1, "status": "updated"}
+    assert body["errors"][0]["index"] == 2
+
+    db = TestingSessionLocal()
+    assert db.get(Contact, 1).first_name == "Johnny"
+    assert db.query(Contact).count() == 3
+    db.close()
+
+
+def test_bulk_create_rejects_values_longer_than_columns():
+    """
+    Test that items too long for their columns are reported, not written.
+    """
+    items = [bulk_item(0, first_name="x" * 256), bulk_item(1)]
+    response = client.post("/contacts/bulk", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 1
+    assert body["errors"][0]["index"] == 0
+    assert body["errors"][0]["errors"][0]["loc"] == ["first_name"]
+
+
+def test_bulk_create_upsert_rejects_ambiguous_email(setup_test_data):
+    """
+    Test that an item matching several existing contacts updates none of them.
+    """
+    db = TestingSessionLocal()
+    db.get(Contact, 2).email = "john.doe@example.com"
+    db.commit()
+    db.close()
+
+    items = [bulk_item(0, email="john.doe@example.com", first_name="Johnny")]
+    response = client.post("/contacts/bulk", json={"items": items, "upsert": True})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["items"] == []
+    assert body["errors"][0]["errors"][0]["msg"] == (
+        "Email matches several existing contacts"
+    )
+
+    db = TestingSessionLocal()
+    assert db.query(Contact).filter(Contact.first_name == "Johnny").count() == 0
+    db.close()
+
+
+def test_bulk_update_by_ids(setup_test_data):
+    """
+    Test that a bulk update changes only the selected contacts of the user.
+    """
+    add_birthdays(date(1980, 1, 1))
+    db = TestingSessionLocal()
+    db.query(Contact).filter(Contact.id == 3).update({"owner_id": 2})
+    db.commit()
+    db.close()
+
+    response = client.patch(
+        "/contacts/bulk",
+        json={
+            "ids": [1, 3],
+            "changes": {"last_name": "Smith", "birthday": "1991-07-04"},
+            "return_ids": True,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {"count": 1, "ids": [1]}
+
+    db = TestingSessionLocal()
+    updated = db.get(Contact, 1)
+    assert (updated.last_name, updated.birthday_md) == ("Smith", 704)
+    assert db.get(Contact, 3).last_name == "Doe"
+    db.close()
+
+
+def test_bulk_update_rejects_invalid_changes(setup_test_data):
+    """
+    Test that bulk updates validate the changes and require selection criteria.
+    """
+    response = client.patch(
+        "/contacts/bulk", json={"ids": [1], "changes": {"phone": None}}
+    )
+    assert response.status_code == 422
+    response = client.patch("/contacts/bulk", json={"changes": {"last_name": "X"}})
+    assert response.status_code == 422
+    response = client.patch("/contacts/bulk", json={"ids": [1], "changes": {}})
+    assert response.status_code == 422
+
+
+def test_bulk_delete(setup_test_data):
+    """
+    Test that a bulk delete removes the selected contacts and reports the count.
+    """
+    response = client.request(
+        "DELETE", "/contacts/bulk", json={"updated_before": "2999-01-01T00:00:00"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"count": 2, "ids": None}
+
+    db = TestingSessionLocal()
+    assert db.query(Contact).count() == 0
+    db.close()
+
+
+def test_create_contact():
+    """
+    Test that a contact is created and returned in one request.
+    """
+    response = client.post("/contacts/", json=bulk_item(0, additional_info="Note"))
+    assert response.status_code == 201
+    body = response.json()
+    assert body["first_name"] == "Bulk0"
+    assert body["birthday"] == "1990-01-01"
+
+    db = TestingSessionLocal()
+    assert db.get(Contact, body["id"]).owner_id == 1
+    db.close()
+
+
+def test_update_contact(setup_test_data):
+    """
+    Test that PUT replaces all fields of a contact.
+    """
+    response = client.put("/contacts/1", json=bulk_item(0))
+    assert response.status_code == 200
+    assert response.json()["email"] == "bulk0@example.com"
+
+    response = client.put("/contacts/99", json=bulk_item(0))
+    assert response.status_code == 404
+
+
+def test_patch_contact_only_touches_sent_fields(setup_test_data):
+    """
+    Test that PATCH changes only the fields present in the body.
+    """
+    response = client.patch("/contacts/2", json={"phone": "5555555"})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["first_name"], body["phone"]) == ("Jane", "5555555")
+
+    response = client.patch("/contacts/99", json={"phone": "5555555"})
+    assert response.status_code == 404
+
+
+def test_delete_contact(setup_test_data):
+    """
+    Test that DELETE returns the deleted contact and 404 afterwards.
+    """
+    response = client.delete("/contacts/1")
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "John"
+
+    response = client.delete("/contacts/1")
+    assert response.status_code == 404
+
+
+def test_write_path_without_returning(setup_test_data, monkeypatch):
+    """
+    Test the fallback used on databases without INSERT/UPDATE/DELETE ... RETURNING.
+    """
+    for flag in ("insert_returning", "update_returning", "delete_returning"):
+        monkeypatch.setattr(async_engine.dialect, flag, False)
+
+    response = client.post("/contacts/", json=bulk_item(0))
+    assert response.status_code == 201
+    assert response.json()["id"] == 3
+    response = client.patch("/contacts/3", json={"last_name": "Fallback"})
+    assert response.json()["last_name"] == "Fallback"
+    response = client.delete("/contacts/3")
+    assert response.json()["last_name"] == "Fallback"
+    assert client.delete("/contacts/3").status_code == 404
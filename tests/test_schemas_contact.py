@@ -1,6 +1,6 @@
 import pytest
-from datetime import date, timedelta
-from app.schemas.contact import ContactCreate, ContactResponse
+from datetime import date, datetime, timedelta, timezone
+from app.schemas.contact import ContactBulkSelector, ContactCreate, ContactResponse
 
 
 def test_contact_create_valid_data():
@@ -86,3 +86,14 @@ def test_contact_response():
     assert contact_response.phone == valid_data["phone"]
     assert contact_response.birthday == valid_data["birthday"]
     assert contact_response.additional_info == valid_data["additional_info"]
+
+
+def test_bulk_selector_converts_updated_before_to_naive_utc():
+    """
+    Test that a timezone-aware `updated_before` is converted to naive UTC.
+    """
+    selector = ContactBulkSelector(
+        updated_before=datetime(2024, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+    )
+    assert selector.updated_before == datetime(2024, 1, 1, 10)
+    assert selector.updated_before.tzinfo is None
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import MagicMock
 from app.services.auth import authenticate_user, hash_password, create_access_token
@@ -24,7 +25,9 @@ def test_authenticate_user_success():
     mock_db.query.return_value.filter.return_value.first.return_value = mock_user
 
     # Call the function and assert the result
-    result = authenticate_user(mock_db, "test@example.com", "Password123")
+    result = asyncio.run(
+        authenticate_user(mock_db, "test@example.com", "Password123")
+    )
     assert result == mock_user
 
 
@@ -48,7 +51,9 @@ def test_authenticate_user_invalid_password():
     mock_db.query.return_value.filter.return_value.first.return_value = mock_user
 
     # Call the function with an invalid password and assert the result
-    result = authenticate_user(mock_db, "test@example.com", "WrongPassword")
+    result = asyncio.run(
+        authenticate_user(mock_db, "test@example.com", "WrongPassword")
+    )
     assert result is None
 
 
@@ -63,7 +68,9 @@ def test_authenticate_user_not_found():
     mock_db.query.return_value.filter.return_value.first.return_value = None
 
     # Call the function with a non-existent user and assert the result
-    result = authenticate_user(mock_db, "nonexistent@example.com", "Password123")
+    result = asyncio.run(
+        authenticate_user(mock_db, "nonexistent@example.com", "Password123")
+    )
     assert result is None
 
 
@@ -81,3 +88,27 @@ def test_create_access_token():
 
     # Assert that the token is not None (successfully created)
     assert token is not None
+
+
+def test_authenticate_user_queries_off_the_event_loop():
+    """
+    Test case: The user lookup runs in the threadpool, not on the event loop.
+    """
+    threads_with_loop = []
+
+    def query(*args):
+        try:
+            asyncio.get_running_loop()
+            threads_with_loop.append(True)
+        except RuntimeError:
+            threads_with_loop.append(False)
+        return MagicMock(**{"filter.return_value.first.return_value": None})
+
+    mock_db = MagicMock()
+    mock_db.query.side_effect = query
+
+    result = asyncio.run(
+        authenticate_user(mock_db, "nonexistent@example.com", "Password123")
+    )
+    assert result is None
+    assert threads_with_loop == [False]
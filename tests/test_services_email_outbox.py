@@ -0,0 +1,197 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+import fakeredis.aioredis
+import pytest
+from aiosmtpd.controller import Controller
+from unittest.mock import patch
+from app.services.email_outbox import (
+    DEAD_KEY,
+    OUTBOX_KEY,
+    PROCESSING_KEY_PREFIX,
+    RETRY_KEY,
+    WORKER_TIMEOUT,
+    WORKERS_KEY,
+    EmailOutbox,
+    SMTPSender,
+    build_message,
+)
+
+
+class RecordingHandler:
+    """
+    aiosmtpd handler recording messages and the connections they came over.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("unknown@"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content.decode("utf-8"))
+        self.peers.add(session.peer)
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture
+def smtp_server():
+    """
+    Run a local SMTP server for the duration of a test.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+def test_sender_reuses_connection(smtp_server):
+    """
+    Test that a batch of emails is sent over one SMTP connection.
+    """
+    handler, port = smtp_server
+    sender = SMTPSender("127.0.0.1", port)
+
+    messages = [build_message(f"user{i}@example.com", "Hi", "Hello") for i in range(3)]
+    assert sender.send_batch(messages) == [None, None, None]
+    assert sender.send_batch(messages[:1]) == [None]
+    sender.close()
+
+    assert len(handler.messages) == 4
+    assert len(handler.peers) == 1
+
+
+def test_drain_sends_queued_emails(smtp_server):
+    """
+    Test that queued emails are sent in one batch by the worker.
+    """
+    handler, port = smtp_server
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    outbox = EmailOutbox(SMTPSender("127.0.0.1", port))
+
+    async def scenario():
+        for i in range(3):
+            await outbox.enqueue(f"user{i}@example.com", "Reset", f"Token {i}")
+        sent = await outbox.drain_once(timeout=0)
+        await outbox.stop()
+        assert await fake_redis.llen(outbox.processing_key) == 0
+        return sent
+
+    with patch("app.services.redis_cache.async_redis_client", fake_redis):
+        assert asyncio.run(scenario()) == 3
+
+    assert [m.split("Token ")[1].strip() for m in handler.messages] == ["0", "1", "2"]
+    assert len(handler.peers) == 1
+
+
+def test_drain_retries_and_dead_letters(smtp_server):
+    """
+    Test that unreachable servers lead to a retry with backoff, and rejected
+    recipients to the dead letter list.
+    """
+    handler, port = smtp_server
+    fake_redis = fakeredis.aioredis.FakeRedis()
+
+    async def scenario():
+        down = EmailOutbox(SMTPSender("127.0.0.1", 1, timeout=1))
+        await down.enqueue("user@example.com", "Reset", "Token")
+        assert await down.drain_once(timeout=0) == 0
+
+        outbox = EmailOutbox(SMTPSender("127.0.0.1", port))
+        await outbox.enqueue("unknown@example.com", "Reset", "Token")
+        assert await outbox.drain_once(timeout=0) == 0
+        await outbox.stop()
+
+        (retry,) = await fake_redis.zrange(RETRY_KEY, 0, -1)
+        assert json.loads(retry)["attempts"] == 1
+        (dead,) = await fake_redis.lrange(DEAD_KEY, 0, -1)
+        assert json.loads(dead)["to"] == "unknown@example.com"
+        assert await fake_redis.llen(down.processing_key) == 0
+        assert await fake_redis.llen(outbox.processing_key) == 0
+
+    with patch("app.services.redis_cache.async_redis_client", fake_redis):
+        asyncio.run(scenario())
+
+    assert handler.messages == []
+
+
+def test_stop_waits_for_batch_being_sent():
+    """
+    Test that stopping the worker while a batch is being sent finishes the
+    batch before closing the connection, and records it as sent.
+    """
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    class SlowSender:
+        def send_batch(self, messages):
+            started.set()
+            release.wait(5)
+            calls.append("send_batch")
+            return [None] * len(messages)
+
+        def close(self):
+            calls.append("close")
+
+    outbox = EmailOutbox(SlowSender())
+
+    async def scenario():
+        await outbox.enqueue("user@example.com", "Reset", "Token")
+        outbox.start()
+        await asyncio.to_thread(started.wait, 5)
+        stopping = asyncio.ensure_future(outbox.stop())
+        await asyncio.sleep(0.1)
+        assert calls == []
+        release.set()
+        await stopping
+        assert await fake_redis.llen(outbox.processing_key) == 0
+        assert await fake_redis.llen(OUTBOX_KEY) == 0
+        assert await fake_redis.zscore(WORKERS_KEY, outbox.worker_id) is None
+
+    with patch("app.services.redis_cache.async_redis_client", fake_redis):
+        asyncio.run(scenario())
+
+    assert calls == ["send_batch", "close"]
+
+
+def test_requeue_abandoned_restores_messages_of_dead_workers():
+    """
+    Test that messages left by a worker that stopped reporting are put back
+    at the head of the outbox, while those of live workers are left alone.
+    """
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    outbox = EmailOutbox(SMTPSender("127.0.0.1", 1))
+
+    async def scenario():
+        now = time.time()
+        await fake_redis.zadd(
+            WORKERS_KEY, {"dead": now - WORKER_TIMEOUT - 1, "live": now}
+        )
+        await fake_redis.lpush(f"{PROCESSING_KEY_PREFIX}dead", "first", "second")
+        await fake_redis.lpush(f"{PROCESSING_KEY_PREFIX}live", "sending")
+        await fake_redis.lpush(OUTBOX_KEY, "queued")
+
+        assert await outbox.requeue_abandoned() == 2
+        assert await fake_redis.lrange(OUTBOX_KEY, 0, -1) == [
+            b"queued",
+            b"second",
+            b"first",
+        ]
+        assert await fake_redis.llen(f"{PROCESSING_KEY_PREFIX}live") == 1
+        assert await fake_redis.zrange(WORKERS_KEY, 0, -1) == [b"live"]
+
+    with patch("app.services.redis_cache.async_redis_client", fake_redis):
+        asyncio.run(scenario())
@@ -0,0 +1,25 @@
+from concurrent.futures import ProcessPoolExecutor
+from app.config import settings
+from app.services import password_hasher
+
+
+def test_executor_uses_threadpool_without_workers(monkeypatch):
+    """
+    Test that no process pool is started when `PASSWORD_HASH_WORKERS` is 0.
+    """
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    assert password_hasher.get_executor() is None
+
+
+def test_executor_is_a_shared_process_pool(monkeypatch):
+    """
+    Test that the process pool is created once and released on shutdown.
+    """
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    try:
+        executor = password_hasher.get_executor()
+        assert isinstance(executor, ProcessPoolExecutor)
+        assert password_hasher.get_executor() is executor
+    finally:
+        password_hasher.shutdown()
+    assert password_hasher._executor is None
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock, patch
+from app.models.user import User, UserRole
+from app.services.redis_cache import (
+    cache_user,
+    decode_user_snapshot,
+    encode_user_snapshot,
+    get_cached_user,
+    invalidate_user,
+    user_cache_key,
+    user_snapshot,
+)
+from app.utils.token_cache import token_cache
+
+
+def make_user():
+    return User(
+        id=42,
+        email="admin@example.com",
+        hashed_password="hash",
+        role=UserRole.ADMIN,
+        is_active=True,
+        is_verified=False,
+    )
+
+
+def test_user_snapshot_round_trip():
+    """
+    Test that a cached snapshot decodes to the user's authorization fields only.
+    """
+    mock_redis_client = MagicMock()
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        snapshot = cache_user(make_user())
+        key, data = mock_redis_client.set.call_args.args
+        mock_redis_client.get.return_value = data
+        cached = get_cached_user("admin@example.com")
+
+    assert key == user_cache_key("admin@example.com") == "user:v1:admin@example.com"
+    assert cached == snapshot
+    assert cached == {
+        "id": 42,
+        "email": "admin@example.com",
+        "role": UserRole.ADMIN,
+        "is_active": True,
+        "is_verified": False,
+    }
+    assert User(**cached).role == "admin"
+
+
+def test_user_snapshot_rejects_other_versions():
+    """
+    Test that a payload written in another format version is treated as a miss.
+    """
+    data = bytearray(encode_user_snapshot(user_snapshot(make_user())))
+    data[0] += 1
+    assert decode_user_snapshot(bytes(data)) is None
+    assert decode_user_snapshot(b"") is None
+
+
+def test_invalidate_user_drops_snapshot_and_tokens():
+    """
+    Test that invalidation deletes the Redis snapshot and the user's cached tokens.
+    """
+    token_cache.set("token", {}, {"email": "admin@example.com"})
+    mock_redis_client = MagicMock()
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        invalidate_user("admin@example.com")
+
+    mock_redis_client.delete.assert_called_once_with("user:v1:admin@example.com")
+    assert token_cache.get("token") is None
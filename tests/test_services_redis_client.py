@@ -0,0 +1,44 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+import redis
+import redis.asyncio
+from app.services.redis_client import (
+    create_async_redis_client,
+    create_redis_client,
+    get_redis_latency_stats,
+    redis_command_latency,
+)
+
+
+def test_clients_use_settings(monkeypatch):
+    """
+    Test that both clients connect with the configured password and timeouts.
+    """
+    monkeypatch.setattr("app.services.redis_client.settings.REDIS_PASSWORD", "secret")
+    monkeypatch.setattr("app.services.redis_client.settings.REDIS_SOCKET_TIMEOUT", 0.5)
+    for client in (create_redis_client(), create_async_redis_client()):
+        options = client.connection_pool.connection_kwargs
+        assert options["password"] == "secret"
+        assert options["socket_timeout"] == 0.5
+        assert options["socket_connect_timeout"] == 1.0
+
+
+def test_command_latency_is_recorded():
+    """
+    Test that commands and pipelines of both clients are timed.
+    """
+    before = redis_command_latency.labels("PING").snapshot()["count"]
+    client = create_redis_client()
+    async_client = create_async_redis_client()
+    with patch.object(redis.Redis, "execute_command", return_value=True), patch.object(
+        redis.client.Pipeline, "execute", return_value=[]
+    ), patch.object(
+        redis.asyncio.Redis, "execute_command", AsyncMock(return_value=True)
+    ):
+        client.ping()
+        client.pipeline().execute()
+        asyncio.run(async_client.ping())
+
+    stats = get_redis_latency_stats()
+    assert stats["PING"]["count"] == before + 2
+    assert stats["PIPELINE"]["count"] >= 1
@@ -0,0 +1,146 @@
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database.database import Base
+from app.models.contacts import Contact
+from app.services.search import (
+    PostgresSearchBackend,
+    SearchBackend,
+    SQLiteSearchBackend,
+    ensure_search_index,
+    get_search_backend,
+)
+
+# Create an in-memory SQLite database shared by all threads
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db():
+    """
+    Fixture providing a session on a fresh database with three contacts of user 1
+    and one contact of user 2.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    for first_name, last_name, email, owner_id in [
+        ("Anna", "Smith", "anna@example.com", 1),
+        ("Annabel", "Annaford", "annabel@annaford.com", 1),
+        ("Bob", "Jones", "bob@example.com", 1),
+        ("Anna", "Other", "anna@other.com", 2),
+    ]:
+        session.add(
+            Contact(
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                phone="1234567890",
+                birthday=date(1990, 1, 1),
+                owner_id=owner_id,
+            )
+        )
+    session.commit()
+    yield session
+    session.close()
+
+
+def search(db, backend, query, after=None):
+    """
+    Run a search and return the first names of the matching contacts.
+    """
+    rows = db.execute(backend.build(1, query, after)).all()
+    return [row.Contact.first_name for row in rows]
+
+
+def test_get_search_backend():
+    """
+    Test that each dialect gets its dedicated backend.
+    """
+    assert isinstance(get_search_backend("sqlite"), SQLiteSearchBackend)
+    assert isinstance(get_search_backend("postgresql"), PostgresSearchBackend)
+    assert type(get_search_backend("mysql")) is SearchBackend
+
+
+def test_sqlite_search_ranks_by_relevance(db):
+    """
+    Test that the FTS5 backend returns only the owner's matches, best match first.
+    """
+    assert search(db, SQLiteSearchBackend(), "anna") == ["Annabel", "Anna"]
+
+
+def test_sqlite_search_matches_like_backend(db):
+    """
+    Test that the FTS5 backend finds the same contacts as the ILIKE backend.
+    """
+    for query in ["ANN", "example", "bob@", "a"]:
+        assert sorted(search(db, SQLiteSearchBackend(), query)) == sorted(
+            search(db, SearchBackend(), query)
+        )
+
+
+def test_sqlite_search_index_follows_updates(db):
+    """
+    Test that the FTS5 shadow table is kept in sync on update and delete.
+    """
+    bob = db.query(Contact).filter(Contact.first_name == "Bob").one()
+    bob.first_name = "Robert"
+    db.commit()
+    assert search(db, SQLiteSearchBackend(), "robert") == ["Robert"]
+
+    db.delete(bob)
+    db.commit()
+    assert search(db, SQLiteSearchBackend(), "robert") == []
+
+
+def test_search_keyset_after(db):
+    """
+    Test that passing the key of the last row returns the following rows.
+    """
+    backend = SQLiteSearchBackend()
+    first = db.execute(backend.build(1, "anna").limit(1)).one()
+    rest = search(db, backend, "anna", after=[first.rank, first.Contact.id])
+    assert rest == ["Anna"]
+
+
+def test_postgres_search_uses_trigram_similarity():
+    """
+    Test that the PostgreSQL backend ranks results by trigram similarity.
+    """
+    stmt = PostgresSearchBackend().build(1, "anna")
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "similarity(contacts.first_name" in sql
+    assert "ILIKE" in sql
+
+
+def test_sqlite_search_filters_owner_inside_index_query():
+    """
+    Test that the FTS5 subquery only ranks the owner's contacts.
+    """
+    subquery = SQLiteSearchBackend().ranked(1, "anna")
+    assert "owner_id" in str(subquery.compile(dialect=engine.dialect))
+
+
+def test_ensure_search_index_builds_missing_index(db):
+    """
+    Test that a database without the FTS5 table gets it, filled with its contacts.
+    """
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE contacts_fts"))
+        for name in ("insert", "delete", "update"):
+            connection.execute(text(f"DROP TRIGGER contacts_fts_{name}"))
+
+    with engine.begin() as connection:
+        ensure_search_index(connection)
+        # Running it again leaves the index as it is
+        ensure_search_index(connection)
+
+    assert search(db, SQLiteSearchBackend(), "anna") == ["Annabel", "Anna"]
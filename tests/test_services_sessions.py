@@ -0,0 +1,122 @@
+import time
+from unittest.mock import MagicMock, patch
+import fakeredis
+from app.models.user import User
+from app.services.sessions import session_store
+
+
+def test_create_writes_session_in_one_pipeline():
+    """
+    Test that a login stores the session, its index entry and the user
+    snapshot in a single MULTI/EXEC pipeline.
+    """
+    mock_redis_client = MagicMock()
+    pipeline = mock_redis_client.pipeline.return_value
+    user = User(
+        id=1, email="test@example.com", role="user", is_active=True, is_verified=True
+    )
+    expires_at = int(time.time()) + 3600
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        session_store.create(user, "sid", expires_at, "pytest")
+
+    mock_redis_client.pipeline.assert_called_once_with(transaction=True)
+    pipeline.execute.assert_called_once()
+    assert pipeline.set.call_args.args[0] == "user:v1:test@example.com"
+    session = pipeline.hset.call_args.kwargs["mapping"]
+    assert (session["email"], session["user_agent"]) == ("test@example.com", "pytest")
+    pipeline.zadd.assert_called_once_with(
+        "user:test@example.com:sessions", {"sid": expires_at}
+    )
+    mock_redis_client.set.assert_not_called()
+
+
+def test_validate_checks_session_in_one_call():
+    """
+    Test that validating a refresh token runs one script call against its session.
+    """
+    mock_redis_client = MagicMock()
+    script = mock_redis_client.register_script.return_value
+    script.return_value = 0
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        assert session_store.validate("test@example.com", "sid") is False
+        script.return_value = 1
+        assert session_store.validate("test@example.com", "sid") is True
+
+    keys = script.call_args.kwargs["keys"]
+    assert keys == ["session:sid"]
+    assert script.call_args.kwargs["args"][0] == "test@example.com"
+
+
+def test_list_sessions():
+    """
+    Test that live sessions are listed with their metadata.
+    """
+    mock_redis_client = MagicMock()
+    mock_redis_client.zrangebyscore.return_value = [b"b", b"a"]
+    mock_redis_client.pipeline.return_value.execute.return_value = [
+        {
+            b"email": b"test@example.com",
+            b"user_agent": b"",
+            b"created_at": b"20",
+            b"last_used_at": b"30",
+            b"expires_at": b"40",
+        },
+        {},
+    ]
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        sessions = session_store.list_sessions("test@example.com")
+
+    assert sessions == [
+        {
+            "id": "b",
+            "user_agent": None,
+            "created_at": 20,
+            "last_used_at": 30,
+            "expires_at": 40,
+        }
+    ]
+
+
+def test_scripts_are_registered_once():
+    """
+    Test that scripts are registered once per client, not on every call.
+    """
+    mock_redis_client = MagicMock()
+    mock_redis_client.register_script.side_effect = lambda source: MagicMock(
+        registered_client=mock_redis_client, return_value=1
+    )
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        session_store.validate("test@example.com", "a")
+        session_store.validate("test@example.com", "b")
+        session_store.revoke("test@example.com", "a")
+        session_store.revoke("test@example.com", "b")
+
+    assert mock_redis_client.register_script.call_count == 2
+
+
+def test_revoke_all_deletes_sessions_in_one_call():
+    """
+    Test that revoking every session deletes the sessions and their index in
+    one script call, leaving other users' sessions alone.
+    """
+    client = fakeredis.FakeStrictRedis()
+    expires_at = int(time.time()) + 3600
+    user = User(
+        id=1, email="test@example.com", role="user", is_active=True, is_verified=True
+    )
+    other = User(
+        id=2, email="other@example.com", role="user", is_active=True, is_verified=True
+    )
+    with patch("app.services.redis_cache.redis_client", client):
+        session_store.create(user, "a", expires_at)
+        session_store.create(user, "b", expires_at)
+        session_store.create(other, "c", expires_at)
+
+        assert session_store.revoke_all("test@example.com") == 2
+        assert session_store.validate("test@example.com", "a") is False
+        assert session_store.validate("test@example.com", "b") is False
+        assert session_store.validate("other@example.com", "c") is True
+        assert session_store.revoke_all("test@example.com") == 0
+
+    assert not client.exists("session:a", "session:b")
+    assert not client.exists("user:test@example.com:sessions")
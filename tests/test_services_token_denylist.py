@@ -0,0 +1,115 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+import redis
+from fastapi import HTTPException
+from app.services import token_denylist
+from app.services.auth import create_access_token
+from app.services.redis_cache import encode_user_snapshot
+from app.services.tokens import token_service
+from app.utils.bloom_filter import BloomFilter
+from app.utils.dependencies import get_current_user
+
+
+def test_revoke_stores_publishes_and_updates_filter():
+    """
+    Test that revoking a token adds it to the denylist set, scored by its
+    expiry, in one pipeline, announces it and adds it to the local filter.
+    """
+    mock_redis_client = MagicMock()
+    pipeline = mock_redis_client.pipeline.return_value
+    expires_at = int(time.time()) + 60
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        token_denylist.revoke("abc", expires_at)
+
+    pipeline.zadd.assert_called_once_with("revoked:jtis", {"abc": expires_at})
+    pipeline.zremrangebyscore.assert_called_once()
+    pipeline.publish.assert_called_once_with("revoked_tokens", "abc")
+    pipeline.execute.assert_called_once()
+    assert "abc" in token_denylist._filter
+
+
+def test_is_revoked_answers_misses_in_process():
+    """
+    Test that only Bloom filter hits are confirmed in Redis.
+    """
+    token_denylist._filter.add("revoked")
+    mock_redis_client = MagicMock()
+    mock_redis_client.zscore.return_value = time.time() + 60
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        assert token_denylist.is_revoked("valid") is False
+        assert token_denylist.is_revoked(None) is False
+        mock_redis_client.zscore.assert_not_called()
+        assert token_denylist.is_revoked("revoked") is True
+    mock_redis_client.zscore.assert_called_once_with("revoked:jtis", "revoked")
+
+
+def test_get_current_user_rejects_revoked_token():
+    """
+    Test that a revoked access token is rejected even after it was cached.
+    """
+    token = create_access_token({"sub": "test@example.com"})
+    mock_redis_client = MagicMock()
+    mock_redis_client.get.return_value = encode_user_snapshot(
+        {
+            "id": 1,
+            "email": "test@example.com",
+            "role": "user",
+            "is_active": True,
+            "is_verified": True,
+        }
+    )
+    mock_redis_client.zscore.return_value = time.time() + 60
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        assert get_current_user(token, db=MagicMock()).id == 1
+        token_denylist._filter.add(token_service.verify(token)["jti"])
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user(token, db=MagicMock())
+    assert exc_info.value.status_code == 401
+
+
+def test_unloaded_filter_checks_every_token_and_fails_closed(monkeypatch):
+    """
+    Test that until the filter is loaded, tokens are checked in Redis and
+    rejected while Redis cannot be reached.
+    """
+    monkeypatch.setattr(token_denylist, "_loaded", False)
+    mock_redis_client = MagicMock()
+    mock_redis_client.zscore.return_value = None
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        assert token_denylist.is_revoked("valid") is False
+        mock_redis_client.zscore.side_effect = redis.ConnectionError("down")
+        assert token_denylist.is_revoked("valid") is True
+
+
+def test_start_retries_until_redis_is_reachable(monkeypatch):
+    """
+    Test that the background connector keeps retrying and loads the filter
+    once Redis answers.
+    """
+    monkeypatch.setattr(token_denylist, "_loaded", False)
+    monkeypatch.setattr(token_denylist, "_stopping", threading.Event())
+    attempts = []
+
+    def pubsub(**kwargs):
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise redis.ConnectionError("down")
+        return MagicMock()
+
+    mock_redis_client = MagicMock()
+    mock_redis_client.pubsub.side_effect = pubsub
+    mock_redis_client.pipeline.return_value.execute.return_value = [0, [b"old"]]
+    sleeps = []
+    monkeypatch.setattr(
+        token_denylist._stopping, "wait", lambda delay: sleeps.append(delay)
+    )
+    with patch("app.services.redis_cache.redis_client", mock_redis_client):
+        token_denylist._connect()
+    token_denylist._pubsub = token_denylist._listener = None
+
+    assert len(attempts) == 2
+    assert sleeps == [1]
+    assert token_denylist._loaded is True
+    assert "old" in token_denylist._filter
@@ -0,0 +1,66 @@
+from datetime import timedelta
+import pytest
+from jose import jwt
+from app.services.tokens import TokenError, TokenService
+
+
+def test_issue_and_verify():
+    """
+    Test that an issued token verifies to its claims plus the registered ones.
+    """
+    service = TokenService({"default": "secret"}, "default")
+    claims = {"sub": "test@example.com"}
+    payload = service.verify(service.issue(claims, timedelta(minutes=5)))
+
+    assert payload["sub"] == "test@example.com"
+    assert payload["exp"] - payload["iat"] == 300
+    assert len(payload["jti"]) == 32
+    assert claims == {"sub": "test@example.com"}
+
+
+def test_verify_rejects_tampered_and_expired_tokens():
+    """
+    Test that wrongly signed, malformed and expired tokens are rejected.
+    """
+    service = TokenService({"default": "secret"}, "default")
+    other = TokenService({"default": "other-secret"}, "default")
+    token = service.issue({"sub": "a"}, timedelta(minutes=5))
+
+    for bad in [
+        other.issue({"sub": "a"}, timedelta(minutes=5)),
+        token[:-2] + ("AA" if token[-2:] != "AA" else "BB"),
+        "not-a-token",
+        service.issue({"sub": "a"}, timedelta(seconds=-10)),
+    ]:
+        with pytest.raises(TokenError):
+            service.verify(bad)
+
+
+def test_key_rotation_by_kid():
+    """
+    Test that tokens signed with a previous key keep verifying while it is configured.
+    """
+    old = TokenService({"default": "old"}, "default")
+    rotated = TokenService({"default": "old", "2025-01": "new"}, "2025-01")
+    retired = TokenService({"2025-01": "new"}, "2025-01")
+    old_token = old.issue({"sub": "a"}, timedelta(minutes=5))
+    new_token = rotated.issue({"sub": "a"}, timedelta(minutes=5))
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "2025-01"
+    assert rotated.verify(old_token)["sub"] == "a"
+    assert retired.verify(new_token)["sub"] == "a"
+    with pytest.raises(TokenError):
+        retired.verify(old_token)
+
+
+def test_verify_accepts_python_jose_tokens():
+    """
+    Test that tokens issued by python-jose without a `kid` use the default key,
+    and that other algorithms are refused.
+    """
+    service = TokenService({"default": "secret"}, "default")
+    token = jwt.encode({"sub": "a"}, "secret", algorithm="HS256")
+    assert service.verify(token) == {"sub": "a"}
+
+    with pytest.raises(TokenError):
+        service.verify(jwt.encode({"sub": "a"}, "secret", algorithm="HS512"))
@@ -0,0 +1,24 @@
+from app.utils.bloom_filter import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """
+    Test that every added item is reported as present.
+    """
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    assert bloom.count == 1000
+
+
+def test_bloom_filter_false_positive_rate():
+    """
+    Test that the false positive rate at capacity stays near the target.
+    """
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
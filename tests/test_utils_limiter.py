@@ -0,0 +1,145 @@
+import threading
+from unittest.mock import MagicMock, patch
+import fakeredis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from slowapi.util import get_remote_address
+from starlette.requests import Request
+from app.models.user import User
+from app.services.auth import create_access_token
+from app.utils.dependencies import get_current_user
+from app.utils.limiter import (
+    DistributedLimiter,
+    RateLimitMiddleware,
+    get_rate_limit_key,
+    principal_limit,
+    rate_limit_cost,
+    route_cost,
+)
+
+
+def make_request(token: str = None) -> Request:
+    """
+    Build a bare request, optionally carrying an access token.
+    """
+    query_string = f"token={token}".encode() if token else b""
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/contacts/",
+            "query_string": query_string,
+            "headers": [],
+            "client": ("203.0.113.7", 50000),
+        }
+    )
+
+
+def test_rate_limit_key_by_principal():
+    """
+    Test that requests are limited per user when they carry a valid token,
+    and per client address otherwise.
+    """
+    user = User(
+        id=42, email="test@example.com", role="admin", is_active=True, is_verified=True
+    )
+    token = create_access_token({"sub": user.email}, user=user)
+
+    assert get_rate_limit_key(make_request(token)) == "admin:42"
+    assert get_rate_limit_key(make_request("invalid")) == "anonymous:203.0.113.7"
+    assert get_rate_limit_key(make_request()) == "anonymous:203.0.113.7"
+
+
+def test_principal_limit_by_tier(monkeypatch):
+    """
+    Test that each tier gets its own budget, and unknown roles the user budget.
+    """
+    monkeypatch.setattr(
+        "app.utils.limiter.settings.RATE_LIMIT_TIERS",
+        {"anonymous": "1/minute", "user": "2/minute", "admin": "3/minute"},
+    )
+    assert principal_limit("anonymous:203.0.113.7") == "1/minute"
+    assert principal_limit("admin:42") == "3/minute"
+    assert principal_limit("auditor:7") == "2/minute"
+
+
+def test_route_cost():
+    """
+    Test that routes cost what `rate_limit_cost` sets, and 1 by default.
+    """
+
+    @rate_limit_cost(5)
+    def expensive_route():
+        pass
+
+    def cheap_route():
+        pass
+
+    request = make_request()
+    assert route_cost(request) == 1
+    request.state.rate_limit_endpoint = expensive_route
+    assert route_cost(request) == 5
+    request.state.rate_limit_endpoint = cheap_route
+    assert route_cost(request) == 1
+
+
+def test_get_current_user_reuses_principal():
+    """
+    Test that a token verified by the rate limiter is not verified again.
+    """
+    token = create_access_token({"sub": "test@example.com"})
+    request = make_request(token)
+    get_rate_limit_key(request)
+    mock_db = MagicMock()
+    mock_db.query.return_value.filter.return_value.first.return_value = User(
+        id=1, email="test@example.com", role="user", is_active=True, is_verified=True
+    )
+    mock_redis_client = MagicMock()
+    mock_redis_client.get.return_value = None
+
+    with patch("app.services.redis_cache.redis_client", mock_redis_client), patch(
+        "app.utils.dependencies.token_service.verify"
+    ) as verify:
+        user = get_current_user(token, request=request, db=mock_db)
+
+    verify.assert_not_called()
+    assert user.email == "test@example.com"
+
+
+def test_middleware_checks_limits_off_the_event_loop():
+    """
+    Test that the middleware checks application and route limits in the
+    threadpool, and that decorated routes are charged once.
+    """
+    app = FastAPI()
+    app.state.limiter = DistributedLimiter(
+        key_func=get_remote_address, application_limits=["2/minute"]
+    )
+    app.add_middleware(RateLimitMiddleware)
+    check = app.state.limiter._check_request_limit
+    threads = []
+    loop_threads = set()
+
+    def record_thread(*args):
+        threads.append(threading.current_thread())
+        check(*args)
+
+    @app.get("/items")
+    async def read_items(request: Request):
+        loop_threads.add(threading.current_thread())
+        return []
+
+    @app.get("/login")
+    @app.state.limiter.limit("1/minute")
+    async def login(request: Request):
+        return {}
+
+    client = TestClient(app)
+    with patch("app.services.redis_cache.redis_client", fakeredis.FakeStrictRedis()):
+        with patch.object(app.state.limiter, "_check_request_limit", record_thread):
+            statuses = [client.get("/items").status_code for _ in range(3)]
+            statuses += [client.get("/login").status_code for _ in range(2)]
+
+    assert statuses == [200, 200, 429, 200, 429]
+    assert len(threads) == 5
+    assert loop_threads and loop_threads.isdisjoint(threads)
@@ -0,0 +1,154 @@
+from unittest.mock import MagicMock, patch
+import fakeredis
+import redis
+from limits import parse
+from limits.storage import MemoryStorage
+from app.utils.sliding_window import SLIDING_WINDOW_SCRIPT, SlidingWindowRateLimiter
+
+
+def make_client(*results):
+    """
+    Build a Redis client mock whose sliding window script returns `results`.
+    """
+    client = MagicMock()
+    client.register_script.return_value.side_effect = list(results)
+    return client
+
+
+def test_hit_checks_redis_and_spends_lease_locally():
+    """
+    Test that units leased by the script are spent without calling Redis again.
+    """
+    limit = parse("100/minute")
+    rate_limiter = SlidingWindowRateLimiter(MemoryStorage())
+    client = make_client([1, 87, 2], [1, 84, 0])
+    with patch("app.services.redis_cache.redis_client", client):
+        assert all(rate_limiter.hit(limit, "1.2.3.4", "route") for _ in range(4))
+
+    script = client.register_script.return_value
+    assert script.call_count == 2
+    keys, args = script.call_args.kwargs["keys"], script.call_args.kwargs["args"]
+    assert keys == [f"ratelimit:{limit.key_for('1.2.3.4', 'route')}"]
+    assert args[:3] == [60000, 100, 1]
+
+
+def test_hit_rejected_over_limit():
+    """
+    Test that a hit over the limit is rejected and does not leave a lease.
+    """
+    limit = parse("5/minute")
+    rate_limiter = SlidingWindowRateLimiter(MemoryStorage())
+    client = make_client([0, 0, 1700000000000], [0, 0, 1700000000000])
+    with patch("app.services.redis_cache.redis_client", client):
+        assert rate_limiter.hit(limit, "1.2.3.4", cost=1) is False
+        assert rate_limiter.hit(limit, "1.2.3.4", cost=1) is False
+
+    assert client.register_script.return_value.call_count == 2
+
+
+def test_hit_falls_back_to_local_limit_without_redis():
+    """
+    Test that hits are limited per process while Redis is unreachable.
+    """
+    limit = parse("2/minute")
+    rate_limiter = SlidingWindowRateLimiter(MemoryStorage())
+    client = MagicMock()
+    client.register_script.return_value.side_effect = redis.ConnectionError()
+    with patch("app.services.redis_cache.redis_client", client):
+        results = [rate_limiter.hit(limit, "1.2.3.4") for _ in range(3)]
+
+    assert results == [True, True, False]
+
+
+def test_get_window_stats():
+    """
+    Test that the remaining units and reset time are read from the window.
+    """
+    limit = parse("10/minute")
+    rate_limiter = SlidingWindowRateLimiter(MemoryStorage())
+    client = MagicMock()
+    client.pipeline.return_value.execute.return_value = [
+        4,
+        [(b"member", 1700000000000.0)],
+    ]
+    with patch("app.services.redis_cache.redis_client", client):
+        stats = rate_limiter.get_window_stats(limit, "1.2.3.4")
+        assert rate_limiter.test(limit, "1.2.3.4", cost=6) is True
+        assert rate_limiter.test(limit, "1.2.3.4", cost=7) is False
+
+    assert stats.remaining == 6
+    assert stats.reset_time == 1700000060.0
+
+
+def test_script_enforces_limit_and_leases():
+    """
+    Test the sliding window script against Redis: hits within the limit are
+    recorded with a lease of a tenth of the rest, and hits over it rejected.
+    """
+    client = fakeredis.FakeStrictRedis()
+    script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    assert script(keys=["w"], args=[60000, 100, 1, 20, "a"]) == [1, 90, 9]
+    assert client.zcard("w") == 10
+    assert script(keys=["w"], args=[60000, 12, 3, 20, "b"])[:2] == [0, 2]
+    assert script(keys=["w"], args=[60000, 12, 2, 20, "c"]) == [1, 0, 0]
+    assert client.zcard("w") == 12
+
+
+def test_script_removes_refunded_members():
+    """
+    Test that members passed back to the script are removed before counting.
+    """
+    client = fakeredis.FakeStrictRedis()
+    script = client.register_script(SLIDING_WINDOW_SCRIPT)
+    script(keys=["w"], args=[60000, 100, 1, 20, "a"])
+
+    refund = [f"a:{i}" for i in range(2, 11)]
+    assert script(keys=["w"], args=[60000, 100, 1, 0, "b", *refund]) == [1, 98, 0]
+    assert sorted(client.zrange("w", 0, -1)) == [b"a:1", b"b:1"]
+
+
+def test_unused_lease_units_are_returned(monkeypatch):
+    """
+    Test that only the units actually spent stay in the window once a lease
+    expires, so leasing does not use up the budget of slow clients.
+    """
+    limit = parse("100/minute")
+    rate_limiter = SlidingWindowRateLimiter(MemoryStorage())
+    client = fakeredis.FakeStrictRedis()
+    key = f"ratelimit:{limit.key_for('1.2.3.4')}"
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.sliding_window.time.monotonic", lambda: now[0])
+    with patch("app.services.redis_cache.redis_client", client):
+        # One unit from Redis and three of the lease of nine
+        assert all(rate_limiter.hit(limit, "1.2.3.4") for _ in range(4))
+        assert client.zcard(key) == 10
+        now[0] += 10
+        assert rate_limiter.hit(limit, "1.2.3.4")
+
+    # The four spent units, the new hit and its lease of nine
+    assert client.zcard(key) == 14
+
+
+def test_slow_client_is_never_limited_below_its_budget(monkeypatch):
+    """
+    Test that a client hitting a 120/minute limit once every 1.5 seconds from
+    several workers, slower than the leases last, is never rejected and only
+    its own hits stay in the window.
+    """
+    limit = parse("120/minute")
+    workers = [SlidingWindowRateLimiter(MemoryStorage()) for _ in range(3)]
+    client = fakeredis.FakeStrictRedis()
+    key = f"ratelimit:{limit.key_for('1.2.3.4')}"
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.sliding_window.time.monotonic", lambda: now[0])
+    with patch("app.services.redis_cache.redis_client", client):
+        for i in range(40):
+            assert workers[i % len(workers)].hit(limit, "1.2.3.4")
+            now[0] += 1.5
+        # Return the last leases with one more hit per worker
+        for worker in workers:
+            assert worker.hit(limit, "1.2.3.4", cost=0)
+        leased = sum(lease.units for w in workers for lease in w._leases.values())
+
+    assert client.zcard(key) - leased == 40
@@ -0,0 +1,42 @@
+import time
+from app.utils.token_cache import TokenCache
+
+
+def test_token_cache_hit_and_miss():
+    """
+    Test that a cached token returns its claims and user snapshot.
+    """
+    cache = TokenCache(maxsize=10, ttl=60)
+    assert cache.get("token") is None
+
+    claims = {"sub": "test@example.com", "exp": time.time() + 60}
+    cache.set("token", claims, {"id": 1})
+    assert cache.get("token") == (claims, {"id": 1})
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_token_cache_honors_exp():
+    """
+    Test that an entry is dropped once the token has expired.
+    """
+    cache = TokenCache(maxsize=10, ttl=60)
+    cache.set("token", {"exp": time.time() - 1}, {"id": 1})
+    assert cache.get("token") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_token_cache_evicts_least_recently_used():
+    """
+    Test that the least recently used token is evicted when the cache is full.
+    """
+    cache = TokenCache(maxsize=2, ttl=60)
+    cache.set("first", {}, {"id": 1})
+    cache.set("second", {}, {"id": 2})
+    cache.get("first")
+    cache.set("third", {}, {"id": 3})
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2